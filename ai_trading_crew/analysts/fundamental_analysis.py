@@ -1,6 +1,7 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+from ai_trading_crew.utils.fetch_executor import fetch_timeout
 
 
 def get_fundamental_context(symbol: str) -> str:
@@ -43,7 +44,7 @@ def _get_finviz_data(symbol: str) -> str:
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=fetch_timeout(30))
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -170,7 +171,7 @@ def _get_tipranks_data(symbol: str) -> str:
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=fetch_timeout(30))
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -459,7 +460,7 @@ def _get_tipranks_forecast(symbol: str) -> str:
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=fetch_timeout(30))
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -733,7 +734,7 @@ def _get_valueinvesting_data(symbol: str) -> str:
     }
     
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=fetch_timeout(30))
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 import time
 import random
 from ai_trading_crew.utils.twelve_data_manager import twelve_data_manager
+from ai_trading_crew.utils.memory_cache import market_data_cache
+from ai_trading_crew.utils.fetch_executor import fetch_timeout
 
 # Load environment variables
 load_dotenv()
@@ -60,6 +62,12 @@ class HistoricalMarketFetcher:
         
         results = []
         
+        # Fetch the bars of every asset with batched requests, each asset then reads its cached bars
+        try:
+            twelve_data_manager.get_time_series_batch(list(tickers.values()))
+        except Exception as e:
+            print(f"Error prefetching global market data: {e}")
+        
         # Fetch data for each asset
         for asset_name, ticker in tickers.items():
             try:
@@ -116,6 +124,9 @@ class HistoricalMarketFetcher:
         Returns:
             pd.DataFrame: DataFrame with VIX data
         """
+        cached_df = market_data_cache.get("vix", days)
+        if cached_df is not None:
+            return cached_df.copy()
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days * 2)
@@ -141,7 +152,7 @@ class HistoricalMarketFetcher:
                 ".rand": str(random.randint(1, 1000000))
             }
             time.sleep(1)
-            response = requests.get(url, headers=headers, params=params)
+            response = requests.get(url, headers=headers, params=params, timeout=fetch_timeout(30))
             response.raise_for_status()
             data = response.json()
             if not data or "chart" not in data or "result" not in data["chart"] or not data["chart"]["result"]:
@@ -161,7 +172,8 @@ class HistoricalMarketFetcher:
             # Calculate daily percentage change
             df["pct_change"] = df["value"].pct_change(-1) * 100  # Negative because data is sorted in descending order
             
-            return df
+            market_data_cache.set("vix", days, df)
+            return df.copy()
         except Exception as e:
             raise ValueError(f"Error fetching VIX data from Yahoo Finance API: {str(e)}")
             
@@ -3,8 +3,11 @@ import json
 import datetime
 import pytz
 import http.client
+from ai_trading_crew.utils.tracing import traced, count_in_span
+from ai_trading_crew.utils.fetch_executor import fetch_timeout
 
 
+@traced("fetch_stocktwits_messages")
 def fetch_stocktwits_messages(symbol : str, desired_count : int, lower_bound : datetime):
     messages = []
     bullish_count = 0
@@ -12,7 +15,7 @@ def fetch_stocktwits_messages(symbol : str, desired_count : int, lower_bound : d
     neutral_count = 0
     empty_count = 0
     pagination_max = None
-    conn = http.client.HTTPSConnection("stocktwits.p.rapidapi.com")
+    conn = http.client.HTTPSConnection("stocktwits.p.rapidapi.com", timeout=fetch_timeout(30))
     headers = {
         'x-rapidapi-key': os.getenv("RAPID_API_KEY"),
         'x-rapidapi-host': "stocktwits.p.rapidapi.com"
@@ -22,9 +25,14 @@ def fetch_stocktwits_messages(symbol : str, desired_count : int, lower_bound : d
         endpoint = f"/streams/symbol/{symbol}.json?limit={desired_count}"
         if pagination_max:
             endpoint += f"&max={pagination_max}"
+        # Every page gets the time left before the stage deadline
+        conn.timeout = fetch_timeout(30)
+        if conn.sock is not None:
+            conn.sock.settimeout(conn.timeout)
         conn.request("GET", endpoint, headers=headers)
         res = conn.getresponse()
         data = res.read().decode("utf-8")
+        count_in_span(bytes=len(data), pages=1)
         try:
             json_data = json.loads(data)
         except Exception as e:
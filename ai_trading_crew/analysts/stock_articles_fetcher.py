@@ -9,6 +9,7 @@ from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
 from io import StringIO
 import sys
 from ai_trading_crew.utils.company_info import get_company_name
+from ai_trading_crew.utils.tracing import traced
 import os
 
 # List of URLs to scrape - focusing on what works
@@ -24,6 +25,7 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:123.0) Gecko/20100101 Firefox/123.0",
 ]
 
+@traced("extract_finviz_content", record_result_size=True)
 async def extract_finviz_content(url):
     """Enhanced method to extract article content from Finviz directly"""
     try:
@@ -185,6 +187,7 @@ async def extract_finviz_content(url):
             pass
         return f"Error extracting Finviz content: {str(e)}"
 
+@traced("extract_seeking_alpha_content", record_result_size=True)
 async def extract_seeking_alpha_content(url):
     """Specialized method to extract article content from SeekingAlpha"""
     try:
@@ -336,6 +339,7 @@ async def extract_seeking_alpha_content(url):
             pass
         return f"Error extracting SeekingAlpha content: {str(e)}"
 
+@traced("extract_yahoo_finance_content", record_result_size=True)
 async def extract_yahoo_finance_content(url):
     """Specialized method to extract article content from Yahoo Finance"""
     try:
@@ -635,6 +639,7 @@ async def extract_yahoo_finance_direct(url):
     except Exception as e:
         return f"Error with direct extraction: {str(e)}"
 
+@traced("extract_wsj_content", record_result_size=True)
 async def extract_wsj_content(url):
     """Extract content from a Wall Street Journal article (potentially via Yahoo Finance)"""
     try:
@@ -737,6 +742,7 @@ async def extract_wsj_content(url):
         print(f"Error extracting WSJ content: {str(e)}")
         return ""
 
+@traced("extract_benzinga_content", record_result_size=True)
 async def extract_benzinga_content(url):
     """Specialized method to extract article content from Benzinga"""
     try:
@@ -1296,13 +1302,14 @@ async def main(url_list_to_use=None):
     
     return "\n".join(all_articles_content)
 
-async def get_stock_news(ticker_symbol,file_path):
+async def get_stock_news(ticker_symbol, file_path=None, content=None):
     """
-    Extracts stock news articles from URLs found in the specified file.
+    Extracts stock news articles from URLs found in the specified file or content.
     
     Args:
         file_path (str): Path to the file containing URLs, one per line.
                          Defaults to RELEVANT_ARTICLES_FILE from config.
+        content (str): Text containing the URLs, used instead of the file when given.
     
     Returns:
         str: A formatted string containing all the extracted articles with clear separations.
@@ -1319,14 +1326,16 @@ async def get_stock_news(ticker_symbol,file_path):
     # Extract URLs from the file
     extracted_urls = []
     
-    with open(file_path, 'r') as file:
-        content = file.read()
-        # Find all URLs in the content
-        url_pattern = r'https?://[^\s<>"\']+'
-        extracted_urls = re.findall(url_pattern, content)
+    source = file_path or "the relevant articles"
+    if content is None:
+        with open(file_path, 'r') as file:
+            content = file.read()
+    # Find all URLs in the content
+    url_pattern = r'https?://[^\s<>"\']+'
+    extracted_urls = re.findall(url_pattern, content)
     
     if not extracted_urls:
-        return f"No URLs found in {file_path}"
+        return f"No URLs found in {source}"
     
     # Filter out GuruFocus URLs completely
     filtered_urls = []
@@ -1335,7 +1344,7 @@ async def get_stock_news(ticker_symbol,file_path):
             filtered_urls.append(url)
     
     if not filtered_urls:
-        return f"No valid URLs found in {file_path} (GuruFocus URLs are excluded)"
+        return f"No valid URLs found in {source} (GuruFocus URLs are excluded)"
     
     # Process the articles and get the content
     result = await main(filtered_urls)
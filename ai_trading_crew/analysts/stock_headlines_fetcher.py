@@ -9,6 +9,8 @@ import re
 import json
 import dateutil.parser
 from ai_trading_crew.utils.company_info import get_company_name
+from ai_trading_crew.utils.tracing import traced, annotate_span
+from ai_trading_crew.utils.fetch_executor import fetch_timeout
 import os
 
 @dataclass
@@ -35,6 +37,7 @@ def parse_time_input(time_input: Union[str, int]) -> datetime.datetime:
     else:
         raise ValueError("Time input must be a string in format 'YYYY-MM-DD HH:MM' or a Unix timestamp")
 
+@traced("fetch_finviz_news")
 def fetch_finviz_news(ticker: str, start_time: datetime.datetime) -> List[NewsItem]:
     """Fetch news from Finviz"""
     url = f"https://finviz.com/quote.ashx?t={ticker}&p=d"
@@ -47,7 +50,8 @@ def fetch_finviz_news(ticker: str, start_time: datetime.datetime) -> List[NewsIt
         'Referer': 'https://www.google.com/'
     }
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=fetch_timeout(30))
+        annotate_span(bytes=len(response.content), status_code=response.status_code)
         if response.status_code != 200:
             return []
         with open("finviz_response.html", "w", encoding="utf-8") as f:
@@ -233,7 +237,7 @@ def fetch_tipranks_news(ticker: str, start_time: datetime.datetime) -> List[News
         'Cache-Control': 'max-age=0'
     }
     try:
-        response = requests.get(news_url, headers=headers, timeout=30)
+        response = requests.get(news_url, headers=headers, timeout=fetch_timeout(30))
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
             news_items = []
@@ -354,7 +358,7 @@ def fetch_seeking_alpha_news(ticker: str, start_time: datetime.datetime) -> List
     }
     results = []
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = requests.get(url, headers=headers, timeout=fetch_timeout(15))
         if response.status_code == 200:
             try:
                 json_data = response.json()
@@ -414,6 +418,8 @@ def fetch_marketwatch_news(ticker: str, start_time: datetime.datetime) -> List[N
     
     # Try with different user agents
     for user_agent in user_agents:
+        # Raises once the stage deadline passed, so an abandoned fetch stops trying
+        timeout = fetch_timeout(30)
         headers = {
             'User-Agent': user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -430,7 +436,7 @@ def fetch_marketwatch_news(ticker: str, start_time: datetime.datetime) -> List[N
         }
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = requests.get(url, headers=headers, timeout=timeout)
             
             if response.status_code == 200:
                 # Save the HTML for debugging (commented out)
@@ -589,7 +595,7 @@ def fetch_marketwatch_news(ticker: str, start_time: datetime.datetime) -> List[N
             'Cache-Control': 'no-cache'
         }
         
-        response = requests.get(alt_url, headers=headers, timeout=30)
+        response = requests.get(alt_url, headers=headers, timeout=fetch_timeout(30))
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
             est = pytz.timezone('US/Eastern')
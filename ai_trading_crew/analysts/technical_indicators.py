@@ -6,7 +6,7 @@ import time
 import sys
 from datetime import datetime, timedelta
 from ai_trading_crew.config import settings
-from ai_trading_crew.utils.twelve_data_manager import twelve_data_manager
+from ai_trading_crew.utils.twelve_data_manager import twelve_data_manager, INTRADAY_INTERVAL_MINUTES
 
 from dotenv import load_dotenv
 
@@ -38,7 +38,11 @@ class TwelveTI:
         
     def _get_data(self, period="4mo"):
         # Use the centralized data manager
-        self._data = twelve_data_manager.get_time_series_data(self.symbol, self.interval, period)
+        if self.interval in INTRADAY_INTERVAL_MINUTES:
+            # Recent bars of the intraday ring buffer, each refresh only fetches the newest bars
+            self._data = twelve_data_manager.get_intraday_bars(self.symbol, self.interval)
+        else:
+            self._data = twelve_data_manager.get_time_series_data(self.symbol, self.interval, period)
         
         # Ensure consistent column naming to handle any data source variations
         column_mapping = {
@@ -1,6 +1,5 @@
 import pandas as pd
 from datetime import datetime, timedelta
-import pandas_market_calendars as mcal
 from typing import Optional, Tuple, List, Dict
 import logging
 import numpy as np
@@ -15,23 +14,19 @@ logging.basicConfig(level=logging.INFO)
 from ai_trading_crew.config import settings, AGENT_INPUTS_FOLDER
 from ai_trading_crew.utils.dates import get_today_str_no_min
 from ai_trading_crew.utils.twelve_data_manager import twelve_data_manager
+from ai_trading_crew.utils.trading_calendar import trading_calendar
 
 
-def obtain_market_schedule(start_date: datetime, end_date: datetime, market: Optional[str] = "NYSE") -> pd.DataFrame:
-    start_str = start_date.strftime('%Y-%m-%d')
-    end_str = end_date.strftime('%Y-%m-%d')
-    calendar = mcal.get_calendar(market)
-    market_schedule = calendar.schedule(start_date=start_str, end_date=end_str)
-    return market_schedule
+def obtain_business_dates(start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    sessions = trading_calendar.sessions_between(start_date, end_date)
+    return pd.DataFrame(index=pd.DatetimeIndex(sessions))
 
-def obtain_business_dates(start_date: datetime, end_date: datetime, market: Optional[str] = "NYSE") -> pd.DataFrame:
-    business_days = pd.date_range(start=start_date, end=end_date, freq='B')
-    return pd.DataFrame(index=business_days)
 
-
-def get_timegpt_forecast(symbols: List[str] = settings.SYMBOLS, time_series_defaults: Dict = settings.TIME_SERIES_DEFAULTS) -> pd.DataFrame:
+def get_timegpt_forecast(symbols: List[str] = settings.SYMBOLS, time_series_defaults: Dict = settings.TIME_SERIES_DEFAULTS, persist: bool = True) -> pd.DataFrame:
     """
-    Get TimeGPT forecasts with automatic caching. Calls API only once per day.
+    Get TimeGPT forecasts with automatic caching. Calls API only once per day and symbol:
+    the day's cached forecasts are reused, and only the symbols they miss are forecast and added to them.
+    Without persistence the day's cached forecasts are still read, but the new ones are only returned.
     """
     
     # Add STOCK_MARKET_OVERVIEW_SYMBOL to symbols for TimeGPT (if not already included)
@@ -42,21 +37,27 @@ def get_timegpt_forecast(symbols: List[str] = settings.SYMBOLS, time_series_defa
     # Set up pickle file path in agents_inputs with current date
     today_str_no_min = get_today_str_no_min()
     input_dir = os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min)
-    os.makedirs(input_dir, exist_ok=True)
     pickle_file = os.path.join(input_dir, "timegpt_forecasts.pkl")
     
     # Check if pickle file exists and is from today
+    cached_forecast = None
     if os.path.exists(pickle_file):
         file_mtime = datetime.fromtimestamp(os.path.getmtime(pickle_file))
         today = datetime.now().date()
         
         # If file was created today, load from pickle
         if file_mtime.date() == today:
-            print("Loading TimeGPT forecasts from cache...")
             with open(pickle_file, 'rb') as f:
-                return pickle.load(f)
+                cached_forecast = pickle.load(f)
+            forecast_symbols = set(cached_forecast['unique_id']) if 'unique_id' in cached_forecast.columns else set()
+            missing_symbols = [symbol for symbol in timegpt_symbols if symbol not in forecast_symbols]
+            if not missing_symbols:
+                print("Loading TimeGPT forecasts from cache...")
+                return cached_forecast
+            print(f"Cached TimeGPT forecasts miss {len(missing_symbols)} symbols, forecasting them...")
+            timegpt_symbols = missing_symbols
     
-    # Call TimeGPT API if no cache or cache is old
+    # Call TimeGPT API if no cache, the cache is old or it misses symbols
     print("Calling TimeGPT API to get forecasts...")
     
     max_missing_data = time_series_defaults["max_missing_data"]
@@ -65,14 +66,16 @@ def get_timegpt_forecast(symbols: List[str] = settings.SYMBOLS, time_series_defa
     start_date = settings.time_series_dates["start_date"]
 
     # Ensure data directory exists
-    os.makedirs(data_folder, exist_ok=True)
+    if persist:
+        os.makedirs(data_folder, exist_ok=True)
 
     handler = TwelveDataHandler(
         symbols_list=timegpt_symbols,
         start_date=start_date,
         end_date=end_date,
         max_missing_data=max_missing_data,
-        data_folder=data_folder
+        data_folder=data_folder,
+        persist=persist
     )
     combined_df = handler.run()
 
@@ -89,15 +92,11 @@ def get_timegpt_forecast(symbols: List[str] = settings.SYMBOLS, time_series_defa
     all_dates = pd.to_datetime(combined_df['ds']).dt.normalize().unique()
     all_dates = pd.DatetimeIndex(sorted(all_dates))
     
-    # Generate all business days in the date range
-    full_business_days = pd.bdate_range(
-        start=all_dates.min(),
-        end=all_dates.max() + timedelta(days=30),  # Extend for forecast horizon
-        freq='B'
-    )
-    
-    # Find the market holidays (business days not in our data)
-    market_holidays = full_business_days.difference(all_dates)
+    # Find the market holidays (business days without a session), extended for the forecast horizon
+    market_holidays = pd.DatetimeIndex(trading_calendar.holidays_between(
+        all_dates.min(),
+        all_dates.max() + timedelta(days=30)
+    ))
     
     # Create custom business day frequency excluding market holidays
     custom_market_freq = CustomBusinessDay(holidays=market_holidays)
@@ -114,8 +113,14 @@ def get_timegpt_forecast(symbols: List[str] = settings.SYMBOLS, time_series_defa
     )
     
     df_forecast['TimeGPT'] = df_forecast['TimeGPT'] * 100
+    if cached_forecast is not None:
+        df_forecast = pd.concat([cached_forecast, df_forecast], ignore_index=True)
+    
+    if not persist:
+        return df_forecast
     
     # Save to pickle for reuse
+    os.makedirs(input_dir, exist_ok=True)
     with open(pickle_file, 'wb') as f:
         pickle.dump(df_forecast, f)
     
@@ -124,6 +129,8 @@ def get_timegpt_forecast(symbols: List[str] = settings.SYMBOLS, time_series_defa
 
 
 def format_timegpt_forecast(forecast_df: pd.DataFrame, symbol: str, company_name: str) -> str:
+    if forecast_df.empty or 'unique_id' not in forecast_df.columns:
+        return f"No TimeGPT forecast available for {company_name}"
     symbol_forecast = forecast_df[forecast_df['unique_id'] == symbol]
     
     if not symbol_forecast.empty:
@@ -135,7 +142,7 @@ def format_timegpt_forecast(forecast_df: pd.DataFrame, symbol: str, company_name
 
 
 class TwelveDataHandler:
-    def __init__(self, symbols_list: Optional[List[str]] = None, start_date: datetime = None, end_date: datetime = None, max_missing_data: float = None, data_folder: str = None):
+    def __init__(self, symbols_list: Optional[List[str]] = None, start_date: datetime = None, end_date: datetime = None, max_missing_data: float = None, data_folder: str = None, persist: bool = True):
 
         self.symbols = symbols_list if symbols_list is not None else settings.SYMBOLS
         if start_date is None or end_date is None or max_missing_data is None or data_folder is None:
@@ -145,22 +152,16 @@ class TwelveDataHandler:
         self.end_date = end_date
         self.max_missing_data = max_missing_data
         self.data_folder = data_folder
+        # Without persistence the series are only combined in memory
+        self.persist = persist
 
         self.market_dates = obtain_business_dates(start_date=self.start_date, end_date=self.end_date)
         self.symbol_data = {}
 
 
     def fetch_data_with_std_check(self, ticker: str) -> pd.DataFrame:
-        # Calculate the period needed based on nb_years from TIME_SERIES_DEFAULTS
-        nb_years = settings.TIME_SERIES_DEFAULTS["nb_years"]
-        period_map = {
-            1: "12mo",
-            2: "24mo", 
-            3: "36mo",
-            4: "48mo",
-            5: "60mo"
-        }
-        period = period_map.get(nb_years, f"{nb_years * 12}mo")
+        # Lookback reaching the start date, whose first market date has to be in the data
+        period = f"{(datetime.today() - self.start_date).days + 1}d"
         
         # Use TwelveDataManager to get data
         data = twelve_data_manager.get_time_series_data(ticker, interval="1day", period=period)
@@ -168,8 +169,8 @@ class TwelveDataHandler:
         if data.empty:
             raise ValueError(f"No data fetched for ticker {ticker}.")
             
-        # Reset index to get dates as a column
-        data.reset_index(inplace=True)
+        # Reset index to get dates as a column, without modifying the manager's cached frame
+        data = data.reset_index()
         
         # Rename columns to match Yahoo Finance format
         data.rename(columns={'datetime': 'ds'}, inplace=True)
@@ -272,11 +273,12 @@ class TwelveDataHandler:
         return self.combined_df
 
     def combine_data(self):
-        # Save individual symbol dataframes to CSV
+        # Save individual symbol dataframes as typed pickles, the bar store owns the per-symbol bar files
         self.combined_df = pd.DataFrame()  # Create empty DataFrame
-        for symbol, df in self.symbol_data.items():
-            file_path = os.path.join(self.data_folder, f'{symbol.lower()}.csv')
-            df.to_csv(file_path, index=False)
+        if self.persist:
+            for symbol, df in self.symbol_data.items():
+                file_path = os.path.join(self.data_folder, f'{symbol.lower()}_timegpt.pkl')
+                df.to_pickle(file_path)
 
         dataframes = list(self.symbol_data.values())
         if not dataframes:
@@ -291,11 +293,11 @@ class TwelveDataHandler:
         self.combined_df = pd.concat(dataframes, ignore_index=True)
         self.combined_df = self.combined_df.sort_values(by='ds').reset_index(drop=True)
 
-        market_calendar = obtain_market_schedule(start_date=self.start_date, end_date=self.end_date)
-        last_trading_date = pd.to_datetime(market_calendar.index[-1])
+        last_trading_date = pd.Timestamp(trading_calendar.latest_session(self.end_date))
         self.combined_df = self.combined_df[pd.to_datetime(self.combined_df['ds']) <= last_trading_date]
         self.combined_df = self.combined_df.drop_duplicates(subset=['ds', 'unique_id'], keep='first')
 
-        combined_file_path = os.path.join(self.data_folder, 'combined.csv')
-        self.combined_df.to_csv(combined_file_path, index=False)
+        if self.persist:
+            combined_file_path = os.path.join(self.data_folder, 'combined.pkl')
+            self.combined_df.to_pickle(combined_file_path)
        
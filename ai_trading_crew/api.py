@@ -0,0 +1,55 @@
+"""
+In-process Python API returning the structured analyses of the symbols.
+By default no inputs, forecasts, reports or logs are written to disk, the summaries and recommendations
+are returned in memory. The market data fetched from Twelve Data is still cached in the bar store
+(resources/data), shared with the command line runs, so a later fetch only requests the new bars.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from ai_trading_crew.config import settings
+from ai_trading_crew.main import stream_recommendations
+from ai_trading_crew.results import SymbolAnalysis
+from ai_trading_crew.utils.dates import DateContext
+
+
+async def analyze_symbols(
+    symbols: Optional[List[str]] = None,
+    persist: bool = False,
+    dates: Optional[DateContext] = None
+) -> Dict[str, SymbolAnalysis]:
+    """
+    Analyze symbols with the full pipeline and return their analyses.
+
+    Args:
+        symbols: Symbols to analyze (settings.SYMBOLS by default)
+        persist: Also write the inputs, forecasts, reports and logs to disk as the command line runs do
+        dates: DateContext of the run (optional, computed now by default)
+
+    Returns:
+        dict: SymbolAnalysis by symbol, in the order of the symbols. Failed symbols are left out.
+    """
+    symbols = symbols or settings.SYMBOLS
+    analyses = {}
+    async for recommendation in stream_recommendations(symbols, dates=dates, persist=persist):
+        if recommendation.error:
+            print(f"{recommendation.symbol} failed: {recommendation.error}")
+            continue
+        analyses[recommendation.symbol] = recommendation.analysis
+    return {symbol: analyses[symbol] for symbol in symbols if symbol in analyses}
+
+
+async def analyze_symbol(symbol: str, persist: bool = False, dates: Optional[DateContext] = None) -> Optional[SymbolAnalysis]:
+    """Analyze a single symbol, None if it failed"""
+    analyses = await analyze_symbols([symbol], persist=persist, dates=dates)
+    return analyses.get(symbol)
+
+
+def analyze_symbols_sync(
+    symbols: Optional[List[str]] = None,
+    persist: bool = False,
+    dates: Optional[DateContext] = None
+) -> Dict[str, SymbolAnalysis]:
+    """Synchronous wrapper of analyze_symbols for code without an event loop"""
+    return asyncio.run(analyze_symbols(symbols, persist=persist, dates=dates))
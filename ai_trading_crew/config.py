@@ -5,6 +5,7 @@ from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from crewai import LLM
 from datetime import datetime, timedelta
+from ai_trading_crew.utils.llm_governor import LLMGovernor, GovernedLLM
 
 
 # Suppress Pydantic v2 deprecation warnings from dependencies
@@ -70,6 +71,138 @@ class Settings(BaseSettings):
         default=500,
         description="Maximum number of social media posts to fetch per symbol."
     )
+    FETCH_MAX_WORKERS: int = Field(
+        default=16,
+        description="Maximum number of threads used to run the blocking data fetchers."
+    )
+    FETCH_SOURCE_LIMITS: dict = Field(
+        default={
+            "company_info": 4,
+            "headlines": 4,
+            "technical_indicators": 4,
+            "fundamentals": 4,
+            "stocktwits": 2,
+        },
+        description="Maximum number of concurrent fetches per data source."
+    )
+    LLM_REQUESTS_PER_MINUTE: int = Field(
+        default=500,
+        description="Requests per minute admitted to the LLM provider across all crews."
+    )
+    LLM_TOKENS_PER_MINUTE: int = Field(
+        default=200000,
+        description="Estimated prompt tokens per minute admitted to the LLM provider across all crews."
+    )
+    MAX_CONCURRENT_SYMBOLS: int = Field(
+        default=8,
+        description="Maximum number of symbols processed at the same time, the highest-priority symbols are dispatched first."
+    )
+    PRIORITY_WEIGHTS: dict = Field(
+        default={
+            "overnight_gap": 2.0,
+            "volatility": 1.0,
+            "volume_spike": 1.0,
+        },
+        description="Weights of the signals (in %, volume spike as a ratio) ranking the symbols from their cached bars."
+    )
+    RESOURCE_POOL_LIMITS: dict = Field(
+        default={
+            "http": 16,
+            "browser": 4,
+            "llm": 8,
+            "twelve_data": 4,
+        },
+        description="Maximum concurrent users of each shared resource: HTTP fetches, browser crawls, LLM crews and Twelve Data requests. "
+                    "The llm pool only bounds the crews of universe mode, the LLM_GOVERNOR paces the LLM calls of every mode."
+    )
+    TWELVE_DATA_CREDITS_PER_MINUTE: int = Field(
+        default=8,
+        description="API credits per minute of the Twelve Data plan, requests are scheduled to stay within them."
+    )
+    TWELVE_DATA_ENDPOINT_CREDITS: dict = Field(
+        default={
+            "time_series": 1,
+            "quote": 1,
+        },
+        description="API credits charged per symbol by each Twelve Data endpoint, 1 for unlisted endpoints."
+    )
+    TWELVE_DATA_HTTP_LIMITS: dict = Field(
+        default={
+            "max_connections": 20,
+            "max_keepalive_connections": 10,
+            "keepalive_expiry": 30.0,
+        },
+        description="Connection pool of the Twelve Data clients: maximum connections, idle keep-alive connections and their expiry in seconds."
+    )
+    TWELVE_DATA_HTTP_TIMEOUT: float = Field(
+        default=30.0,
+        description="Timeout in seconds of a Twelve Data request."
+    )
+    TWELVE_DATA_BATCH_SIZE: int = Field(
+        default=50,
+        description="Maximum number of symbols per batched Twelve Data time series or quote request."
+    )
+    MEMORY_CACHE_MAX_ENTRIES: int = Field(
+        default=1024,
+        description="Maximum number of entries of the in-memory market data cache, the least recently used ones are evicted first."
+    )
+    MEMORY_CACHE_TTLS: dict = Field(
+        default={"time_series": 300, "quote": 300, "company_name": 86400, "vix": 300},
+        description="Seconds the in-memory market data cache keeps the entries of each namespace, None to keep them until evicted."
+    )
+    INTRADAY_BUFFER_BARS: int = Field(
+        default=2000,
+        description="Number of recent bars kept in memory per symbol and intraday interval, refreshed with the newest bars on each poll."
+    )
+    UNIVERSE_WAVE_SIZE: int = Field(
+        default=25,
+        description="Number of symbols per wave in universe mode."
+    )
+    DAEMON_RUN_TIMES: List[str] = Field(
+        default=["08:45", "12:00"],
+        description="Times (HH:MM, US/Eastern) of the daemon runs on each trading day."
+    )
+    SHARD_WORKERS: int = Field(
+        default=4,
+        description="Number of worker processes of a sharded run."
+    )
+    SHARD_SYMBOLS_PER_WORKER: int = Field(
+        default=2,
+        description="Number of symbols each worker process of a sharded run processes at the same time."
+    )
+    SHARD_CLAIM_TIMEOUT: int = Field(
+        default=3600,
+        description="Seconds after which a symbol claimed by a silent worker can be claimed by another one."
+    )
+    SHARD_MAX_RESTARTS: int = Field(
+        default=3,
+        description="Maximum number of worker restarts during a sharded run."
+    )
+    PARALLEL_SUMMARY_TASKS: bool = Field(
+        default=True,
+        description="Run the independent summarization tasks of a symbol at the same time instead of sequentially."
+    )
+    STAGE_TIMEOUTS: dict = Field(
+        default={
+            "company_name": 30,
+            "headlines": 120,
+            "articles_picker": 300,
+            "stock_news": 300,
+            "technical_indicators": 180,
+            "fundamentals": 180,
+            "stocktwits": 120,
+            "timegpt": 60
+        },
+        description="Deadline in seconds of each data-gathering stage, a stage past its deadline continues with a data unavailable placeholder."
+    )
+    INCREMENTAL_RERUNS: bool = Field(
+        default=True,
+        description="Skip the fetches and LLM tasks whose inputs are unchanged since their output was stored for the day."
+    )
+    INCREMENTAL_FETCH_MAX_AGE: int = Field(
+        default=3600,
+        description="Maximum age in seconds of a stored fetch result reused by an incremental re-run."
+    )
     TECHNICAL_INDICATOR_DEFAULTS: dict = Field(
         default={
             "adx_time_period": 21,
@@ -122,11 +255,12 @@ def get_env_var(var_name: str) -> str:
 
 
 def create_default_llm(api: str, model: str, url: str) -> LLM:
-    return LLM(
+    return GovernedLLM(
         api_key=get_env_var(api),
         model=get_env_var(model),
         base_url=get_env_var(url),
-        temperature=0.0
+        temperature=0.0,
+        governor=LLM_GOVERNOR
     )
 
 
@@ -144,6 +278,13 @@ def extract_provider_name(model_name: str) -> str:
     raise ValueError(f"Model name '{model_name}' does not start with a valid provider: {', '.join(VALID_PROVIDERS)}")
 
 
+# Instantiate settings object
+settings = Settings()
+
+# Every LLM shares the same governor so the provider limits hold across all crews
+LLM_GOVERNOR = LLMGovernor(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE)
+
+
 # OpenAI GPT-5 mini is used for all LLM operations in the system
 
 DEFAULT_PROJECT_LLM = "OPENAI_GPT_5_MINI"
@@ -177,7 +318,4 @@ PROJECT_LLM = create_default_llm(
     f"{provider_name}_API_KEY",
     DEFAULT_PROJECT_LLM,
     f"{provider_name}_BASE_URL"
-)
-
-# Instantiate settings object
-settings = Settings()
\ No newline at end of file
+)
\ No newline at end of file
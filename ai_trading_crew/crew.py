@@ -1,6 +1,11 @@
 from crewai import Agent, Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
 from crewai.project import CrewBase, agent, crew, task
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+import asyncio
 import os
+from contextlib import nullcontext
 import yaml
 from ai_trading_crew.config import (
     settings,
@@ -13,33 +18,151 @@ from ai_trading_crew.config import (
     RELEVANT_ARTICLES_FILE,
     LOG_FOLDER,
 )
-from ai_trading_crew.utils.dates import get_today_str, get_yesterday_str, get_today_str_no_min
+from ai_trading_crew.utils.dates import DateContext
+from ai_trading_crew.utils.stage_cache import get_stage_manifest, task_fingerprint, reuse_task_outputs
+from ai_trading_crew.utils.tracing import tracer
+from ai_trading_crew.utils.resource_pools import resource_pools, bound_llm_crews
+from ai_trading_crew.results import SUMMARY_FILES
 import inspect
 
-today_str = get_today_str()
-yesterday_str = get_yesterday_str()
-today_str_no_min = get_today_str_no_min()
-yesterday_str = get_yesterday_str()
 YESTERDAY_HOUR = "18:00"  # 6 PM EST
 HISTORICAL_DAYS = 30
 
 
-def ensure_log_date_folder():
-	"""Ensure the log folder for today's date exists"""
+def ensure_log_date_folder(today_str_no_min):
+	"""Ensure the log folder for the run date exists and return it"""
 	log_date_folder = os.path.join(LOG_FOLDER, today_str_no_min)
 	if not os.path.exists(log_date_folder):
 		os.makedirs(log_date_folder)
 	return log_date_folder
 
 
+def merge_crew_outputs(crew_outputs) -> CrewOutput:
+	"""Merge the outputs of crews run side by side into one output, the last crew giving the final result"""
+	tasks_output = []
+	token_usage = UsageMetrics()
+	for crew_output in crew_outputs:
+		tasks_output.extend(crew_output.tasks_output)
+		if crew_output.token_usage:
+			token_usage.add_usage_metrics(crew_output.token_usage)
+	final_output = crew_outputs[-1]
+	return CrewOutput(
+		raw=final_output.raw,
+		pydantic=final_output.pydantic,
+		json_dict=final_output.json_dict,
+		tasks_output=tasks_output,
+		token_usage=token_usage
+	)
+
+
+def task_stage_name(stage_task: Task) -> str:
+	"""Manifest name of a task, its output file is unique within a symbol run"""
+	return f"task:{os.path.basename(stage_task.output_file)}"
+
+
+def task_label(stage_task: Task) -> str:
+	"""Short name of a task for the traces"""
+	if stage_task.output_file:
+		return os.path.splitext(os.path.basename(stage_task.output_file))[0]
+	return stage_task.name or "task"
+
+
+def load_cached_task_output(stage_task: Task, inputs, manifest):
+	"""
+	Rebuild the output of a task from its stored output file when its fingerprint is unchanged.
+	Returns None when the task has to run.
+	"""
+	if manifest is None or not stage_task.output_file or not reuse_task_outputs.get():
+		return None
+	if not manifest.is_fresh(task_stage_name(stage_task), task_fingerprint(stage_task, inputs)):
+		return None
+	with open(stage_task.output_file, "r", encoding="utf-8") as f:
+		raw = f.read()
+	stage_task.output = TaskOutput(
+		description=stage_task.description,
+		name=stage_task.name,
+		expected_output=stage_task.expected_output,
+		raw=raw,
+		agent=stage_task.agent.role
+	)
+	return stage_task.output
+
+
+async def kickoff_incremental(crew_tasks, inputs, manifest, output_log_file) -> CrewOutput:
+	"""
+	Run tasks as a sequential crew, reusing the stored outputs of the leading tasks whose inputs are unchanged.
+	Tasks without an explicit context read the outputs of the tasks before them, as in a sequential crew.
+	Without a manifest every task runs.
+	"""
+	for index, stage_task in enumerate(crew_tasks):
+		if not isinstance(stage_task.context, list):
+			stage_task.context = crew_tasks[:index]
+
+	span_name = "crew." + "+".join(task_label(stage_task) for stage_task in crew_tasks)
+	with tracer.span(span_name) as span:
+		cached_outputs = []
+		for stage_task in crew_tasks:
+			task_output = await asyncio.to_thread(load_cached_task_output, stage_task, inputs, manifest)
+			if task_output is None:
+				break
+			print(f"Skipping {task_stage_name(stage_task)}: inputs unchanged since the last run")
+			cached_outputs.append(task_output)
+
+		crew_outputs = []
+		if cached_outputs:
+			crew_outputs.append(CrewOutput(raw=cached_outputs[-1].raw, tasks_output=cached_outputs, token_usage=UsageMetrics()))
+
+		remaining_tasks = crew_tasks[len(cached_outputs):]
+		span.set(cached_tasks=len(cached_outputs), cache_hit=not remaining_tasks)
+		if remaining_tasks:
+			remaining_agents = []
+			for stage_task in remaining_tasks:
+				if all(stage_task.agent is not crew_agent for crew_agent in remaining_agents):
+					remaining_agents.append(stage_task.agent)
+			remaining_crew = Crew(
+				agents=remaining_agents,
+				tasks=remaining_tasks,
+				process=Process.sequential,
+				verbose=True,
+				output_log_file=output_log_file
+			)
+			# Universe mode bounds the crews in flight, the LLM governor paces the calls in every mode
+			async with resource_pools.slot("llm") if bound_llm_crews.get() else nullcontext():
+				crew_output = await remaining_crew.kickoff_async(inputs=inputs)
+			if crew_output.token_usage:
+				span.set(total_tokens=crew_output.token_usage.total_tokens)
+			crew_outputs.append(crew_output)
+			# The context outputs are known now, record each task with the inputs it ran with
+			for stage_task in remaining_tasks:
+				if manifest is None or not stage_task.output_file:
+					continue
+				await asyncio.to_thread(manifest.record, task_stage_name(stage_task), task_fingerprint(stage_task, inputs), [stage_task.output_file])
+
+	return merge_crew_outputs(crew_outputs)
+
+
 class BaseCrewClass:
 	"""Base class for all AI trading crews"""
 	
 	
-	def __init__(self, symbol, stocktwit_llm=DEFAULT_STOCKTWITS_LLM, technical_ind_llm=DEFAULT_TI_LLM):
+	def __init__(self, symbol, stocktwit_llm=DEFAULT_STOCKTWITS_LLM, technical_ind_llm=DEFAULT_TI_LLM, dates=None, persist=True):
 		self.symbol = symbol
 		self.stocktwit_llm = stocktwit_llm
 		self.technical_ind_llm = technical_ind_llm
+		self.dates = dates or DateContext.now()
+		self.persist = persist
+		# Without files there is nothing to reuse on a re-run
+		self.manifest = get_stage_manifest(self.dates.today_str_no_min, symbol) if persist else None
+
+	def output_path(self, path):
+		"""Path of a task output file, None when the outputs are only kept in memory"""
+		return path if self.persist else None
+
+	def log_path(self, filename):
+		"""Path of a crew log file in the log folder of the run date, None when nothing is written to disk"""
+		if not self.persist:
+			return None
+		return os.path.join(ensure_log_date_folder(self.dates.today_str_no_min), filename)
 
 
 
@@ -50,8 +173,8 @@ class AiArticlesPickerCrew(BaseCrewClass):
 	agents_config = 'config/agents_article.yaml'
 	tasks_config = 'config/tasks_article.yaml'
 
-	def __init__(self, symbol, stocktwit_llm=DEFAULT_STOCKTWITS_LLM, technical_ind_llm=DEFAULT_TI_LLM):
-		super().__init__(symbol, stocktwit_llm, technical_ind_llm)
+	def __init__(self, symbol, stocktwit_llm=DEFAULT_STOCKTWITS_LLM, technical_ind_llm=DEFAULT_TI_LLM, dates=None, persist=True):
+		super().__init__(symbol, stocktwit_llm, technical_ind_llm, dates, persist)
 
 	@agent
 	def relevant_news_filter_agent(self) -> Agent:
@@ -67,20 +190,29 @@ class AiArticlesPickerCrew(BaseCrewClass):
 		
 		return Task(
 			config=config,
-			output_file=os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f'{self.symbol}_{RELEVANT_ARTICLES_FILE}'),
+			output_file=self.output_path(os.path.join(AGENT_INPUTS_FOLDER, self.dates.today_str_no_min, f'{self.symbol}_{RELEVANT_ARTICLES_FILE}')),
 			verbose=True
 		)
 	
 	@crew
 	def crew(self) -> Crew:
 		"""Creates the AiTradingCrew crew"""
-		ensure_log_date_folder()
+		ensure_log_date_folder(self.dates.today_str_no_min)
 		return Crew(
 			agents=[self.relevant_news_filter_agent()],
 			tasks=[self.relevant_news_filter_task()],
 			process=Process.sequential,
 			verbose=True,
-			output_log_file=os.path.join(LOG_FOLDER, today_str_no_min, f"ai_articles_picker_{self.symbol}_{today_str_no_min}.log")
+			output_log_file=os.path.join(LOG_FOLDER, self.dates.today_str_no_min, f"ai_articles_picker_{self.symbol}_{self.dates.today_str_no_min}.log")
+		)
+
+	async def kickoff_async(self, inputs) -> CrewOutput:
+		"""Kick off the article picking, unless the headlines it reads are unchanged since the last run"""
+		return await kickoff_incremental(
+			[self.relevant_news_filter_task()],
+			inputs,
+			self.manifest,
+			self.log_path(f"ai_articles_picker_{self.symbol}_{self.dates.today_str_no_min}.log")
 		)
 
 @CrewBase
@@ -90,10 +222,11 @@ class StockComponentsSummarizeCrew(BaseCrewClass):
 	agents_config = 'config/agents.yaml'
 	tasks_config = 'config/tasks.yaml'
 
-	def __init__(self, symbol, stocktwit_llm=DEFAULT_STOCKTWITS_LLM, technical_ind_llm=DEFAULT_TI_LLM, additional_agents=None, additional_tasks=None):
-		super().__init__(symbol, stocktwit_llm, technical_ind_llm)
+	def __init__(self, symbol, stocktwit_llm=DEFAULT_STOCKTWITS_LLM, technical_ind_llm=DEFAULT_TI_LLM, additional_agents=None, additional_tasks=None, parallel=None, dates=None, persist=True):
+		super().__init__(symbol, stocktwit_llm, technical_ind_llm, dates, persist)
 		self.additional_agents = additional_agents or []
 		self.additional_tasks = additional_tasks or []
+		self.parallel = settings.PARALLEL_SUMMARY_TASKS if parallel is None else parallel
 
 	@agent
 	def news_summarizer_agent(self) -> Agent:
@@ -141,7 +274,7 @@ class StockComponentsSummarizeCrew(BaseCrewClass):
 	def news_summarization_task(self) -> Task:
 		return Task(
 			config=self.tasks_config['news_summarization_task'],
-			output_file=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, self.symbol, 'news_summary_report.md'),
+			output_file=self.output_path(os.path.join(AGENT_OUTPUTS_FOLDER, self.dates.today_str_no_min, self.symbol, 'news_summary_report.md')),
 			verbose=True,
 			
 		)
@@ -153,7 +286,7 @@ class StockComponentsSummarizeCrew(BaseCrewClass):
 		
 		return Task(
 			config=config,
-			output_file=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, self.symbol, 'sentiment_summary_report.md'),
+			output_file=self.output_path(os.path.join(AGENT_OUTPUTS_FOLDER, self.dates.today_str_no_min, self.symbol, 'sentiment_summary_report.md')),
 			llm=self.stocktwit_llm,
 			verbose=True
 		)
@@ -163,7 +296,7 @@ class StockComponentsSummarizeCrew(BaseCrewClass):
 		config = self.tasks_config['technical_indicator_summarization_task'].copy()
 		return Task(
 			config=config,
-			output_file=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, self.symbol, 'technical_indicator_summary_report.md'),
+			output_file=self.output_path(os.path.join(AGENT_OUTPUTS_FOLDER, self.dates.today_str_no_min, self.symbol, 'technical_indicator_summary_report.md')),
 			llm=self.technical_ind_llm,
 			verbose=True
 		)
@@ -173,7 +306,7 @@ class StockComponentsSummarizeCrew(BaseCrewClass):
 		config = self.tasks_config['fundamental_analysis_task'].copy()
 		return Task(
 			config=config,
-			output_file=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, self.symbol, 'fundamental_analysis_summary_report.md'),
+			output_file=self.output_path(os.path.join(AGENT_OUTPUTS_FOLDER, self.dates.today_str_no_min, self.symbol, 'fundamental_analysis_summary_report.md')),
 			llm=PROJECT_LLM,
 			verbose=True
 		)
@@ -183,48 +316,104 @@ class StockComponentsSummarizeCrew(BaseCrewClass):
 		config = self.tasks_config['timegpt_forecast_task'].copy()
 		return Task(
 			config=config,
-			output_file=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, self.symbol, 'timegpt_forecast_summary_report.md'),
+			output_file=self.output_path(os.path.join(AGENT_OUTPUTS_FOLDER, self.dates.today_str_no_min, self.symbol, 'timegpt_forecast_summary_report.md')),
 			verbose=True,
 		
 		)
 
 
-	@crew
-	def crew(self) -> Crew:
-		"""Creates the AiTradingCrew crew"""
-		ensure_log_date_folder()
-		# Combine main agents/tasks with additional ones
-		main_agents = [
+	def _main_agents(self):
+		return [
 			self.news_summarizer_agent(),
 			self.sentiment_summarizer_agent(),
 			self.technical_indicator_summarizer_agent(),
 			self.fundamental_analysis_agent(),
 			self.timegpt_analyst_agent()
 		]
-		main_tasks = [
+
+	def _main_tasks(self):
+		"""The summarization tasks, none of them reads the output of another"""
+		return [
 			self.news_summarization_task(),
 			self.sentiment_summarization_task(),
 			self.technical_indicator_summarization_task(),
 			self.fundamental_analysis_task(),
 			self.timegpt_forecast_task()
 		]
-		
-		all_agents = main_agents + self.additional_agents
-		all_tasks = main_tasks + self.additional_tasks
+
+	@crew
+	def crew(self) -> Crew:
+		"""Creates the AiTradingCrew crew"""
+		ensure_log_date_folder(self.dates.today_str_no_min)
+		# Combine main agents/tasks with additional ones
+		all_agents = self._main_agents() + self.additional_agents
+		all_tasks = self._main_tasks() + self.additional_tasks
 		
 		return Crew(
 			agents=all_agents,
 			tasks=all_tasks,
 			process=Process.sequential,  # Keep sequential for proper dependency handling
 			verbose=True,
-			output_log_file=os.path.join(LOG_FOLDER, today_str_no_min, f"stock_components_summarize_{self.symbol}_{today_str_no_min}.log")
+			output_log_file=os.path.join(LOG_FOLDER, self.dates.today_str_no_min, f"stock_components_summarize_{self.symbol}_{self.dates.today_str_no_min}.log")
 		)
 
-class DayTraderAdvisorCrew:
+	async def kickoff_async(self, inputs) -> CrewOutput:
+		"""
+		Kick off the summarization.
+		In parallel mode every summarization task runs in its own crew at the same time, then the
+		additional tasks run in order with the summaries as context, as they would in the sequential crew.
+		Tasks whose inputs are unchanged since their output was stored are skipped.
+		"""
+		main_tasks = self._main_tasks()
+		if not self.parallel:
+			return await kickoff_incremental(
+				main_tasks + self.additional_tasks,
+				inputs,
+				self.manifest,
+				self.log_path(f"stock_components_summarize_{self.symbol}_{self.dates.today_str_no_min}.log")
+			)
+
+		crew_outputs = list(await asyncio.gather(*[
+			kickoff_incremental(
+				[summary_task],
+				inputs,
+				self.manifest,
+				self.log_path(f"stock_components_summarize_{self.symbol}_{summary_task.name}_{self.dates.today_str_no_min}.log")
+			)
+			for summary_task in main_tasks
+		]))
+
+		if self.additional_tasks:
+			for index, additional_task in enumerate(self.additional_tasks):
+				additional_task.context = main_tasks + self.additional_tasks[:index]
+			crew_outputs.append(await kickoff_incremental(
+				self.additional_tasks,
+				inputs,
+				self.manifest,
+				self.log_path(f"stock_components_summarize_{self.symbol}_additional_{self.dates.today_str_no_min}.log")
+			))
+
+		return merge_crew_outputs(crew_outputs)
+
+	def summary_outputs(self):
+		"""
+		Raw outputs of the summarization tasks once the crew has run, keyed news, sentiment, technical,
+		fundamental and timegpt. Additional tasks are keyed by their name without the _task suffix.
+		"""
+		summaries = {
+			name: summary_task.output.raw
+			for name, summary_task in zip(SUMMARY_FILES, self._main_tasks())
+		}
+		for additional_task in self.additional_tasks:
+			name = (additional_task.name or task_label(additional_task)).removesuffix("_task")
+			summaries[name] = additional_task.output.raw
+		return summaries
+
+class DayTraderAdvisorCrew(BaseCrewClass):
 	"""Day Trader Advisor crew for making trading recommendations based on summaries"""
 	
-	def __init__(self, symbol):
-		self.symbol = symbol
+	def __init__(self, symbol, dates=None, persist=True):
+		super().__init__(symbol, dates=dates, persist=persist)
 		# Load configurations
 		config_dir = os.path.join(os.path.dirname(__file__), 'config')
 		
@@ -247,17 +436,26 @@ class DayTraderAdvisorCrew:
 			description=task_config['description'],
 			expected_output=task_config['expected_output'],
 			agent=self.day_trader_advisor_agent(),
-			output_file=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, self.symbol, 'day_trading_recommendation.md'),
+			output_file=self.output_path(os.path.join(AGENT_OUTPUTS_FOLDER, self.dates.today_str_no_min, self.symbol, 'day_trading_recommendation.md')),
 			verbose=True
 		)
 
 	def crew(self) -> Crew:
 		"""Creates the Day Trader Advisor crew"""
-		ensure_log_date_folder()
+		ensure_log_date_folder(self.dates.today_str_no_min)
 		return Crew(
 			agents=[self.day_trader_advisor_agent()],
 			tasks=[self.day_trader_recommendation_task()],
 			process=Process.sequential,
 			verbose=True,
-			output_log_file=os.path.join(LOG_FOLDER, today_str_no_min, f"day_trader_advisor_{self.symbol}_{today_str_no_min}.log")
+			output_log_file=os.path.join(LOG_FOLDER, self.dates.today_str_no_min, f"day_trader_advisor_{self.symbol}_{self.dates.today_str_no_min}.log")
+		)
+
+	async def kickoff_async(self, inputs) -> CrewOutput:
+		"""Kick off the recommendation, unless the summaries it reads are unchanged since the last run"""
+		return await kickoff_incremental(
+			[self.day_trader_recommendation_task()],
+			inputs,
+			self.manifest,
+			self.log_path(f"day_trader_advisor_{self.symbol}_{self.dates.today_str_no_min}.log")
 		)
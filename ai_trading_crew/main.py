@@ -6,12 +6,26 @@ import warnings
 import pytz
 import pandas as pd
 import datetime
-from ai_trading_crew.config import settings
+import multiprocessing
+import time
+from contextlib import aclosing
+from ai_trading_crew.config import settings, LLM_GOVERNOR, OUTPUT_FOLDER, LOG_FOLDER
 from ai_trading_crew.analysts.market_overview import HistoricalMarketFetcher
 from ai_trading_crew.market_overview_agents import MarketOverviewAnalyst
-from ai_trading_crew.stock_processor import process_stock_symbol_sync as process_stock_symbol, process_stock_symbol as process_stock_symbol_async
+from ai_trading_crew.stock_processor import process_stock_symbol_sync as process_stock_symbol, process_stock_symbol as process_stock_symbol_async, replay_stock_symbol
 from ai_trading_crew.crew import StockComponentsSummarizeCrew
 from ai_trading_crew.analysts.timegpt import get_timegpt_forecast
+from ai_trading_crew.utils.fetch_executor import fetch_executor
+from ai_trading_crew.utils.work_queue import SymbolWorkQueue
+from ai_trading_crew.utils.dates import DateContext, get_today_str_no_min
+from ai_trading_crew.utils.tracing import tracer
+from ai_trading_crew.utils.symbol_priority import rank_symbols, format_ranking, dispatch_by_priority
+from ai_trading_crew.results import SymbolRecommendation
+from ai_trading_crew.utils.resource_pools import resource_pools, bound_llm_crews
+from ai_trading_crew.utils.stage_cache import reuse_task_outputs
+from ai_trading_crew.utils.twelve_data_manager import twelve_data_manager
+from ai_trading_crew.utils.memory_cache import market_data_cache
+from ai_trading_crew.utils.trading_calendar import trading_calendar
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -23,70 +37,518 @@ def run():
     asyncio.run(run_async_execution())
     
 
-async def run_async_execution():
-    """
-    Run the crew asynchronously with concurrent processing.
+async def run_market_overview(dates=None, persist=True, timegpt_forecasts=None):
     """
+    Gather the market-wide data and process the market overview symbol with the market overview agent.
+    The TimeGPT forecasts of the run are loaded from the day's pickle unless given.
     
-    vix_data = HistoricalMarketFetcher().get_vix(days=30)
-    global_market_data = HistoricalMarketFetcher().get_global_market(days=30)
+    Returns:
+        SymbolAnalysis: The market overview summaries, read by the day trader advisor of every symbol
+    """
+    market_fetcher = HistoricalMarketFetcher()
+    with tracer.span("market_data", symbol=settings.STOCK_MARKET_OVERVIEW_SYMBOL):
+        vix_data, global_market_data = await asyncio.gather(
+            fetch_executor.run("market_data", market_fetcher.get_vix, days=30),
+            fetch_executor.run("market_data", market_fetcher.get_global_market, days=30)
+        )
     
     # Create market overview analyst for additional agents/tasks
-    market_analyst = MarketOverviewAnalyst()
+    market_analyst = MarketOverviewAnalyst(dates=dates, persist=persist)
     market_agent, market_task = market_analyst.get_agent_and_task()
     
-    # Get TimeGPT forecasts (calls API once per day, uses cache thereafter)
-    timegpt_forecasts = get_timegpt_forecast()
-    
-    # Process market overview first
-    await process_stock_symbol_async(
+    return await process_stock_symbol_async(
         settings.STOCK_MARKET_OVERVIEW_SYMBOL,
         vix_data=vix_data,
         global_market_data=global_market_data,
         additional_agents=[market_agent],
-        additional_tasks=[market_task]
+        additional_tasks=[market_task],
+        dates=dates,
+        persist=persist,
+        timegpt_forecasts=timegpt_forecasts
     )
+
+
+async def prefetch_market_data(symbols, include_quotes=True):
+    """
+    Fetch the daily bars and quotes of the symbols with batched Twelve Data requests sent
+    concurrently from the event loop, so the per-symbol fetchers read them from the cache.
+    """
+    try:
+        with tracer.span("prefetch_market_data", symbols=len(symbols)):
+            await twelve_data_manager.prefetch_async(symbols, include_quotes=include_quotes)
+    except Exception as e:
+        # The per-symbol fetchers fetch whatever is missing
+        print(f"Error prefetching market data: {e}")
+
+
+async def run_async_execution(dates=None):
+    """
+    Run the crew asynchronously with concurrent processing.
     
-    # Process individual symbols concurrently for maximum performance
-    tasks = []
-    for symbol in settings.SYMBOLS:
-        task = process_stock_symbol_async(symbol)
-        tasks.append(task)
+    Args:
+        dates: DateContext shared by every crew of the run (optional, computed now by default)
+    """
+    dates = dates or DateContext.now()
+    tracer.start_run("run")
+    
+    try:
+        await run_symbols(dates)
+    finally:
+        write_run_trace(dates, "run")
     
-    # Wait for all symbol processing to complete
-    await asyncio.gather(*tasks)
+    print(LLM_GOVERNOR.format_stats())
+    print(twelve_data_manager.format_stats())
+    print(market_data_cache.format_stats())
+
+
+async def run_symbols(dates):
+    """
+    Process the market overview and the symbols, highest-priority symbols first.
+    """
+    failed = []
+    async for recommendation in stream_recommendations(dates=dates):
+        if recommendation.error:
+            print(f"{recommendation.symbol} failed: {recommendation.error}")
+            failed.append(recommendation.symbol)
+        else:
+            print(f"{recommendation.symbol}: {recommendation.signal} ({recommendation.confidence} confidence)")
+    
+    if failed:
+        raise RuntimeError(f"Processing failed for {', '.join(failed)}")
+
+
+async def stream_recommendations(symbols=None, dates=None, persist=True):
+    """
+    Process the market overview and the symbols, yielding each symbol's recommendation as soon
+    as its day trader advisor finishes.
+    
+    Args:
+        symbols: Symbols to process (settings.SYMBOLS by default), highest-priority symbols are dispatched first
+        dates: DateContext of the run (optional, computed now by default)
+        persist: Whether the inputs, reports and logs are written to disk, the results are returned either way
+    
+    Yields:
+        SymbolRecommendation: One per symbol in completion order, with error set if the symbol failed
+    """
+    dates = dates or DateContext.now()
+    symbols = symbols or settings.SYMBOLS
+    # Embedding callers get a run of their own, the command line runs already started theirs
+    owns_trace_run = tracer.current_run() is None
+    if owns_trace_run:
+        tracer.start_run("stream")
+    
+    try:
+        # Closed right away if the consumer stops early, so its pipelines are cancelled within the run
+        async with aclosing(_stream_recommendations(symbols, dates, persist)) as recommendations:
+            async for recommendation in recommendations:
+                yield recommendation
+    finally:
+        if owns_trace_run:
+            if persist:
+                write_run_trace(dates, "stream")
+            tracer.end_run()
+
+
+async def _stream_recommendations(symbols, dates, persist):
+    """Body of stream_recommendations, within its trace run"""
+    # Get TimeGPT forecasts before any symbol formats its own (calls API once per day, uses cache thereafter)
+    timegpt_forecasts = None
+    with tracer.span("timegpt_forecast"):
+        try:
+            timegpt_forecasts = await asyncio.to_thread(get_timegpt_forecast, list(symbols), persist=persist)
+        except Exception as e:
+            # The TimeGPT stages then report the forecast as unavailable
+            print(f"Error getting TimeGPT forecasts: {e}")
+    
+    # Process market overview alongside the individual symbols,
+    # only their day trader stage waits for the market overview summaries
+    market_overview = asyncio.ensure_future(run_market_overview(dates, persist, timegpt_forecasts))
+    
+    # Rank the symbols from their cached bars so the ones that matter at the open finish first
+    await prefetch_market_data(list(symbols) + [settings.STOCK_MARKET_OVERVIEW_SYMBOL])
+    ranking = rank_symbols(symbols)
+    print(format_ranking(ranking))
+    
+    try:
+        async for recommendation in stream_symbol_recommendations([symbol for symbol, _ in ranking], market_overview, dates, persist, timegpt_forecasts):
+            yield recommendation
+        # Surface a market overview failure even though every symbol has been reported
+        await market_overview
+    finally:
+        # The consumer stopped early, don't leave the market overview running unobserved
+        if not market_overview.done():
+            market_overview.cancel()
+        await twelve_data_manager.aclose()
+
+
+async def stream_symbol_recommendations(symbols, market_overview, dates, persist=True, timegpt_forecasts=None):
+    """
+    Process symbols in list order within the concurrency budget and yield their recommendations as they finish.
+    
+    Args:
+        symbols: Symbols in priority order
+        market_overview: Awaitable completing with the market overview analysis
+        dates: DateContext of the run
+        persist: Whether the inputs, reports and logs are written to disk
+        timegpt_forecasts: TimeGPT forecasts of the run (optional, loaded from the day's pickle by default)
+    """
+    completed = asyncio.Queue()
+    
+    async def process_symbol(symbol):
+        timings = {}
+        start = time.perf_counter()
+        try:
+            analysis = await process_stock_symbol_async(
+                symbol,
+                market_overview_ready=market_overview,
+                dates=dates,
+                timings=timings,
+                persist=persist,
+                timegpt_forecasts=timegpt_forecasts
+            )
+            timings["total"] = time.perf_counter() - start
+            recommendation = SymbolRecommendation.from_analysis(analysis)
+        except Exception as e:
+            timings["total"] = time.perf_counter() - start
+            recommendation = SymbolRecommendation(symbol=symbol, timings=timings, error=str(e))
+        await completed.put(recommendation)
+    
+    dispatch = asyncio.ensure_future(dispatch_by_priority(symbols, process_symbol))
+    try:
+        for _ in symbols:
+            yield await completed.get()
+        await dispatch
+    finally:
+        # The consumer stopped early, don't leave the pipelines running unobserved
+        if not dispatch.done():
+            dispatch.cancel()
+
+
+def run_universe():
+    """
+    Process a large universe of symbols in bounded waves.
+    Usage: run_universe [file with one symbol per line]
+    """
+    symbols = settings.SYMBOLS
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r") as f:
+            symbols = [line.strip().upper() for line in f if line.strip() and not line.startswith("#")]
+    asyncio.run(run_universe_async(symbols))
+
+
+async def run_universe_async(symbols, dates=None):
+    """
+    Process the symbols in waves of UNIVERSE_WAVE_SIZE, highest priority first.
+    A wave starts once the previous one has drained, so the resource pools never hold more than one
+    wave of queued work. Projected completion and pool utilization are reported after each wave.
+    """
+    dates = dates or DateContext.now()
+    tracer.start_run("universe")
+    resource_pools.reset()
+    # The crews started from here on, in this task and the ones it creates, wait for an "llm" slot
+    bound_llm_crews.set(True)
+    
+    # Quotes expire quickly, they are fetched wave by wave
+    await prefetch_market_data(symbols, include_quotes=False)
+    ranking = rank_symbols(symbols)
+    print(format_ranking(ranking))
+    ordered_symbols = [symbol for symbol, _ in ranking]
+    wave_size = settings.UNIVERSE_WAVE_SIZE
+    waves = [ordered_symbols[index:index + wave_size] for index in range(0, len(ordered_symbols), wave_size)]
+    
+    start = time.perf_counter()
+    processed = 0
+    failed = []
+    # Get TimeGPT forecasts of the universe before any symbol loads them
+    with tracer.span("timegpt_forecast"):
+        try:
+            # Hundreds of history fetches paced by the credit limiter, kept off the event loop
+            await asyncio.to_thread(get_timegpt_forecast, list(symbols))
+        except Exception as e:
+            # One unusable series fails the whole forecast, the TimeGPT stages then report the forecast as unavailable
+            print(f"Error getting TimeGPT forecasts for the universe: {e}")
+    
+    market_overview = asyncio.ensure_future(run_market_overview(dates))
+    try:
+        for wave_index, wave in enumerate(waves, 1):
+            print(f"Universe wave {wave_index}/{len(waves)}: {len(wave)} symbols")
+            await prefetch_market_data(wave)
+            async for recommendation in stream_symbol_recommendations(wave, market_overview, dates):
+                processed += 1
+                if recommendation.error:
+                    failed.append(recommendation.symbol)
+                    print(f"{recommendation.symbol} failed: {recommendation.error}")
+                else:
+                    print(f"{recommendation.symbol}: {recommendation.signal} ({recommendation.confidence} confidence)")
+            
+            elapsed = time.perf_counter() - start
+            remaining = len(ordered_symbols) - processed
+            projected_end = datetime.datetime.now() + datetime.timedelta(seconds=elapsed / processed * remaining)
+            print(
+                f"Universe progress: {processed}/{len(ordered_symbols)} symbols in {elapsed:.0f}s, "
+                f"{processed / elapsed * 60:.2f} symbols/min, projected completion at {projected_end.strftime('%H:%M:%S')}"
+            )
+            print(resource_pools.format_utilization())
+        
+        await market_overview
+    finally:
+        if not market_overview.done():
+            market_overview.cancel()
+        await twelve_data_manager.aclose()
+        write_run_trace(dates, "universe")
+    
+    print(LLM_GOVERNOR.format_stats())
+    print(twelve_data_manager.format_stats())
+    print(market_data_cache.format_stats())
+    if failed:
+        print(f"Universe run finished with {len(failed)} failed symbols: {', '.join(failed)}")
 
 
 async def run_async():
     """
     Run the crew asynchronously for better performance.
     """
+    dates = DateContext.now()
+    tracer.start_run("run")
     
-    # Keep only essential data as requested
-    vix_data = HistoricalMarketFetcher().get_vix(days=30)
-    global_market_data = HistoricalMarketFetcher().get_global_market(days=30)
+    try:
+        await run_symbols(dates)
+    finally:
+        write_run_trace(dates, "run")
     
-    # Create market overview analyst for additional agents/tasks
-    market_analyst = MarketOverviewAnalyst()
-    market_agent, market_task = market_analyst.get_agent_and_task()
+    print(LLM_GOVERNOR.format_stats())
+    print(twelve_data_manager.format_stats())
+    print(market_data_cache.format_stats())
+
+
+def write_run_trace(dates, run_name):
+    """
+    Write the JSON trace of the run to the log folder of the run date and print the slowest stages.
+    """
+    trace_path = os.path.join(LOG_FOLDER, dates.today_str_no_min, f"trace_{run_name}_{time.strftime('%H%M%S')}.json")
+    tracer.write_trace(trace_path)
+    print(tracer.format_summary())
+    print(f"Trace written to {trace_path}")
+
+
+def replay_offline():
+    """
+    Replay the LLM stages on the inputs saved in agents_inputs, without any network fetch.
+    Usage: replay_offline [--reuse-outputs] [YYYY-MM-DD] [SYMBOL ...]
+    Every task runs again, with --reuse-outputs the tasks whose inputs are unchanged since their stored output are skipped.
+    """
+    args = sys.argv[1:]
+    reuse_outputs = "--reuse-outputs" in args
+    args = [arg for arg in args if arg != "--reuse-outputs"]
+    run_date = args[0] if args else get_today_str_no_min()
+    symbols = args[1:] or settings.SYMBOLS
+    asyncio.run(replay_offline_async(run_date, symbols, reuse_outputs=reuse_outputs))
+
+
+async def replay_offline_async(run_date, symbols, reuse_outputs=False):
+    """
+    Replay the saved inputs of a run date for the market overview and the given symbols.
     
-    # Process market overview symbol first
-    await process_stock_symbol_async(
-        settings.STOCK_MARKET_OVERVIEW_SYMBOL,
-        vix_data=vix_data,
-        global_market_data=global_market_data,
-        additional_agents=[market_agent],
-        additional_tasks=[market_task]
+    Args:
+        run_date: Run date of the saved inputs (YYYY-MM-DD)
+        symbols: Symbols to replay
+        reuse_outputs: Skip the tasks whose inputs are unchanged since their stored output (INCREMENTAL_RERUNS still applies)
+    """
+    dates = DateContext.for_date(run_date)
+    tracer.start_run("replay")
+    start = time.perf_counter()
+    # Set before the crews start so every one of them inherits it
+    reuse_task_outputs.set(reuse_outputs)
+    
+    try:
+        market_analyst = MarketOverviewAnalyst(dates=dates)
+        market_agent, market_task = market_analyst.get_agent_and_task()
+        market_overview = asyncio.ensure_future(replay_stock_symbol(
+            settings.STOCK_MARKET_OVERVIEW_SYMBOL,
+            additional_agents=[market_agent],
+            additional_tasks=[market_task],
+            dates=dates
+        ))
+        
+        tasks = [market_overview]
+        for symbol in symbols:
+            tasks.append(replay_stock_symbol(symbol, market_overview_ready=market_overview, dates=dates))
+        await asyncio.gather(*tasks)
+    finally:
+        write_run_trace(dates, "replay")
+    
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(symbols)} symbols and the market overview of {run_date} in {elapsed:.2f}s ({len(symbols) / elapsed * 60:.2f} symbols/min)")
+    print(LLM_GOVERNOR.format_stats())
+
+
+def get_next_daemon_run(now):
+    """
+    Get the next scheduled run time after now, on a trading day, from the DAEMON_RUN_TIMES (US/Eastern).
+    """
+    est = pytz.timezone('US/Eastern')
+    for day_offset in range(8):
+        day = (now + datetime.timedelta(days=day_offset)).date()
+        if not trading_calendar.is_trading_day(day):
+            continue
+        for run_time in sorted(settings.DAEMON_RUN_TIMES):
+            hour, minute = (int(part) for part in run_time.split(":"))
+            run_at = est.localize(datetime.datetime.combine(day, datetime.time(hour, minute)))
+            if run_at > now:
+                return run_at
+    raise ValueError(f"No daemon run time found in {settings.DAEMON_RUN_TIMES}")
+
+
+def run_daemon():
+    """
+    Run the crew on a schedule in a long-running process.
+    Caches, LLM clients and calendars stay warm in memory between runs.
+    """
+    asyncio.run(run_daemon_async())
+
+
+async def run_daemon_async():
+    """
+    Wait for each scheduled run time and run the crew with a fresh date context.
+    """
+    est = pytz.timezone('US/Eastern')
+    while True:
+        next_run = get_next_daemon_run(datetime.datetime.now(est))
+        print(f"Next scheduled run at {next_run.strftime('%Y-%m-%d %H:%M %Z')}")
+        await asyncio.sleep(max(0.0, (next_run - datetime.datetime.now(est)).total_seconds()))
+        
+        try:
+            await run_async_execution(dates=DateContext.now())
+        except Exception as e:
+            # Keep the daemon alive, the next scheduled run starts from scratch
+            print(f"Scheduled run failed: {e}")
+
+
+def get_work_queue(run_date):
+    """
+    Get the work queue shared by the workers of a sharded run.
+    """
+    return SymbolWorkQueue(
+        os.path.join(OUTPUT_FOLDER, "work_queue.sqlite"),
+        run_date,
+        claim_timeout=settings.SHARD_CLAIM_TIMEOUT
     )
+
+
+def run_sharded():
+    """
+    Run the crew with the symbols split across worker processes through a local work queue.
+    Usage: run_sharded [number of workers]
+    """
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else settings.SHARD_WORKERS
+    run_date = get_today_str_no_min()
+    
+    # Get TimeGPT forecasts once, the workers load them from the cache
+    get_timegpt_forecast()
+    
+    # The market overview is a queue entry of its own so exactly one worker produces it,
+    # ahead of the individual symbols, which are claimed in priority order
+    symbols = [symbol for symbol in settings.SYMBOLS if symbol != settings.STOCK_MARKET_OVERVIEW_SYMBOL]
+    ranking = rank_symbols(symbols)
+    print(format_ranking(ranking))
+    work_queue = get_work_queue(run_date)
+    work_queue.enqueue([settings.STOCK_MARKET_OVERVIEW_SYMBOL], priority=len(ranking) + 1)
+    for rank, (symbol, _) in enumerate(ranking):
+        work_queue.enqueue([symbol], priority=len(ranking) - rank)
+    
+    context = multiprocessing.get_context("spawn")
+    
+    def start_worker(worker_index):
+        worker = context.Process(target=run_shard_worker, args=(worker_index, run_date, num_workers), name=f"shard-worker-{worker_index}")
+        worker.start()
+        return worker
+    
+    workers = {worker_index: start_worker(worker_index) for worker_index in range(num_workers)}
+    restarts = 0
+    
+    # Restart workers that die while symbols are left, they claim back their unfinished symbols
+    while any(worker.is_alive() for worker in workers.values()):
+        time.sleep(5)
+        for worker_index, worker in workers.items():
+            if worker.exitcode not in (None, 0) and work_queue.has_unfinished() and restarts < settings.SHARD_MAX_RESTARTS:
+                print(f"Worker {worker_index} exited with code {worker.exitcode}, restarting it")
+                restarts += 1
+                workers[worker_index] = start_worker(worker_index)
+    
+    print(f"Sharded run finished: {work_queue.counts()}")
+
+
+def shard_worker():
+    """
+    Start (or restart) a single worker of today's sharded run.
+    Usage: shard_worker <worker index> [number of workers]
+    """
+    num_workers = int(sys.argv[2]) if len(sys.argv) > 2 else settings.SHARD_WORKERS
+    run_shard_worker(int(sys.argv[1]), get_today_str_no_min(), num_workers)
+
+
+def run_shard_worker(worker_index, run_date, num_workers):
+    """
+    Process symbols claimed from the work queue until none is left.
+    """
+    asyncio.run(run_shard_worker_async(worker_index, run_date, num_workers))
+
+
+async def run_shard_worker_async(worker_index, run_date, num_workers):
+    """
+    Run several queue-consuming lanes concurrently in this worker process.
+    The Twelve Data plan and the LLM limits are shared evenly between the num_workers processes of the run.
+    """
+    work_queue = get_work_queue(run_date)
+    worker_id = f"worker-{worker_index}"
+    dates = DateContext.now()
+    market_overview_symbol = settings.STOCK_MARKET_OVERVIEW_SYMBOL
+    tracer.start_run(worker_id)
+    
+    # Symbols left claimed by a previous run of this worker are unfinished
+    work_queue.release_worker(worker_id)
+    
+    # Every worker process has its own credit schedule and LLM governor, share the limits between them
+    num_workers = max(num_workers, 1)
+    twelve_data_manager.rate_limiter.credits_per_minute = max(settings.TWELVE_DATA_CREDITS_PER_MINUTE // num_workers, 1)
+    LLM_GOVERNOR.set_limits(
+        max(settings.LLM_REQUESTS_PER_MINUTE // num_workers, 1),
+        max(settings.LLM_TOKENS_PER_MINUTE // num_workers, 1)
+    )
+    
+    # Whichever worker produces the market overview, the day trader stages here wait for it.
+    # If nobody is left to produce it (its worker died after the last restart), this worker takes it over.
+    market_overview_ready = asyncio.ensure_future(work_queue.wait_until_done(
+        market_overview_symbol,
+        worker=worker_id,
+        run_claimed=lambda: run_market_overview(dates)
+    ))
+    
+    async def consume_queue():
+        while True:
+            # The queue calls block on SQLite, keep them off the event loop
+            symbol = await asyncio.to_thread(work_queue.claim, worker_id)
+            if symbol is None:
+                return
+            try:
+                if symbol == market_overview_symbol:
+                    await run_market_overview(dates)
+                else:
+                    await process_stock_symbol_async(symbol, market_overview_ready=market_overview_ready, dates=dates)
+                await asyncio.to_thread(work_queue.complete, symbol)
+            except Exception as e:
+                print(f"Error processing {symbol} in {worker_id}: {e}")
+                await asyncio.to_thread(work_queue.fail, symbol, str(e))
     
-    # Process individual symbols concurrently for maximum performance
-    tasks = []
-    for symbol in settings.SYMBOLS:
-        task = process_stock_symbol_async(symbol)
-        tasks.append(task)
+    try:
+        await asyncio.gather(*[consume_queue() for _ in range(settings.SHARD_SYMBOLS_PER_WORKER)])
+    finally:
+        market_overview_ready.cancel()
+        write_run_trace(dates, worker_id)
     
-    # Wait for all symbol processing to complete
-    await asyncio.gather(*tasks)
+    print(LLM_GOVERNOR.format_stats())
+    print(twelve_data_manager.format_stats())
+    print(market_data_cache.format_stats())
 
 
 def train():
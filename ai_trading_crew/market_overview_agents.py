@@ -1,20 +1,19 @@
 from crewai import Agent, Task
 from ai_trading_crew.config import PROJECT_LLM, AGENT_OUTPUTS_FOLDER, settings
-from ai_trading_crew.utils.dates import get_today_str_no_min
+from ai_trading_crew.utils.dates import DateContext
 import yaml
 import os
 
 
-today_str_no_min = get_today_str_no_min()
-
-
 class MarketOverviewAnalyst:
     """Market Overview Analysis crew component"""
     
-    def __init__(self, symbol = settings.STOCK_MARKET_OVERVIEW_SYMBOL):
+    def __init__(self, symbol = settings.STOCK_MARKET_OVERVIEW_SYMBOL, dates=None, persist=True):
         """Initialize with config loading"""
         # Load configurations
         self.symbol = symbol
+        self.dates = dates or DateContext.now()
+        self.persist = persist
         config_dir = os.path.join(os.path.dirname(__file__), 'config')
         
         with open(os.path.join(config_dir, 'agents.yaml'), 'r') as f:
@@ -35,13 +34,17 @@ class MarketOverviewAnalyst:
         """Creates the market overview analysis task"""
         agent = self.market_overview_agent()
         task_config = self.tasks_config['market_overview_task']
+        output_file = None
+        if self.persist:
+            output_file = os.path.join(AGENT_OUTPUTS_FOLDER, self.dates.today_str_no_min, self.symbol, 'market_overview_summary_report.md')
         
         return Task(
+            name='market_overview_task',
             description=task_config['description'],
             expected_output=task_config['expected_output'],
             agent=agent,
             verbose=False,
-            output_file=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, self.symbol, 'market_overview_summary_report.md')
+            output_file=output_file
         )
 
     def get_agent_and_task(self):
@@ -0,0 +1,121 @@
+"""
+Structured per-symbol results of the pipeline.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from ai_trading_crew.config import AGENT_OUTPUTS_FOLDER
+
+
+SIGNALS = ["Very Bearish", "Bearish", "Neutral", "Bullish", "Very Bullish"]
+CONFIDENCE_LEVELS = ["High", "Medium", "Low"]
+
+RECOMMENDATION_FILE = "day_trading_recommendation.md"
+SUMMARY_FILES = {
+    "news": "news_summary_report.md",
+    "sentiment": "sentiment_summary_report.md",
+    "technical": "technical_indicator_summary_report.md",
+    "fundamental": "fundamental_analysis_summary_report.md",
+    "timegpt": "timegpt_forecast_summary_report.md",
+}
+# Only written for the market overview symbol
+MARKET_OVERVIEW_FILE = "market_overview_summary_report.md"
+
+# Longest signals first so that "Very Bullish" is not read as "Bullish"
+_SIGNAL_PATTERN = re.compile(
+    r"RECOMMENDATION[^A-Za-z]*(" + "|".join(sorted(SIGNALS, key=len, reverse=True)) + r")",
+    re.IGNORECASE
+)
+_CONFIDENCE_PATTERN = re.compile(
+    r"CONFIDENCE(?: LEVEL)?[^A-Za-z]*(" + "|".join(CONFIDENCE_LEVELS) + r")",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class SymbolAnalysis:
+    """Summaries and day trading recommendation of a symbol, as produced in memory by the pipeline"""
+    symbol: str
+    company_name: str
+    summaries: Dict[str, str]
+    recommendation: str
+    signal: Optional[str] = None
+    confidence: Optional[str] = None
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Folder of the report files, None when nothing was written to disk
+    output_dir: Optional[str] = None
+
+
+@dataclass
+class SymbolRecommendation:
+    """Day trading recommendation of a symbol, with where its reports are and how long each stage took"""
+    symbol: str
+    signal: Optional[str] = None
+    confidence: Optional[str] = None
+    recommendation_path: Optional[str] = None
+    summary_paths: Dict[str, str] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    analysis: Optional[SymbolAnalysis] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the symbol was processed and its recommendation parsed"""
+        return self.error is None and self.signal is not None
+
+    @classmethod
+    def from_analysis(cls, analysis: SymbolAnalysis) -> "SymbolRecommendation":
+        """Build the result of a processed symbol, with the paths of its reports when they were written"""
+        recommendation_path = None
+        summary_paths = {}
+        if analysis.output_dir:
+            recommendation_path = os.path.join(analysis.output_dir, RECOMMENDATION_FILE)
+            summary_paths = {name: os.path.join(analysis.output_dir, filename) for name, filename in SUMMARY_FILES.items()}
+        return cls(
+            symbol=analysis.symbol,
+            signal=analysis.signal,
+            confidence=analysis.confidence,
+            recommendation_path=recommendation_path,
+            summary_paths=summary_paths,
+            timings=dict(analysis.timings),
+            analysis=analysis,
+        )
+
+
+def parse_recommendation(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Parse the signal and the confidence level of a day trader recommendation.
+
+    Returns:
+        tuple: (signal, confidence), None for the parts that cannot be found
+    """
+    signal_match = _SIGNAL_PATTERN.search(text)
+    confidence_match = _CONFIDENCE_PATTERN.search(text)
+    signal = None
+    if signal_match:
+        signal = next(value for value in SIGNALS if value.lower() == signal_match.group(1).lower())
+    confidence = confidence_match.group(1).capitalize() if confidence_match else None
+    return signal, confidence
+
+
+def load_summaries(symbol: str, today_str_no_min: str) -> Dict[str, str]:
+    """
+    Read the summary reports of a symbol processed by another process.
+
+    Returns:
+        dict: The summaries keyed as in SUMMARY_FILES, plus market_overview when its report exists
+    """
+    output_dir = os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, symbol)
+    summaries = {}
+    for name, filename in SUMMARY_FILES.items():
+        with open(os.path.join(output_dir, filename), "r", encoding="utf-8") as f:
+            summaries[name] = f.read()
+    market_overview_path = os.path.join(output_dir, MARKET_OVERVIEW_FILE)
+    if os.path.exists(market_overview_path):
+        with open(market_overview_path, "r", encoding="utf-8") as f:
+            summaries["market_overview"] = f.read()
+    return summaries
@@ -4,24 +4,32 @@ import datetime
 import os
 import pandas as pd
 import pickle
-from ai_trading_crew.crew import StockComponentsSummarizeCrew, AiArticlesPickerCrew, DayTraderAdvisorCrew
+import time
+from ai_trading_crew.crew import StockComponentsSummarizeCrew, AiArticlesPickerCrew, DayTraderAdvisorCrew, HISTORICAL_DAYS
 from ai_trading_crew.analysts.social import get_stocktwits_context
 from ai_trading_crew.analysts.technical_indicators import get_ti_context
 from ai_trading_crew.utils.company_info import get_company_name
 from ai_trading_crew.analysts.fundamental_analysis import get_fundamental_context
 from ai_trading_crew.analysts.timegpt import format_timegpt_forecast
 from ai_trading_crew.config import settings, RELEVANT_ARTICLES_FILE, AGENT_INPUTS_FOLDER, AGENT_OUTPUTS_FOLDER
-from ai_trading_crew.utils.dates import get_today_str, get_yesterday_str, get_yesterday_18_est, get_today_str_no_min
+from ai_trading_crew.utils.dates import DateContext, get_today_str_no_min
 from ai_trading_crew.analysts.stock_headlines_fetcher import get_news_context
 from ai_trading_crew.analysts.stock_articles_fetcher import get_stock_news
+from ai_trading_crew.utils.fetch_executor import fetch_executor
+from ai_trading_crew.utils.stage_graph import StageGraph
+from ai_trading_crew.utils.llm_governor import llm_schedule_key
+from ai_trading_crew.utils.stage_cache import get_stage_manifest, fingerprint
+from ai_trading_crew.utils.tracing import tracer, annotate_span
+from ai_trading_crew.utils.resource_pools import resource_pools
+from ai_trading_crew.results import SymbolAnalysis, load_summaries, parse_recommendation
 
 
-def load_timegpt_forecasts():
+def load_timegpt_forecasts(today_str_no_min=None):
     """
-    Load TimeGPT forecasts from pickle file in agents_inputs folder with current date.
+    Load TimeGPT forecasts from pickle file in agents_inputs folder with the run date (current date by default).
     If the file doesn't exist, return an empty DataFrame.
     """
-    today_str_no_min = get_today_str_no_min()
+    today_str_no_min = today_str_no_min or get_today_str_no_min()
     input_dir = os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min)
     pickle_file = os.path.join(input_dir, "timegpt_forecasts.pkl")
     
@@ -34,7 +42,72 @@ def load_timegpt_forecasts():
         return pd.DataFrame()
 
 
-async def process_stock_symbol(symbol, vix_data={}, global_market_data={}, additional_agents=None, additional_tasks=None):
+def save_agent_input(today_str_no_min, filename, content):
+    """Save a crew input to the agents_inputs folder of the given date"""
+    with open(os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, filename), "w") as f:
+        f.write(content)
+
+
+def load_agent_input(today_str_no_min, filename, default=None):
+    """
+    Load a crew input saved in the agents_inputs folder of the given date.
+    Raises FileNotFoundError if it was not saved and no default is given.
+    """
+    file_path = os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, filename)
+    if not os.path.exists(file_path):
+        if default is not None:
+            return default
+        raise FileNotFoundError(f"Saved input {file_path} not found, run the full pipeline for this date first")
+    with open(file_path, "r") as f:
+        return f.read()
+
+
+def load_saved_inputs(symbol, dates):
+    """
+    Rebuild the summarization crew inputs of a symbol from the files saved by a previous run.
+    
+    Args:
+        symbol: Stock symbol
+        dates: DateContext of the saved run
+    
+    Returns:
+        dict: The inputs of the StockComponentsSummarizeCrew
+    """
+    today_str_no_min = dates.today_str_no_min
+    return {
+        'company_name': load_agent_input(today_str_no_min, f"{symbol}_company_name.txt", default=symbol),
+        'stocktwits_data': load_agent_input(today_str_no_min, f"{symbol}_stocktwits.txt"),
+        'technical_indicator_data': load_agent_input(today_str_no_min, f"{symbol}_technical_indicators.txt"),
+        'fundamental_analysis_data': load_agent_input(today_str_no_min, f"{symbol}_fundamental_analysis.txt"),
+        'timegpt_forecast': load_agent_input(today_str_no_min, f"{symbol}_timegpt_forecast.txt"),
+        'stock_headlines': load_agent_input(today_str_no_min, f"{symbol}_market_headlines.txt"),
+        'stock_news': load_agent_input(today_str_no_min, f"{symbol}_stock_news.txt"),
+        'vix_data': load_agent_input(today_str_no_min, f"{symbol}_vix_data.txt", default={}),
+        'global_market_data': load_agent_input(today_str_no_min, f"{symbol}_global_market_data.txt", default={}),
+        'today_str': dates.today_str,
+        'historical_days': HISTORICAL_DAYS
+    }
+
+
+def data_unavailable(description):
+    """
+    Fallback of a data-gathering stage: a clearly marked placeholder telling the agents the data is missing.
+    
+    Args:
+        description: Description of the missing data
+    
+    Returns:
+        Callable building the placeholder from the reason the stage degraded
+    """
+    def placeholder(reason):
+        return (
+            f"[DATA UNAVAILABLE] The {description} could not be gathered for this run ({reason}). "
+            "Base the analysis on the other available data and do not draw conclusions from this gap."
+        )
+    return placeholder
+
+
+async def process_stock_symbol(symbol, vix_data={}, global_market_data={}, additional_agents=None, additional_tasks=None, market_overview_ready=None, dates=None, timings=None, persist=True, timegpt_forecasts=None):
     """
     Process a stock symbol by gathering all necessary data and running the analysis crews.
     
@@ -44,141 +117,286 @@ async def process_stock_symbol(symbol, vix_data={}, global_market_data={}, addit
         global_market_data: Global market data (optional, for market overview)
         additional_agents: Additional agents for the crew (optional, for market overview)
         additional_tasks: Additional tasks for the crew (optional, for market overview)
+        market_overview_ready: Awaitable completing once the market overview summaries are written (optional).
+            Only the day trader stage waits for it, and uses the summaries it returns when it is a SymbolAnalysis.
+        dates: DateContext of the run (optional, computed now by default)
+        timings: Dict filled with the duration in seconds of each stage (optional)
+        persist: Whether the inputs, reports and logs are written to disk. Without persistence
+            everything stays in memory and nothing is reused from previous runs.
+            The files are written from worker threads, off the event loop.
+        timegpt_forecasts: TimeGPT forecasts of the run (optional, loaded from the day's pickle by default)
+    
+    Returns:
+        SymbolAnalysis: The summaries and the recommendation of the symbol
     """
-    today_str = get_today_str()
-    today_str_no_min = get_today_str_no_min()
-    yesterday_str = get_yesterday_str()
+    dates = dates or DateContext.now()
+    timings = timings if timings is not None else {}
+    today_str = dates.today_str
+    today_str_no_min = dates.today_str_no_min
+    yesterday_str = dates.yesterday_str
     YESTERDAY_HOUR = "18:00"  # 6 PM EST
     HISTORICAL_DAYS = 30
     
+    # LLM calls made while processing this symbol are scheduled fairly against the other symbols
+    llm_schedule_key.set(symbol)
+    
     # Create directories if they don't exist
     input_dir = os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min)
     output_dir = os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, symbol)
-    os.makedirs(input_dir, exist_ok=True)
-    os.makedirs(output_dir, exist_ok=True)
+    if persist:
+        await asyncio.to_thread(os.makedirs, input_dir, exist_ok=True)
+        await asyncio.to_thread(os.makedirs, output_dir, exist_ok=True)
     
-    # Get company name
-    company_name = get_company_name(symbol)
+    # Fingerprints of the stages already run today, unchanged stages are not run again
+    manifest = await asyncio.to_thread(get_stage_manifest, today_str_no_min, symbol) if persist else None
     
-    # Get stock headlines
-    stock_headlines = get_news_context(
-        symbol=symbol,
-        start_time=f"{yesterday_str} {YESTERDAY_HOUR}"
-    )
+    async def cached_input(filename, fingerprint_parts, fetch):
+        """Reuse a saved input fetched recently with the same parameters, otherwise fetch and save it"""
+        if not persist:
+            return await fetch()
+        file_path = os.path.join(input_dir, filename)
+        stage_fingerprint = fingerprint(filename, *fingerprint_parts)
+        if await asyncio.to_thread(manifest.is_fresh, filename, stage_fingerprint, max_age=settings.INCREMENTAL_FETCH_MAX_AGE):
+            print(f"Reusing {filename}: fetched with the same parameters in the last run")
+            annotate_span(cache_hit=True)
+            return await asyncio.to_thread(load_agent_input, today_str_no_min, filename)
+        content = await fetch()
+        await asyncio.to_thread(save_agent_input, today_str_no_min, filename, content)
+        await asyncio.to_thread(manifest.record, filename, stage_fingerprint, [file_path])
+        return content
     
-    # Save market headlines to file
-    with open(os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f"{symbol}_market_headlines.txt"), "w") as f:
-        f.write(stock_headlines)
+    # Market-wide data is only given for the market overview, keep it for offline replays
+    if persist and vix_data:
+        await asyncio.to_thread(save_agent_input, today_str_no_min, f"{symbol}_vix_data.txt", vix_data)
+    if persist and global_market_data:
+        await asyncio.to_thread(save_agent_input, today_str_no_min, f"{symbol}_global_market_data.txt", global_market_data)
     
-    # Run AiArticlesPickerCrew
-    inputs = {
-        'company_name': company_name,
-        'stocktwits_data': {},
-        'stock_headlines': stock_headlines,
-        'today_str': today_str,
-    }
+    # Each data-gathering stage starts as soon as the stages it depends on are done
+    stage_graph = StageGraph(name=symbol)
+    
+    async def company_name_stage():
+        return await cached_input(
+            f"{symbol}_company_name.txt",
+            [symbol],
+            lambda: fetch_executor.run("company_info", get_company_name, symbol)
+        )
+    
+    async def headlines_stage():
+        start_time = f"{yesterday_str} {YESTERDAY_HOUR}"
+        return await cached_input(
+            f"{symbol}_market_headlines.txt",
+            [symbol, start_time],
+            lambda: fetch_executor.run("headlines", get_news_context, symbol=symbol, start_time=start_time)
+        )
     
-    await AiArticlesPickerCrew(symbol).crew().kickoff_async(inputs=inputs)
+    async def articles_picker_stage(company_name, headlines):
+        inputs = {
+            'company_name': company_name,
+            'stocktwits_data': {},
+            'stock_headlines': headlines,
+            # Only the date is relevant to the picker, so the prompt stays the same across re-runs of the day
+            'today_str': today_str_no_min,
+        }
+        return await AiArticlesPickerCrew(symbol, dates=dates, persist=persist).kickoff_async(inputs=inputs)
     
-    # Get and save stock news
-    stock_news = await get_stock_news(symbol, os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f"{symbol}_{RELEVANT_ARTICLES_FILE}"))
-    with open(os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f"{symbol}_stock_news.txt"), "w") as f:
-        f.write(stock_news)
+    async def stock_news_stage(articles_picker):
+        # The picked URLs are read from the picker's output, the relevant articles file is only a record of it
+        relevant_articles = articles_picker.raw
+        
+        async def crawl_articles():
+            async with resource_pools.slot("browser"):
+                return await get_stock_news(symbol, content=relevant_articles)
+        
+        return await cached_input(
+            f"{symbol}_stock_news.txt",
+            [symbol, fingerprint(relevant_articles)],
+            crawl_articles
+        )
     
-    # Get and save technical indicators
-    ti_data = get_ti_context(symbol=symbol)
+    async def technical_indicators_stage():
+        return await cached_input(
+            f"{symbol}_technical_indicators.txt",
+            [symbol],
+            lambda: fetch_executor.run("technical_indicators", get_ti_context, symbol=symbol)
+        )
     
-    with open(os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f"{symbol}_technical_indicators.txt"), "w") as f:
-        f.write(ti_data)
+    async def fundamentals_stage():
+        return await cached_input(
+            f"{symbol}_fundamental_analysis.txt",
+            [symbol],
+            lambda: fetch_executor.run("fundamentals", get_fundamental_context, symbol=symbol)
+        )
     
-
-    fundamental_data = get_fundamental_context(symbol=symbol)
-
-    with open(os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f"{symbol}_fundamental_analysis.txt"), "w") as f:
-        f.write(fundamental_data)
+    async def stocktwits_stage():
+        return await cached_input(
+            f"{symbol}_stocktwits.txt",
+            [symbol, settings.SOCIAL_FETCH_LIMIT, dates.yesterday_18_est.isoformat()],
+            lambda: fetch_executor.run(
+                "stocktwits",
+                get_stocktwits_context,
+                symbol,
+                settings.SOCIAL_FETCH_LIMIT,
+                dates.yesterday_18_est
+            )
+        )
     
-    # Get and save stocktwits data
-    stocktwits_data = get_stocktwits_context(
-        symbol,
-        settings.SOCIAL_FETCH_LIMIT,
-        get_yesterday_18_est()
-    )
-    with open(os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f"{symbol}_stocktwits.txt"), "w") as f:
-        f.write(stocktwits_data)
+    async def timegpt_stage(company_name):
+        # Format the forecast of this symbol from the run's forecasts, or the ones saved in the pickle file
+        forecasts = timegpt_forecasts
+        if forecasts is None:
+            forecasts = await asyncio.to_thread(load_timegpt_forecasts, today_str_no_min)
+        timegpt_forecast = format_timegpt_forecast(forecasts, symbol, company_name)
+        if persist:
+            await asyncio.to_thread(save_agent_input, today_str_no_min, f"{symbol}_timegpt_forecast.txt", timegpt_forecast)
+        return timegpt_forecast
     
-    # Load real TimeGPT forecasts from pickle file
-    timegpt_forecasts = load_timegpt_forecasts()
+    # A stage past its deadline continues with a placeholder, the symbol's name is a usable fallback for its company name
+    timeouts = settings.STAGE_TIMEOUTS
+    stage_graph.add_stage("company_name", company_name_stage, timeout=timeouts.get("company_name"), fallback=symbol, degrade_dependents=False)
+    stage_graph.add_stage("headlines", headlines_stage, timeout=timeouts.get("headlines"), fallback=data_unavailable("news headlines"))
+    stage_graph.add_stage("articles_picker", articles_picker_stage, depends_on=["company_name", "headlines"], timeout=timeouts.get("articles_picker"), fallback=data_unavailable("relevant article selection"))
+    stage_graph.add_stage("stock_news", stock_news_stage, depends_on=["articles_picker"], timeout=timeouts.get("stock_news"), fallback=data_unavailable("news articles"))
+    stage_graph.add_stage("technical_indicators", technical_indicators_stage, timeout=timeouts.get("technical_indicators"), fallback=data_unavailable("technical indicator data"))
+    stage_graph.add_stage("fundamentals", fundamentals_stage, timeout=timeouts.get("fundamentals"), fallback=data_unavailable("fundamental analysis data"))
+    stage_graph.add_stage("stocktwits", stocktwits_stage, timeout=timeouts.get("stocktwits"), fallback=data_unavailable("StockTwits social sentiment data"))
+    stage_graph.add_stage("timegpt", timegpt_stage, depends_on=["company_name"], timeout=timeouts.get("timegpt"), fallback=data_unavailable("TimeGPT forecast"))
     
-    # Get formatted TimeGPT forecast for this symbol
-    timegpt_forecast = format_timegpt_forecast(timegpt_forecasts, symbol, company_name)
+    with tracer.span("gather_inputs", symbol=symbol):
+        stage_results = await stage_graph.run()
+    print(stage_graph.format_timings())
+    timings.update(stage_graph.timings)
+    
+    # Save the placeholders of the degraded stages so the saved inputs match what the crews receive
+    stage_input_files = {
+        "company_name": f"{symbol}_company_name.txt",
+        "headlines": f"{symbol}_market_headlines.txt",
+        "stock_news": f"{symbol}_stock_news.txt",
+        "technical_indicators": f"{symbol}_technical_indicators.txt",
+        "fundamentals": f"{symbol}_fundamental_analysis.txt",
+        "stocktwits": f"{symbol}_stocktwits.txt",
+        "timegpt": f"{symbol}_timegpt_forecast.txt",
+    }
+    for stage in stage_graph.degraded:
+        if persist and stage in stage_input_files:
+            await asyncio.to_thread(save_agent_input, today_str_no_min, stage_input_files[stage], stage_results[stage])
     
-    with open(os.path.join(AGENT_INPUTS_FOLDER, today_str_no_min, f"{symbol}_timegpt_forecast.txt"), "w") as f:
-        f.write(timegpt_forecast)
+    company_name = stage_results["company_name"]
     
     # Prepare final inputs
     final_inputs = {
         'company_name': company_name,
-        'stocktwits_data': stocktwits_data,
-        'technical_indicator_data': ti_data,
-        'fundamental_analysis_data': fundamental_data,
-        'timegpt_forecast': timegpt_forecast,
-        'stock_headlines': stock_headlines,
-        'stock_news': stock_news,
+        'stocktwits_data': stage_results["stocktwits"],
+        'technical_indicator_data': stage_results["technical_indicators"],
+        'fundamental_analysis_data': stage_results["fundamentals"],
+        'timegpt_forecast': stage_results["timegpt"],
+        'stock_headlines': stage_results["headlines"],
+        'stock_news': stage_results["stock_news"],
         'vix_data': vix_data or {},
         'global_market_data': global_market_data or {},
         'today_str': today_str,
         'historical_days': HISTORICAL_DAYS
     }
     
+    with tracer.span("run_crews", symbol=symbol):
+        return await run_symbol_crews(symbol, final_inputs, additional_agents, additional_tasks, market_overview_ready, dates, timings, persist)
+
+
+async def replay_stock_symbol(symbol, additional_agents=None, additional_tasks=None, market_overview_ready=None, dates=None, timings=None):
+    """
+    Run the LLM stages of a symbol on the inputs saved by a previous run, without any network fetch.
+    
+    Args:
+        symbol: Stock symbol to replay
+        additional_agents: Additional agents for the crew (optional, for market overview)
+        additional_tasks: Additional tasks for the crew (optional, for market overview)
+        market_overview_ready: Awaitable completing once the market overview summaries are written (optional)
+        dates: DateContext of the saved run (optional, today by default)
+        timings: Dict filled with the duration in seconds of each crew stage (optional)
+    
+    Returns:
+        SymbolAnalysis: The summaries and the recommendation of the symbol
+    """
+    dates = dates or DateContext.now()
+    llm_schedule_key.set(symbol)
+    os.makedirs(os.path.join(AGENT_OUTPUTS_FOLDER, dates.today_str_no_min, symbol), exist_ok=True)
+    
+    final_inputs = load_saved_inputs(symbol, dates)
+    with tracer.span("run_crews", symbol=symbol):
+        return await run_symbol_crews(symbol, final_inputs, additional_agents, additional_tasks, market_overview_ready, dates, timings)
+
+
+async def run_symbol_crews(symbol, final_inputs, additional_agents, additional_tasks, market_overview_ready, dates, timings=None, persist=True):
+    """
+    Run the summarization crew, then the day trader advisor once the market overview summaries are available.
+    The summaries are passed to the day trader advisor in memory.
+    
+    Returns:
+        SymbolAnalysis: The summaries and the recommendation of the symbol
+    """
+    today_str_no_min = dates.today_str_no_min
+    company_name = final_inputs['company_name']
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+    
     # Run StockComponentsSummarizeCrew
-    crew_result = await StockComponentsSummarizeCrew(
+    summarize_crew = StockComponentsSummarizeCrew(
         symbol,
         additional_agents=additional_agents,
-        additional_tasks=additional_tasks
-    ).crew().kickoff_async(inputs=final_inputs)
-    
-    # After summaries are complete, run the Day Trader Advisor
-    # Read the generated summary files
-    def read_summary_file(symbol_folder, filename):
-        """Helper function to read summary files safely"""
-        file_path = os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, symbol_folder, filename)
-        
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
-       
-    # Read individual stock summaries
-    news_summary = read_summary_file(symbol, "news_summary_report.md")
-    sentiment_summary = read_summary_file(symbol, "sentiment_summary_report.md")
-    technical_summary = read_summary_file(symbol, "technical_indicator_summary_report.md")
-    fundamental_summary = read_summary_file(symbol, "fundamental_analysis_summary_report.md")
-    timegpt_summary = read_summary_file(symbol, "timegpt_forecast_summary_report.md")
-    
-    # Read market analysis summaries (using the market overview symbol)
-    market_news_summary = read_summary_file(settings.STOCK_MARKET_OVERVIEW_SYMBOL, "news_summary_report.md")
-    market_sentiment_summary = read_summary_file(settings.STOCK_MARKET_OVERVIEW_SYMBOL, "sentiment_summary_report.md")
-    market_technical_summary = read_summary_file(settings.STOCK_MARKET_OVERVIEW_SYMBOL, "technical_indicator_summary_report.md")
-    market_timegpt_summary = read_summary_file(settings.STOCK_MARKET_OVERVIEW_SYMBOL, "timegpt_forecast_summary_report.md")
-    market_overview_summary = read_summary_file(settings.STOCK_MARKET_OVERVIEW_SYMBOL, "market_overview_summary_report.md")
+        additional_tasks=additional_tasks,
+        dates=dates,
+        persist=persist
+    )
+    await summarize_crew.kickoff_async(inputs=final_inputs)
+    summaries = summarize_crew.summary_outputs()
+    timings["summaries"] = time.perf_counter() - start
+    
+    # Wait for the market overview summaries if they are produced concurrently
+    market_overview = None
+    if market_overview_ready is not None:
+        start = time.perf_counter()
+        market_overview = await market_overview_ready
+        timings["market_overview_wait"] = time.perf_counter() - start
+    
+    if symbol == settings.STOCK_MARKET_OVERVIEW_SYMBOL:
+        market_summaries = summaries
+    elif isinstance(market_overview, SymbolAnalysis):
+        market_summaries = market_overview.summaries
+    else:
+        # Produced by another process, only its report files are available
+        market_summaries = load_summaries(settings.STOCK_MARKET_OVERVIEW_SYMBOL, today_str_no_min)
     
     # Prepare inputs for Day Trader Advisor
     day_trader_inputs = {
         'company_name': company_name,
-        'news_summary': news_summary,
-        'sentiment_summary': sentiment_summary,
-        'technical_summary': technical_summary,
-        'fundamental_summary': fundamental_summary,
-        'timegpt_summary': timegpt_summary,
-        'market_news_summary': market_news_summary,
-        'market_sentiment_summary': market_sentiment_summary,
-        'market_technical_summary': market_technical_summary,
-        'market_timegpt_summary': market_timegpt_summary,
-        'market_overview_summary': market_overview_summary
+        'news_summary': summaries["news"],
+        'sentiment_summary': summaries["sentiment"],
+        'technical_summary': summaries["technical"],
+        'fundamental_summary': summaries["fundamental"],
+        'timegpt_summary': summaries["timegpt"],
+        'market_news_summary': market_summaries["news"],
+        'market_sentiment_summary': market_summaries["sentiment"],
+        'market_technical_summary': market_summaries["technical"],
+        'market_timegpt_summary': market_summaries["timegpt"],
+        'market_overview_summary': market_summaries["market_overview"]
     }
     
     # Run Day Trader Advisor Crew
-    day_trader_result = await DayTraderAdvisorCrew(symbol).crew().kickoff_async(inputs=day_trader_inputs)
+    start = time.perf_counter()
+    day_trader_result = await DayTraderAdvisorCrew(symbol, dates=dates, persist=persist).kickoff_async(inputs=day_trader_inputs)
+    timings["day_trader"] = time.perf_counter() - start
     
-    return crew_result
+    signal, confidence = parse_recommendation(day_trader_result.raw)
+    return SymbolAnalysis(
+        symbol=symbol,
+        company_name=company_name,
+        summaries=summaries,
+        recommendation=day_trader_result.raw,
+        signal=signal,
+        confidence=confidence,
+        inputs=final_inputs,
+        timings=timings,
+        output_dir=os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, symbol) if persist else None
+    )
 
 
 def process_stock_symbol_sync(symbol, vix_data={}, global_market_data={}, additional_agents=None, additional_tasks=None):
@@ -1,6 +1,12 @@
 from ai_trading_crew.utils.dates import get_today_str, get_yesterday_str, get_yesterday_18_est
 from ai_trading_crew.utils.checks import ValidationChecks
-from ai_trading_crew.utils.company_info import get_company_name
+
+
+# Avoid circular imports (config -> utils -> twelve_data_manager) by importing company_info lazily
+def get_company_name(*args, **kwargs):
+    from ai_trading_crew.utils.company_info import get_company_name as _get_company_name
+    return _get_company_name(*args, **kwargs)
+
 
 # Avoid circular imports by importing stock_headlines_fetcher lazily
 def fetch_stock_news(*args, **kwargs):
@@ -0,0 +1,78 @@
+"""
+Fixed-size ring buffer of the most recent bars of a symbol and interval.
+Polls append the newest bars in place, the oldest ones are overwritten once the buffer is full,
+so keeping intraday bars up to date never reallocates nor rewrites the history.
+"""
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ai_trading_crew.utils.bar_store import BAR_DTYPE, bars_to_frame, frame_to_bars
+
+
+class BarRingBuffer:
+    """Structured array of bars used as a circular buffer, in ascending datetime order"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self._bars = np.zeros(self.capacity, dtype=BAR_DTYPE)
+        self._start = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _ordered(self) -> np.ndarray:
+        """Copy of the bars from the oldest to the newest"""
+        end = self._start + self._count
+        if end <= self.capacity:
+            return self._bars[self._start:end].copy()
+        return np.concatenate((self._bars[self._start:], self._bars[:end - self.capacity]))
+
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        """Datetime of the newest bar, None while the buffer is empty"""
+        with self._lock:
+            if not self._count:
+                return None
+            return pd.Timestamp(self._bars[(self._start + self._count - 1) % self.capacity]["datetime"])
+
+    def extend(self, df: pd.DataFrame) -> int:
+        """
+        Append the bars of a frame that are not older than the newest buffered bar.
+        A bar with the datetime of the newest one replaces it, it was still in progress when buffered.
+
+        Args:
+            df: Bars indexed by datetime in ascending order
+
+        Returns:
+            int: Number of bars written
+        """
+        new_bars = frame_to_bars(df)
+        written = 0
+        with self._lock:
+            if self._count:
+                last_slot = (self._start + self._count - 1) % self.capacity
+                new_bars = new_bars[new_bars["datetime"] >= self._bars[last_slot]["datetime"]]
+                if len(new_bars) and new_bars["datetime"][0] == self._bars[last_slot]["datetime"]:
+                    self._bars[last_slot] = new_bars[0]
+                    new_bars = new_bars[1:]
+                    written = 1
+            # Only the newest bars fit when more than the capacity arrives at once
+            new_bars = new_bars[-self.capacity:]
+            if len(new_bars):
+                slots = (self._start + self._count + np.arange(len(new_bars))) % self.capacity
+                self._bars[slots] = new_bars
+                overflow = max(self._count + len(new_bars) - self.capacity, 0)
+                self._start = (self._start + overflow) % self.capacity
+                self._count = min(self._count + len(new_bars), self.capacity)
+            return written + len(new_bars)
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Buffered bars indexed by datetime in ascending order"""
+        with self._lock:
+            bars = self._ordered()
+        return bars_to_frame(bars, columns)
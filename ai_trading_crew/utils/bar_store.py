@@ -0,0 +1,124 @@
+"""
+Columnar on-disk store of OHLCV bars.
+Each (symbol, interval) is a single NumPy structured array file with typed columns.
+Reads memory-map the file, so checking the last bar or loading a few columns parses nothing.
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+BAR_DTYPE = np.dtype([
+    ("datetime", "datetime64[s]"),
+    ("Open", "f8"),
+    ("High", "f8"),
+    ("Low", "f8"),
+    ("Close", "f8"),
+    ("Volume", "i8"),
+])
+BAR_COLUMNS = [name for name in BAR_DTYPE.names if name != "datetime"]
+
+
+def frame_to_bars(df: pd.DataFrame) -> np.ndarray:
+    """Structured bar array of a frame indexed by datetime"""
+    bars = np.empty(len(df), dtype=BAR_DTYPE)
+    bars["datetime"] = pd.DatetimeIndex(df.index).values.astype("datetime64[s]")
+    for column in BAR_COLUMNS:
+        values = df[column] if column in df.columns else 0
+        if column == "Volume":
+            values = pd.Series(values, index=df.index).fillna(0).round()
+        bars[column] = np.asarray(values)
+    return bars
+
+
+def bars_to_frame(bars: np.ndarray, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Frame indexed by datetime of a structured bar array, only the requested columns are copied"""
+    return pd.DataFrame(
+        {column: np.array(bars[column]) for column in (columns or BAR_COLUMNS)},
+        index=pd.DatetimeIndex(np.array(bars["datetime"]), name="datetime")
+    )
+
+
+class BarStore:
+    """Memory-mapped bar files of a data folder, one per symbol and interval"""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _safe_symbol(symbol: str) -> str:
+        # Replace slashes and other problematic characters for file names
+        return symbol.lower().replace('/', '_').replace('\\', '_')
+
+    def path(self, symbol: str, interval: str) -> Path:
+        """Bar file of a symbol and interval"""
+        return self.data_dir / f"{self._safe_symbol(symbol)}_{interval}.npy"
+
+    def _legacy_csv_path(self, symbol: str) -> Path:
+        return self.data_dir / f"{self._safe_symbol(symbol)}.csv"
+
+    def _open(self, symbol: str, interval: str) -> Optional[np.ndarray]:
+        path = self.path(symbol, interval)
+        if not path.exists() and interval == "1day":
+            self._migrate_csv(symbol)
+        if not path.exists():
+            return None
+        bars = np.load(path, mmap_mode="r")
+        return bars if len(bars) else None
+
+    def _migrate_csv(self, symbol: str):
+        """Convert the daily CSV cache of a previous version, if any"""
+        csv_path = self._legacy_csv_path(symbol)
+        if not csv_path.exists():
+            return
+        try:
+            df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        except Exception as e:
+            print(f"Error migrating cached data for {symbol}: {e}")
+            return
+        # The TimeGPT handler used to write its own frames under the same name
+        if df.empty or not {"Open", "High", "Low", "Close"}.issubset(df.columns):
+            return
+        self.write(symbol, "1day", df)
+        print(f"Migrated cached data for {symbol} to {self.path(symbol, '1day').name}")
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[pd.Timestamp]:
+        """Datetime of the last stored bar, None if nothing is stored"""
+        bars = self._open(symbol, interval)
+        if bars is None:
+            return None
+        return pd.Timestamp(bars["datetime"][-1])
+
+    def read(self, symbol: str, interval: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load the stored bars of a symbol.
+
+        Args:
+            symbol: Stock symbol
+            interval: Bar interval, e.g. 1day
+            columns: Columns to load, all of them by default
+
+        Returns:
+            pd.DataFrame: Bars indexed by datetime in ascending order, None if nothing is stored
+        """
+        bars = self._open(symbol, interval)
+        if bars is None:
+            return None
+        # Only the requested columns are copied out of the mapped file
+        return bars_to_frame(bars, columns)
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Replace the stored bars of a symbol with a frame indexed by datetime"""
+        bars = frame_to_bars(df)
+
+        # Write then rename so readers never map a partial file
+        path = self.path(symbol, interval)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, bars)
+        os.replace(tmp_path, path)
@@ -1,6 +1,15 @@
 import tiktoken
 
 
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens of a text with the tiktoken encoding of the model (cl100k_base if unknown)"""
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    
+    return len(encoding.encode(text))
+
 
 class ValidationChecks:
     def __init__(self):
@@ -32,12 +41,7 @@ class ValidationChecks:
         
         print(combined_text)
 
-        try:
-            encoding = tiktoken.encoding_for_model(llm_to_validate.model)
-        except KeyError:
-            encoding = tiktoken.get_encoding("cl100k_base")
-        
-        token_count = len(encoding.encode(combined_text))
+        token_count = count_tokens(combined_text, llm_to_validate.model)
         
         # Return the appropriate LLM based on token count
         return default_llm_for_task if token_count > (max_tokens/2) else llm_to_validate
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Proactive credit limiter for the Twelve Data API.
+Requests are scheduled ahead of time within the plan's credits per minute, so the API
+never has to answer with a 429 and nobody sleeps through a fixed rate limit penalty.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from ai_trading_crew.config import settings
+
+
+# Twelve Data counts the credits spent over a rolling minute
+WINDOW_SECONDS = 60.0
+
+# Credits reserved for the blocking fetch of the current context before it started, see prepay_async
+prepaid_credits = contextvars.ContextVar("prepaid_credits", default=None)
+
+
+class CreditPrepayment:
+    """Credits reserved ahead for a fetch, spent by its first request or refunded"""
+
+    def __init__(self, limiter: "CreditRateLimiter", credits: int, wait: float, entry: tuple):
+        self.limiter = limiter
+        self.credits = credits
+        self.wait = wait
+        self.entry = entry
+        self._lock = threading.Lock()
+
+    def take(self) -> int:
+        """Credits of the prepayment, 0 once they were taken"""
+        with self._lock:
+            credits, self.credits = self.credits, 0
+        return credits
+
+
+class CreditRateLimiter:
+    """
+    Schedules requests so the credits spent in any minute stay within the plan.
+    Each request reserves its credits at the earliest time they fit in the window, so later
+    requests are scheduled behind it in FIFO order. Async callers await their slot, threads sleep until it.
+    """
+
+    def __init__(self, credits_per_minute: int, endpoint_credits: Optional[Dict[str, int]] = None):
+        self.credits_per_minute = max(credits_per_minute, 1)
+        self.endpoint_credits = endpoint_credits or {}
+        self._lock = threading.Lock()
+        # (scheduled time, credits, throttle) of the requests of the last minute and of the ones scheduled ahead,
+        # throttle entries hold the window back after a rate limit answer without spending credits
+        self._ledger = deque()
+        self._requests = 0
+        self._credits = 0
+        self._throttled = 0
+        self._throttle_wait = 0.0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def request_credits(self, endpoint: str, symbols: int = 1) -> int:
+        """Credits of a request, the endpoint cost is charged per symbol of a batch"""
+        return self.endpoint_credits.get(endpoint, 1) * max(symbols, 1)
+
+    def max_symbols_per_request(self, endpoint: str) -> int:
+        """Largest batch of symbols whose credits fit in one minute"""
+        return max(self.credits_per_minute // self.endpoint_credits.get(endpoint, 1), 1)
+
+    def _schedule(self, credits: int, throttle: bool = False) -> Tuple[float, tuple]:
+        """
+        Add credits to the ledger at the earliest time they fit.
+
+        Returns:
+            tuple: (seconds to wait until then, ledger entry)
+        """
+        # A request costing more than the plan would never fit, let it through on an empty window
+        credits = min(credits, self.credits_per_minute)
+        now = time.monotonic()
+        with self._lock:
+            while self._ledger and self._ledger[0][0] <= now - WINDOW_SECONDS:
+                self._ledger.popleft()
+
+            # Never before the last scheduled request, so the requests keep their order
+            start = max(now, self._ledger[-1][0]) if self._ledger else now
+            while True:
+                window = [entry for entry in self._ledger if entry[0] > start - WINDOW_SECONDS]
+                if sum(entry[1] for entry in window) + credits <= self.credits_per_minute:
+                    break
+                # Wait for the oldest request of the window to leave it
+                start = window[0][0] + WINDOW_SECONDS
+
+            entry = (start, credits, throttle)
+            self._ledger.append(entry)
+        return start - now, entry
+
+    def _record(self, credits: int, wait: float):
+        """Account a request and the time it waited for its credits"""
+        with self._lock:
+            self._requests += 1
+            self._credits += credits
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+    def _reserve(self, credits: int) -> float:
+        """Reserve the credits at the earliest time they fit, returns the seconds to wait until then"""
+        wait, _ = self._schedule(credits)
+        self._record(credits, wait)
+        return wait
+
+    def acquire(self, credits: int = 1) -> float:
+        """
+        Wait in the calling thread until the request can be sent.
+        Only for blocking code running off the event loop, e.g. in the fetch executor.
+        A request of a fetch whose credits were prepaid (see prepay_async) spends them instead.
+
+        Returns:
+            float: Seconds waited
+        """
+        prepayment = prepaid_credits.get()
+        prepaid = prepayment.take() if prepayment is not None and prepayment.limiter is self else 0
+        if prepaid:
+            # The prepaid wait was spent before the fetch took its slots
+            wait = self._schedule(credits - prepaid)[0] if credits > prepaid else 0.0
+            self._record(credits, prepayment.wait + max(wait, 0.0))
+        else:
+            wait = self._reserve(credits)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, credits: int = 1) -> float:
+        """Wait until the request can be sent, yielding to the event loop meanwhile"""
+        wait = self._reserve(credits)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    async def prepay_async(self, credits: int = 1) -> "CreditPrepayment":
+        """
+        Reserve the credits of a blocking fetch's first request and wait for them on the event loop,
+        so the fetch does not sleep in its thread while holding its resource slots.
+        Set the prepayment in the fetch's context through prepaid_credits, and refund it once the fetch is done.
+        """
+        wait, entry = self._schedule(credits)
+        prepayment = CreditPrepayment(self, entry[1], max(wait, 0.0), entry)
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self.refund(prepayment)
+            raise
+        return prepayment
+
+    def refund(self, prepayment: "CreditPrepayment"):
+        """Give back the credits of a prepayment its fetch did not spend, e.g. when its data was cached"""
+        if not prepayment.take():
+            return
+        with self._lock:
+            try:
+                self._ledger.remove(prepayment.entry)
+            except ValueError:
+                # Already out of the window
+                pass
+
+    def throttled(self):
+        """
+        Record a rate limit answer despite the schedule, e.g. credits spent by another process.
+        The whole plan is reserved so the next requests wait for a full window.
+        The reservation is a penalty, it is reported apart from the credits spent.
+        """
+        wait, _ = self._schedule(self.credits_per_minute, throttle=True)
+        with self._lock:
+            self._throttled += 1
+            # The window the next requests are held back for, their own waits are recorded as they reserve
+            self._throttle_wait += max(wait, 0.0) + WINDOW_SECONDS
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "credits_per_minute": self.credits_per_minute,
+                "requests": self._requests,
+                "credits": self._credits,
+                "credits_last_minute": sum(
+                    credits for entry_time, credits, throttle in self._ledger
+                    if now - WINDOW_SECONDS < entry_time <= now and not throttle
+                ),
+                "scheduled_ahead": sum(1 for entry_time, _, throttle in self._ledger if entry_time > now and not throttle),
+                "throttled": self._throttled,
+                "throttle_wait": self._throttle_wait,
+                "total_wait": self._total_wait,
+                "avg_wait": self._total_wait / self._requests if self._requests else 0.0,
+                "max_wait": self._max_wait,
+            }
+
+    def format_stats(self) -> str:
+        """Format the limiter statistics for the console"""
+        stats = self.stats()
+        return (
+            f"Twelve Data limiter: {stats['requests']} requests, {stats['credits']} credits "
+            f"({stats['credits_per_minute']}/min plan), total wait {stats['total_wait']:.2f}s, "
+            f"max wait {stats['max_wait']:.2f}s, {stats['throttled']} rate limit answers "
+            f"({stats['throttle_wait']:.2f}s of windows held back)"
+        )
+
+
+# Create a singleton instance
+twelve_data_credits = CreditRateLimiter(settings.TWELVE_DATA_CREDITS_PER_MINUTE, settings.TWELVE_DATA_ENDPOINT_CREDITS)
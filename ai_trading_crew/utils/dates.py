@@ -1,4 +1,5 @@
 import datetime
+from dataclasses import dataclass
 from datetime import date, timedelta
 import pytz
 
@@ -23,4 +24,36 @@ def get_yesterday_18_est() -> datetime.datetime:
     est = pytz.timezone('US/Eastern')
     yesterday_date = get_current_est_date() - timedelta(days=1)
     yesterday_18 = datetime.datetime.combine(yesterday_date, datetime.time(18, 0, 0))
-    return est.localize(yesterday_18) 
\ No newline at end of file
+    return est.localize(yesterday_18)
+
+
+@dataclass(frozen=True)
+class DateContext:
+    """Dates of a pipeline run, computed once when the run starts and passed to every crew"""
+    today_str: str
+    today_str_no_min: str
+    yesterday_str: str
+    yesterday_18_est: datetime.datetime
+
+    @classmethod
+    def now(cls) -> "DateContext":
+        today_str = get_today_str()
+        return cls(
+            today_str=today_str,
+            today_str_no_min=today_str.split(' ')[0],
+            yesterday_str=get_yesterday_str(),
+            yesterday_18_est=get_yesterday_18_est(),
+        )
+
+    @classmethod
+    def for_date(cls, today_str_no_min: str) -> "DateContext":
+        """Dates of a past run day, used to replay the inputs saved that day"""
+        est = pytz.timezone('US/Eastern')
+        today = datetime.datetime.strptime(today_str_no_min, "%Y-%m-%d").date()
+        yesterday = today - timedelta(days=1)
+        return cls(
+            today_str=f"{today_str_no_min} 00:00",
+            today_str_no_min=today_str_no_min,
+            yesterday_str=yesterday.strftime("%Y-%m-%d"),
+            yesterday_18_est=est.localize(datetime.datetime.combine(yesterday, datetime.time(18, 0, 0))),
+        )
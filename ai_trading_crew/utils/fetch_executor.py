@@ -0,0 +1,122 @@
+"""
+Bounded thread-pool execution layer for the synchronous data fetchers.
+Keeps the asyncio event loop free while requests/http.client calls are in flight.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+from ai_trading_crew.config import settings
+from ai_trading_crew.utils.credit_limiter import twelve_data_credits, prepaid_credits
+from ai_trading_crew.utils.resource_pools import ResourcePool, resource_pools
+
+
+# Sources whose fetchers call the Twelve Data API
+TWELVE_DATA_SOURCES = {"company_info", "technical_indicators", "market_data"}
+
+# Monotonic deadline of the stage the current fetch belongs to, set by the stage graph
+fetch_deadline = contextvars.ContextVar("fetch_deadline", default=None)
+
+
+def fetch_timeout(default: float) -> float:
+    """
+    Timeout of a blocking request, shortened to the time left before the stage deadline.
+    Raises TimeoutError once the deadline passed, so an abandoned fetcher stops instead of sending more requests.
+    """
+    deadline = fetch_deadline.get()
+    if deadline is None:
+        return default
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("The stage deadline of the fetch passed")
+    return min(default, remaining)
+
+
+class FetchExecutor:
+    """
+    Runs blocking fetchers on a shared thread pool.
+    The pool size is the global concurrency limit, and each source gets its own
+    limit so that a single provider is never hit by every worker at once.
+    """
+
+    def __init__(self, max_workers: int, source_limits: Dict[str, int]):
+        self.max_workers = max_workers
+        self.source_limits = source_limits
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetcher")
+        self._source_pools: Dict[str, ResourcePool] = {}
+        self._source_pools_lock = threading.Lock()
+
+    def _get_source_pool(self, source: str) -> ResourcePool:
+        """Get the pool limiting a source, created on first use"""
+        with self._source_pools_lock:
+            if source not in self._source_pools:
+                limit = self.source_limits.get(source, self.max_workers)
+                self._source_pools[source] = ResourcePool(source, limit)
+            return self._source_pools[source]
+
+    async def run(self, source: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking fetcher in the thread pool without blocking the event loop.
+
+        Args:
+            source: Data source name used for the per-source limit
+            func: Synchronous function to run
+            *args, **kwargs: Arguments forwarded to the function
+
+        Returns:
+            The function's return value
+        """
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so the tracing spans, scheduling keys and deadline follow the call
+        context = contextvars.copy_context()
+        releases: List[Callable[[], None]] = []
+        
+        def release_slots():
+            while releases:
+                releases.pop()()
+        
+        if source in TWELVE_DATA_SOURCES:
+            # Wait for the credits of the first request before taking any slot, so the fetch thread
+            # does not sleep on its slots; the credits are refunded if the data turns out to be cached
+            prepayment = await twelve_data_credits.prepay_async(
+                twelve_data_credits.request_credits("time_series")
+            )
+            context.run(prepaid_credits.set, prepayment)
+            releases.append(partial(twelve_data_credits.refund, prepayment))
+        
+        try:
+            # The source's own limit first, then always the scarcer shared pool first so that fetchers cannot deadlock each other
+            pools = [self._get_source_pool(source)]
+            pools += [resource_pools.pools[name] for name in (["twelve_data", "http"] if source in TWELVE_DATA_SOURCES else ["http"])]
+            for pool in pools:
+                await pool.acquire()
+                releases.append(pool.release)
+            future = self._executor.submit(context.run, func, *args, **kwargs)
+        except BaseException:
+            release_slots()
+            raise
+        
+        # The slots are held until the fetcher returns, even when the caller stopped waiting (e.g. a stage
+        # timeout): a thread still running counts against the limits, the deadline makes it stop early
+        def on_done(_):
+            try:
+                loop.call_soon_threadsafe(release_slots)
+            except RuntimeError:
+                # The event loop is closed, so are its semaphores
+                pass
+        
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the underlying thread pool"""
+        self._executor.shutdown(wait=wait)
+
+
+# Create a singleton instance
+fetch_executor = FetchExecutor(settings.FETCH_MAX_WORKERS, settings.FETCH_SOURCE_LIMITS)
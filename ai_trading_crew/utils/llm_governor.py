@@ -0,0 +1,181 @@
+"""
+Process-wide admission control for LLM calls.
+Keeps every crew under the provider's requests-per-minute and tokens-per-minute limits.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Dict, Optional
+
+from crewai import LLM
+
+from ai_trading_crew.utils.checks import count_tokens
+
+
+# Scheduling key of the LLM calls made from the current context (the symbol being processed)
+llm_schedule_key = contextvars.ContextVar("llm_schedule_key", default="default")
+
+
+class _TokenBucket:
+    """Token bucket refilled continuously up to its per-minute capacity"""
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until_available(self, amount: float, now: float) -> float:
+        """Seconds to wait until the amount can be consumed"""
+        self._refill(now)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        self.level -= amount
+
+
+class LLMGovernor:
+    """
+    Admits LLM calls by estimated prompt tokens and requests per minute.
+    Waiting calls are queued per scheduling key and served round-robin across keys,
+    so one symbol with many tasks cannot starve the others.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_bucket = _TokenBucket(requests_per_minute)
+        self._token_bucket = _TokenBucket(tokens_per_minute)
+        self._condition = threading.Condition()
+        self._queues = OrderedDict()
+        self._wait_times = defaultdict(list)
+        self._admitted_tokens = defaultdict(int)
+
+    def set_limits(self, requests_per_minute: int, tokens_per_minute: int):
+        """Change the limits, e.g. to give each worker process its share of the provider's limits"""
+        with self._condition:
+            self.requests_per_minute = requests_per_minute
+            self.tokens_per_minute = tokens_per_minute
+            self._request_bucket = _TokenBucket(requests_per_minute)
+            self._token_bucket = _TokenBucket(tokens_per_minute)
+            self._condition.notify_all()
+
+    def _next_ticket(self) -> Optional[object]:
+        for queue in self._queues.values():
+            return queue[0]
+        return None
+
+    def _dequeue(self, key: str):
+        queue = self._queues[key]
+        queue.popleft()
+        if queue:
+            # Give the other keys their turn before this one is served again
+            self._queues.move_to_end(key)
+        else:
+            del self._queues[key]
+
+    def acquire(self, estimated_tokens: int, key: Optional[str] = None) -> float:
+        """
+        Block until the call can be sent without exceeding the limits.
+
+        Args:
+            estimated_tokens: Estimated prompt tokens of the call
+            key: Scheduling key, defaults to the key of the current context
+
+        Returns:
+            float: Seconds spent waiting in the queue
+        """
+        key = key or llm_schedule_key.get()
+        # A call larger than the bucket would never be admitted, let it through once the bucket is full
+        estimated_tokens = min(estimated_tokens, self._token_bucket.capacity)
+        ticket = object()
+        start = time.monotonic()
+
+        with self._condition:
+            self._queues.setdefault(key, deque()).append(ticket)
+            while True:
+                if self._next_ticket() is ticket:
+                    now = time.monotonic()
+                    delay = max(
+                        self._request_bucket.time_until_available(1, now),
+                        self._token_bucket.time_until_available(estimated_tokens, now)
+                    )
+                    if delay <= 0:
+                        self._request_bucket.consume(1)
+                        self._token_bucket.consume(estimated_tokens)
+                        self._dequeue(key)
+                        self._condition.notify_all()
+                        break
+                    self._condition.wait(timeout=delay)
+                else:
+                    self._condition.wait()
+
+            wait_time = time.monotonic() - start
+            self._wait_times[key].append(wait_time)
+            self._admitted_tokens[key] += estimated_tokens
+
+        return wait_time
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue wait statistics, overall and per scheduling key"""
+        with self._condition:
+            by_key = {}
+            for key, waits in self._wait_times.items():
+                by_key[key] = {
+                    "calls": len(waits),
+                    "estimated_tokens": self._admitted_tokens[key],
+                    "total_wait": sum(waits),
+                    "avg_wait": sum(waits) / len(waits),
+                    "max_wait": max(waits),
+                }
+            all_waits = [wait for waits in self._wait_times.values() for wait in waits]
+            return {
+                "calls": len(all_waits),
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "total_wait": sum(all_waits),
+                "max_wait": max(all_waits, default=0.0),
+                "by_key": by_key,
+            }
+
+    def format_stats(self) -> str:
+        """Format the queue wait statistics for the console"""
+        stats = self.stats()
+        lines = [
+            f"LLM governor: {stats['calls']} calls, total queue wait {stats['total_wait']:.2f}s, "
+            f"max wait {stats['max_wait']:.2f}s"
+        ]
+        for key, key_stats in sorted(stats["by_key"].items()):
+            lines.append(
+                f"* {key}: {key_stats['calls']} calls, ~{key_stats['estimated_tokens']} prompt tokens, "
+                f"avg wait {key_stats['avg_wait']:.2f}s, max wait {key_stats['max_wait']:.2f}s"
+            )
+        return "\n".join(lines)
+
+
+def estimate_prompt_tokens(messages, model: str) -> int:
+    """Estimate the prompt tokens of a string or a list of chat messages"""
+    if isinstance(messages, str):
+        return count_tokens(messages, model)
+    text = "\n".join(str(message.get("content", "")) for message in messages)
+    return count_tokens(text, model)
+
+
+class GovernedLLM(LLM):
+    """LLM whose calls are admitted by an LLMGovernor before reaching the provider"""
+
+    def __init__(self, *args, governor: Optional[LLMGovernor] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.governor = governor
+
+    def call(self, messages, *args, **kwargs):
+        if self.governor is not None:
+            self.governor.acquire(estimate_prompt_tokens(messages, self.model))
+        return super().call(messages, *args, **kwargs)
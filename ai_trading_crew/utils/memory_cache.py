@@ -0,0 +1,103 @@
+"""
+Bounded in-memory cache of market data shared by the data managers.
+Entries live in namespaces with their own TTL, the least recently used entries are evicted
+once the cache is full, and hits, misses, expirations and evictions are counted per namespace.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Optional
+
+from ai_trading_crew.config import settings
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with per-namespace TTLs"""
+
+    def __init__(self, max_entries: int, ttls: Optional[Dict[str, Optional[float]]] = None, default_ttl: Optional[float] = 300):
+        """
+        Args:
+            max_entries: Maximum number of entries across all namespaces
+            ttls: TTL in seconds by namespace, None for entries that never expire
+            default_ttl: TTL of the namespaces without their own
+        """
+        self.max_entries = max(max_entries, 1)
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        # (namespace, key) -> (expiry time or None, value), least recently used first
+        self._entries = OrderedDict()
+        self._counters = defaultdict(lambda: {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0})
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        """Cached value of a key, default when it is missing or expired"""
+        entry_key = (namespace, key)
+        with self._lock:
+            counters = self._counters[namespace]
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                counters["misses"] += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[entry_key]
+                counters["expirations"] += 1
+                counters["misses"] += 1
+                return default
+            self._entries.move_to_end(entry_key)
+            counters["hits"] += 1
+            return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Cache a value for the TTL of its namespace, or for the given TTL"""
+        if ttl is None:
+            ttl = self.ttls.get(namespace, self.default_ttl)
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        entry_key = (namespace, key)
+        with self._lock:
+            self._entries[entry_key] = (expires_at, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                (evicted_namespace, _), _ = self._entries.popitem(last=False)
+                self._counters[evicted_namespace]["evictions"] += 1
+
+    def delete(self, namespace: str, key: Hashable):
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def clear(self, namespace: Optional[str] = None):
+        """Drop the entries of a namespace, or of every namespace"""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == namespace]:
+                del self._entries[entry_key]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Counters and entry count by namespace"""
+        with self._lock:
+            entries = defaultdict(int)
+            for namespace, _ in self._entries:
+                entries[namespace] += 1
+            return {
+                namespace: {**counters, "entries": entries[namespace]}
+                for namespace, counters in self._counters.items()
+            }
+
+    def format_stats(self) -> str:
+        """Format the cache statistics for the console"""
+        lines = [f"Memory cache ({len(self._entries)}/{self.max_entries} entries):"]
+        for namespace, stats in sorted(self.stats().items()):
+            lookups = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / lookups if lookups else 0.0
+            lines.append(
+                f"* {namespace}: {stats['entries']} entries, {stats['hits']} hits, {stats['misses']} misses "
+                f"({hit_rate:.0%} hit rate), {stats['expirations']} expired, {stats['evictions']} evicted"
+            )
+        return "\n".join(lines)
+
+
+# Create a singleton instance
+market_data_cache = MemoryCache(settings.MEMORY_CACHE_MAX_ENTRIES, settings.MEMORY_CACHE_TTLS)
@@ -0,0 +1,140 @@
+"""
+Bounded pools of the shared resources (HTTP, browser, LLM, Twelve Data credits).
+Work waits for a free slot instead of piling up on a resource, and each pool
+keeps the utilization figures reported by the universe mode.
+"""
+
+import asyncio
+import contextvars
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from ai_trading_crew.config import settings
+
+
+# Whether the LLM crews started from the current context take a slot of the "llm" pool.
+# Only universe mode bounds them, to keep a single wave of crews queued; the other modes start
+# every crew at once and rely on the LLM governor alone to stay within the provider's limits.
+bound_llm_crews = contextvars.ContextVar("bound_llm_crews", default=False)
+
+
+class ResourcePool:
+    """
+    Asynchronous pool of a fixed number of slots with utilization accounting.
+    Utilization is the time-weighted share of the slots in use since the last reset.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        # Semaphores are bound to the event loop they are used in
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.reset()
+
+    def reset(self):
+        """Restart the utilization accounting"""
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self.peak_waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self._busy_slot_seconds = 0.0
+        self._started = time.monotonic()
+        self._updated = self._started
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.capacity)
+        return self._semaphores[loop]
+
+    def _account(self):
+        now = time.monotonic()
+        self._busy_slot_seconds += self.in_use * (now - self._updated)
+        self._updated = now
+
+    async def acquire(self):
+        """Take a slot of the pool, waiting for one to be free. Every acquire needs a release from the same event loop."""
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        start = time.monotonic()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.total_wait += time.monotonic() - start
+        self._account()
+        self.in_use += 1
+        self.acquired += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def release(self):
+        """Give back a slot taken with acquire"""
+        self._account()
+        self.in_use -= 1
+        self._get_semaphore().release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot of the pool, waiting for one to be free"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def is_saturated(self) -> bool:
+        """Whether work is queued waiting for a slot"""
+        return self.waiting > 0
+
+    def stats(self) -> Dict[str, Any]:
+        self._account()
+        elapsed = max(self._updated - self._started, 1e-9)
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "peak_in_use": self.peak_in_use,
+            "peak_waiting": self.peak_waiting,
+            "acquired": self.acquired,
+            "avg_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "utilization": self._busy_slot_seconds / (self.capacity * elapsed),
+        }
+
+
+class ResourcePools:
+    """The resource pools of the process, by name"""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.pools = {name: ResourcePool(name, capacity) for name, capacity in limits.items()}
+
+    def slot(self, name: str):
+        """Hold a slot of the named pool"""
+        return self.pools[name].slot()
+
+    def reset(self):
+        for pool in self.pools.values():
+            pool.reset()
+
+    def saturated(self):
+        """Names of the pools with queued work"""
+        return [name for name, pool in self.pools.items() if pool.is_saturated()]
+
+    def format_utilization(self) -> str:
+        """Format the utilization of each pool for the console"""
+        lines = [f"{'pool':<12} {'capacity':>8} {'in use':>7} {'peak':>5} {'waiting':>8} {'avg wait s':>11} {'util':>6}"]
+        for name, pool in self.pools.items():
+            stats = pool.stats()
+            lines.append(
+                f"{name:<12} {stats['capacity']:>8} {stats['in_use']:>7} {stats['peak_in_use']:>5} "
+                f"{stats['waiting']:>8} {stats['avg_wait']:>11.2f} {stats['utilization']:>6.0%}"
+            )
+        return "\n".join(lines)
+
+
+# Create a singleton instance
+resource_pools = ResourcePools(settings.RESOURCE_POOL_LIMITS)
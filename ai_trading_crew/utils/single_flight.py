@@ -0,0 +1,81 @@
+"""
+Single-flight deduplication of concurrent calls.
+The first caller of a key runs the call, callers arriving while it is in flight wait for its result
+instead of running their own. Works across threads and event loop tasks, which share the same futures.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    In-flight calls by key.
+    Blocking followers wait on the leader's future, so they must run off the event loop
+    (e.g. in the fetch executor) when the leader is a coroutine of that loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def claim(self, key: Hashable) -> Tuple[Future, bool]:
+        """
+        Join the call in flight for a key, or become its leader.
+
+        Returns:
+            tuple: (future of the call, whether the caller is the leader and has to resolve it)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def resolve(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        """Publish the leader's result (or error) to the followers and end the flight"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call once for all the concurrent callers of a key"""
+        future, leader = self.claim(key)
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.resolve(key, future, error=e)
+            raise
+        self.resolve(key, future, result)
+        return result
+
+    async def do_async(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """Await a coroutine function once for all the concurrent callers of a key, threads included"""
+        future, leader = self.claim(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as e:
+            self.resolve(key, future, error=e)
+            raise
+        self.resolve(key, future, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
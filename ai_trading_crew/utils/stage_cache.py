@@ -0,0 +1,150 @@
+"""
+Content fingerprints of the pipeline stages, used to skip the fetches and LLM tasks
+whose inputs did not change since the last run of the day.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from ai_trading_crew.config import settings, AGENT_OUTPUTS_FOLDER
+
+
+# Placeholders interpolated by crewAI in the agent and task configurations
+PLACEHOLDER_PATTERN = re.compile(r"{(\w+)}")
+
+MANIFEST_FILE = "stage_manifest.json"
+
+# Whether the LLM tasks started from the current context reuse the outputs recorded in the manifests.
+# Offline replays run every task by default, since re-running the LLM stages is their point;
+# the outputs they produce are still recorded.
+reuse_task_outputs = contextvars.ContextVar("reuse_task_outputs", default=True)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Fingerprint JSON-serializable parts, non-serializable values are fingerprinted by their string"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> Optional[str]:
+    """SHA-256 of a file's content, None if the file doesn't exist"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _original_text(obj: Any, field: str) -> str:
+    # crewAI keeps the templates under _original_* once the inputs have been interpolated
+    return getattr(obj, f"_original_{field}", None) or getattr(obj, field, None) or ""
+
+
+def task_fingerprint(stage_task, inputs: Dict[str, Any]) -> str:
+    """
+    Fingerprint everything a task's LLM call depends on: the task and agent templates,
+    the model, the inputs used by the templates and the outputs of the context tasks.
+    """
+    agent = stage_task.agent
+    templates = [
+        _original_text(stage_task, "description"),
+        _original_text(stage_task, "expected_output"),
+        _original_text(agent, "role"),
+        _original_text(agent, "goal"),
+        _original_text(agent, "backstory"),
+    ]
+    placeholders = sorted(set(PLACEHOLDER_PATTERN.findall("\n".join(templates))))
+    model = getattr(getattr(agent, "llm", None), "model", None)
+    context = stage_task.context if isinstance(stage_task.context, list) else []
+    context_outputs = [context_task.output.raw if context_task.output else None for context_task in context]
+    return fingerprint(
+        templates,
+        model,
+        {key: inputs.get(key) for key in placeholders},
+        context_outputs
+    )
+
+
+class StageManifest:
+    """
+    Fingerprints of the stages of a symbol run, stored next to the artifacts they produced.
+    A stage is fresh when its fingerprint is unchanged and its artifacts are byte-identical
+    to the ones recorded with it.
+    """
+
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._stages, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def is_fresh(self, stage: str, stage_fingerprint: str, max_age: Optional[float] = None) -> bool:
+        """
+        Check whether a stage can be skipped.
+
+        Args:
+            stage: Stage name
+            stage_fingerprint: Fingerprint of the stage inputs
+            max_age: Maximum age in seconds of the recorded artifacts (optional)
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            entry = self._stages.get(stage)
+        if not entry or entry["fingerprint"] != stage_fingerprint:
+            return False
+        if max_age is not None and time.time() - entry["recorded_at"] > max_age:
+            return False
+        return all(
+            digest is not None and file_digest(path) == digest
+            for path, digest in entry["artifacts"].items()
+        )
+
+    def record(self, stage: str, stage_fingerprint: str, artifacts: Iterable[str]):
+        """Record the fingerprint of a completed stage with the digests of the artifacts it wrote"""
+        entry = {
+            "fingerprint": stage_fingerprint,
+            "artifacts": {path: file_digest(path) for path in artifacts},
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._stages[stage] = entry
+            self._save()
+
+    def stages(self) -> List[str]:
+        """Names of the recorded stages"""
+        with self._lock:
+            return list(self._stages)
+
+
+_manifests: Dict[str, StageManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_stage_manifest(today_str_no_min: str, symbol: str) -> StageManifest:
+    """Get the stage manifest of a symbol for the run date, shared by every crew of the process"""
+    path = os.path.join(AGENT_OUTPUTS_FOLDER, today_str_no_min, symbol, MANIFEST_FILE)
+    with _manifests_lock:
+        if path not in _manifests:
+            _manifests[path] = StageManifest(path, enabled=settings.INCREMENTAL_RERUNS)
+        return _manifests[path]
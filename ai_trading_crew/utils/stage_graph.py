@@ -0,0 +1,140 @@
+"""
+Small dependency-graph runner for the asynchronous stages of a pipeline.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional
+
+from ai_trading_crew.utils.fetch_executor import fetch_deadline
+from ai_trading_crew.utils.tracing import tracer
+
+
+class _Stage(NamedTuple):
+    func: Callable[..., Awaitable[Any]]
+    depends_on: tuple
+    timeout: Optional[float]
+    fallback: Any
+    degrade_dependents: bool
+
+
+class StageGraph:
+    """
+    Runs async stages as soon as the stages they depend on have completed.
+    Independent stages start together, so the total latency is the critical path
+    of the graph instead of the sum of all stages.
+    A stage with a fallback degrades to it when it times out or fails, and the stages
+    depending on it are skipped, so a hanging source cannot stall the whole graph.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._stages = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.degraded: Dict[str, str] = {}
+        self.wall_time = 0.0
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Any = None,
+        degrade_dependents: bool = True
+    ):
+        """
+        Register a stage.
+
+        Args:
+            name: Unique stage name
+            func: Async callable receiving the results of its dependencies as keyword arguments
+            depends_on: Names of the stages that must complete first (must already be registered)
+            timeout: Seconds after which the stage is cancelled (optional)
+            fallback: Result used when the stage times out, fails or is skipped, either a value or
+                a callable receiving the reason. Without a fallback, errors and timeouts are raised.
+            degrade_dependents: Whether the stages depending on this one are skipped when it degrades
+                (False when the fallback is a usable value)
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already registered")
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+        self._stages[name] = _Stage(func, depends_on, timeout, fallback, degrade_dependents)
+
+    def _degrade(self, name: str, reason: str) -> Any:
+        stage = self._stages[name]
+        if stage.fallback is None:
+            return None
+        print(f"Stage {name} of {self.name} degraded: {reason}")
+        self.degraded[name] = reason
+        return stage.fallback(reason) if callable(stage.fallback) else stage.fallback
+
+    async def _run_stage(self, name: str, tasks: Dict[str, asyncio.Task]) -> Any:
+        stage = self._stages[name]
+        dependency_results = {}
+        for dependency in stage.depends_on:
+            dependency_results[dependency] = await tasks[dependency]
+
+        start = time.perf_counter()
+        with tracer.span(f"stage.{name}") as span:
+            unavailable = [
+                dependency for dependency in stage.depends_on
+                if dependency in self.degraded and self._stages[dependency].degrade_dependents
+            ]
+            if unavailable and stage.fallback is not None:
+                result = self._degrade(name, f"skipped, {', '.join(unavailable)} unavailable")
+            else:
+                # The fetchers of the stage shorten their request timeouts to its deadline
+                deadline_token = fetch_deadline.set(
+                    time.monotonic() + stage.timeout if stage.timeout is not None else None
+                )
+                try:
+                    result = await asyncio.wait_for(stage.func(**dependency_results), timeout=stage.timeout)
+                except asyncio.TimeoutError:
+                    if stage.fallback is None:
+                        raise
+                    result = self._degrade(name, f"timed out after {stage.timeout}s")
+                except Exception as e:
+                    if stage.fallback is None:
+                        raise
+                    result = self._degrade(name, f"failed: {e}")
+                finally:
+                    fetch_deadline.reset(deadline_token)
+            if name in self.degraded:
+                span.set(degraded=self.degraded[name])
+        self.timings[name] = time.perf_counter() - start
+        self.results[name] = result
+        return result
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run every stage and return the results keyed by stage name.
+        If a stage fails, the remaining stages are cancelled and the error is raised.
+        """
+        start = time.perf_counter()
+        tasks = {}
+        for name in self._stages:
+            tasks[name] = asyncio.ensure_future(self._run_stage(name, tasks))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        finally:
+            self.wall_time = time.perf_counter() - start
+
+        return self.results
+
+    def format_timings(self) -> str:
+        """Format the stage timings, slowest first"""
+        lines = [f"Stage timings for {self.name} (wall time {self.wall_time:.2f}s):"]
+        for name, duration in sorted(self.timings.items(), key=lambda item: item[1], reverse=True):
+            degraded = f" (degraded: {self.degraded[name]})" if name in self.degraded else ""
+            lines.append(f"* {name}: {duration:.2f}s{degraded}")
+        return "\n".join(lines)
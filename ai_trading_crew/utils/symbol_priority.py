@@ -0,0 +1,98 @@
+"""
+Priority ranking of the symbols from the cached Twelve Data bars, so the symbols
+most likely to move at the open are processed first.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ai_trading_crew.config import settings
+from ai_trading_crew.utils.twelve_data_manager import twelve_data_manager
+
+
+def compute_priority_signals(bars: pd.DataFrame, lookback: int = 20) -> Dict[str, float]:
+    """
+    Compute the cheap priority signals of a symbol from its daily bars.
+
+    Args:
+        bars: Daily OHLCV bars in ascending date order
+        lookback: Number of bars used for the volatility and the average volume
+
+    Returns:
+        dict: overnight_gap (% absolute gap of the last open), volatility (% standard deviation
+            of the daily returns) and volume_spike (last volume over the average volume, minus 1)
+    """
+    if bars is None or len(bars) < 2:
+        return {"overnight_gap": 0.0, "volatility": 0.0, "volume_spike": 0.0}
+
+    recent = bars.tail(lookback + 1)
+    last, previous = recent.iloc[-1], recent.iloc[-2]
+    overnight_gap = abs(last["Open"] / previous["Close"] - 1) * 100
+    volatility = recent["Close"].pct_change().dropna().std() * 100
+
+    volume_spike = 0.0
+    average_volume = recent["Volume"].iloc[:-1].mean()
+    if average_volume > 0:
+        volume_spike = max(last["Volume"] / average_volume - 1, 0.0)
+
+    return {
+        "overnight_gap": float(overnight_gap),
+        "volatility": float(volatility) if pd.notna(volatility) else 0.0,
+        "volume_spike": float(volume_spike),
+    }
+
+
+def score_symbol(symbol: str) -> float:
+    """Priority score of a symbol from its cached bars, 0 when nothing is cached yet"""
+    bars = twelve_data_manager.get_cached_time_series(symbol, columns=["Open", "Close", "Volume"])
+    signals = compute_priority_signals(bars)
+    weights = settings.PRIORITY_WEIGHTS
+    return sum(weights.get(signal, 0.0) * value for signal, value in signals.items())
+
+
+def rank_symbols(symbols: List[str]) -> List[Tuple[str, float]]:
+    """
+    Rank symbols by priority score, highest first.
+    Symbols with the same score keep their configured order.
+    """
+    scores = []
+    for symbol in symbols:
+        try:
+            scores.append((symbol, score_symbol(symbol)))
+        except Exception as e:
+            print(f"Error computing the priority of {symbol}: {e}")
+            scores.append((symbol, 0.0))
+    return sorted(scores, key=lambda item: item[1], reverse=True)
+
+
+def format_ranking(ranking: List[Tuple[str, float]]) -> str:
+    """Format a ranking for the console"""
+    return "Symbol priority: " + ", ".join(f"{symbol} ({score:.2f})" for symbol, score in ranking)
+
+
+async def dispatch_by_priority(
+    symbols: List[str],
+    process: Callable[[str], Awaitable[Any]],
+    max_concurrent: Optional[int] = None
+) -> List[Any]:
+    """
+    Process symbols with at most max_concurrent running at a time.
+    The semaphore hands out its slots in FIFO order, so the symbols get them in list order.
+
+    Args:
+        symbols: Symbols in priority order
+        process: Async callable processing one symbol
+        max_concurrent: Concurrency budget (MAX_CONCURRENT_SYMBOLS by default)
+
+    Returns:
+        list: The results in the order of the symbols
+    """
+    semaphore = asyncio.Semaphore(max_concurrent or settings.MAX_CONCURRENT_SYMBOLS)
+
+    async def process_with_slot(symbol):
+        async with semaphore:
+            return await process(symbol)
+
+    return await asyncio.gather(*[process_with_slot(symbol) for symbol in symbols])
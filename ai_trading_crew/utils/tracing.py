@@ -0,0 +1,251 @@
+"""
+Span-style tracing of the pipeline stages.
+Every fetcher, stage and crew kickoff records a span with its duration, bytes transferred,
+cache hits and retries, and each run is written as a JSON trace.
+"""
+
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+# Span of the code running in the current context, parent of the spans opened in it
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation with its attributes"""
+
+    def __init__(self, span_id: int, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.span_id = span_id
+        self.name = name
+        self.parent_id = parent.span_id if parent else None
+        # Spans opened while processing a symbol belong to it
+        self.symbol = attributes.pop("symbol", None) or (parent.symbol if parent else None)
+        self.attributes = attributes
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self._start_counter = time.perf_counter()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attributes):
+        """Set attributes of the span"""
+        self.attributes.update(attributes)
+
+    def add(self, **counters):
+        """Increment numeric attributes of the span, e.g. bytes or retries"""
+        for key, value in counters.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start_counter
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "symbol": self.symbol,
+            "thread": self.thread,
+            "start": self.start,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class TraceRun:
+    """The finished spans of one run"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.time()
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+
+    def add(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+
+# Run collecting the spans of the current context. Tasks and threads started from it inherit it,
+# so runs sharing a process (daemon runs, concurrent API calls) never mix or reset each other's spans
+_current_run = contextvars.ContextVar("current_run", default=None)
+
+
+class Tracer:
+    """Records the spans of the run of the current context, across threads and event loop tasks"""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def start_run(self, run_name: str) -> TraceRun:
+        """Start collecting the spans of a new run in the current context"""
+        run = TraceRun(run_name)
+        _current_run.set(run)
+        return run
+
+    def end_run(self):
+        """Stop collecting spans in the current context, spans outside of any run are not kept"""
+        _current_run.set(None)
+
+    def current_run(self) -> Optional[TraceRun]:
+        """The run of the current context, None outside of any run"""
+        return _current_run.get()
+
+    @property
+    def run_name(self) -> Optional[str]:
+        run = _current_run.get()
+        return run.name if run else None
+
+    @property
+    def run_start(self) -> float:
+        run = _current_run.get()
+        return run.start if run else time.time()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Record a span around a block of code, in the run of the current context.
+
+        Args:
+            name: Span name, spans with the same name are aggregated in the summary
+            **attributes: Initial attributes, a symbol attribute is inherited by the child spans
+        """
+        current = Span(next(self._ids), name, _current_span.get(), attributes)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            current.finish()
+            run = _current_run.get()
+            if run is not None:
+                run.add(current)
+
+    def spans(self) -> List[Span]:
+        """Finished spans of the run of the current context"""
+        run = _current_run.get()
+        return run.spans() if run else []
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Durations and counters aggregated by span name, slowest total first"""
+        totals = {}
+        for span in self.spans():
+            entry = totals.setdefault(span.name, {
+                "name": span.name, "count": 0, "total": 0.0, "max": 0.0,
+                "bytes": 0, "cache_hits": 0, "retries": 0, "errors": 0,
+            })
+            entry["count"] += 1
+            entry["total"] += span.duration
+            entry["max"] = max(entry["max"], span.duration)
+            entry["bytes"] += span.attributes.get("bytes", 0)
+            entry["cache_hits"] += 1 if span.attributes.get("cache_hit") else 0
+            entry["retries"] += span.attributes.get("retries", 0)
+            entry["errors"] += 1 if span.error else 0
+        return sorted(totals.values(), key=lambda entry: entry["total"], reverse=True)
+
+    def format_summary(self, limit: int = 15) -> str:
+        """Format the slowest stages and the slowest individual spans as tables"""
+        lines = [
+            f"Slowest stages of {self.run_name or 'the run'}:",
+            f"{'stage':<45} {'count':>6} {'total s':>9} {'max s':>8} {'KB':>9} {'cache':>6} {'retries':>8}",
+        ]
+        for entry in self.summary()[:limit]:
+            lines.append(
+                f"{entry['name'][:45]:<45} {entry['count']:>6} {entry['total']:>9.2f} {entry['max']:>8.2f} "
+                f"{entry['bytes'] / 1024:>9.1f} {entry['cache_hits']:>6} {entry['retries']:>8}"
+            )
+        lines.append("")
+        lines.append("Slowest spans:")
+        slowest = sorted(self.spans(), key=lambda span: span.duration, reverse=True)[:limit]
+        for span in slowest:
+            lines.append(f"* {span.name} [{span.symbol or '-'}]: {span.duration:.2f}s")
+        return "\n".join(lines)
+
+    def write_trace(self, path: str) -> str:
+        """Write the spans of the run and their summary as JSON"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        trace = {
+            "run": self.run_name,
+            "started_at": self.run_start,
+            "wall_time": time.time() - self.run_start,
+            "summary": self.summary(),
+            "spans": [span.to_dict() for span in sorted(self.spans(), key=lambda span: span.start)],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=2, default=str)
+        return path
+
+
+def current_span() -> Optional[Span]:
+    """The span of the current context, None outside of any span"""
+    return _current_span.get()
+
+
+def annotate_span(**attributes):
+    """Set attributes of the current span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def count_in_span(**counters):
+    """Increment counters of the current span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.add(**counters)
+
+
+def traced(name: Optional[str] = None, record_result_size: bool = False):
+    """
+    Decorator recording a span around each call of a sync or async function.
+
+    Args:
+        name: Span name, the function name by default
+        record_result_size: Record the size of a returned string as the bytes of the span
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        def record_result(span, result):
+            if record_result_size and isinstance(result, str) and "bytes" not in span.attributes:
+                span.set(bytes=len(result.encode("utf-8")))
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(span_name) as span:
+                    result = await func(*args, **kwargs)
+                    record_result(span, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name) as span:
+                result = func(*args, **kwargs)
+                record_result(span, result)
+                return result
+        return wrapper
+
+    return decorator
+
+
+# Create a singleton instance
+tracer = Tracer()
@@ -0,0 +1,108 @@
+"""
+Trading calendar shared by every module.
+The market sessions of a multi-year range are computed once, lookups are bisections
+of the sorted session dates instead of a new market schedule per call.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Union
+
+import pandas as pd
+import pandas_market_calendars as mcal
+
+
+# Range of the sessions computed up front, it is extended when a lookup falls outside
+YEARS_BACK = 10
+YEARS_AHEAD = 2
+
+
+def _to_date(day: Union[date, str]) -> date:
+    if isinstance(day, str):
+        return datetime.strptime(day[:10], '%Y-%m-%d').date()
+    if isinstance(day, datetime):
+        # Timestamps are datetimes too
+        return day.date()
+    return day
+
+
+class TradingCalendar:
+    """Sessions of a market with O(log n) lookups"""
+
+    def __init__(self, market: str = "NYSE"):
+        self.market = market
+        self._lock = threading.Lock()
+        self._calendar = None
+        self._sessions: List[date] = []
+        self._start: Optional[date] = None
+        self._end: Optional[date] = None
+
+    def _ensure_range(self, start: date, end: date):
+        """Compute the sessions once, and again over a wider range if a lookup falls outside"""
+        if self._start is not None and self._start <= start and end <= self._end:
+            return
+        with self._lock:
+            if self._start is not None and self._start <= start and end <= self._end:
+                return
+            today = date.today()
+            new_start = min(start, today.replace(year=today.year - YEARS_BACK, day=1), self._start or start)
+            new_end = max(end, today.replace(year=today.year + YEARS_AHEAD, day=1), self._end or end)
+            if self._calendar is None:
+                self._calendar = mcal.get_calendar(self.market)
+            schedule = self._calendar.schedule(start_date=new_start, end_date=new_end)
+            # Publish the sessions before the range so lock-free readers never see a range without them
+            self._sessions = [session.date() for session in schedule.index]
+            self._start, self._end = new_start, new_end
+
+    def latest_session(self, on: Optional[Union[date, str]] = None) -> date:
+        """Last session on or before a day, today by default"""
+        day = _to_date(on) if on is not None else date.today()
+        self._ensure_range(day - timedelta(days=30), day)
+        sessions = self._sessions
+        position = bisect_right(sessions, day)
+        if position == 0:
+            # Nothing before the computed range, fallback to the day itself
+            return day
+        return sessions[position - 1]
+
+    def next_session(self, after: Optional[Union[date, str]] = None) -> date:
+        """First session strictly after a day, today by default"""
+        day = _to_date(after) if after is not None else date.today()
+        self._ensure_range(day, day + timedelta(days=30))
+        sessions = self._sessions
+        return sessions[bisect_right(sessions, day)]
+
+    def is_trading_day(self, day: Union[date, str]) -> bool:
+        day = _to_date(day)
+        self._ensure_range(day, day)
+        sessions = self._sessions
+        position = bisect_left(sessions, day)
+        return position < len(sessions) and sessions[position] == day
+
+    def sessions_between(self, start: Union[date, str], end: Union[date, str]) -> List[date]:
+        """Sessions from start to end, both included"""
+        start, end = _to_date(start), _to_date(end)
+        if start > end:
+            return []
+        self._ensure_range(start, end)
+        sessions = self._sessions
+        return sessions[bisect_left(sessions, start):bisect_right(sessions, end)]
+
+    def count_sessions(self, start: Union[date, str], end: Union[date, str]) -> int:
+        """Number of sessions from start to end, both included"""
+        start, end = _to_date(start), _to_date(end)
+        if start > end:
+            return 0
+        self._ensure_range(start, end)
+        sessions = self._sessions
+        return bisect_right(sessions, end) - bisect_left(sessions, start)
+
+    def holidays_between(self, start: Union[date, str], end: Union[date, str]) -> List[date]:
+        """Weekdays from start to end without a session"""
+        sessions = set(self.sessions_between(start, end))
+        return [day.date() for day in pd.bdate_range(_to_date(start), _to_date(end)) if day.date() not in sessions]
+
+
+# Create a singleton instance
+trading_calendar = TradingCalendar()
@@ -1,13 +1,54 @@
+import asyncio
 import os
+import re
 import sys
+import threading
 import time
+import weakref
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 import json
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-import pandas_market_calendars as mcal
+import pytz
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, time as dt_time, timedelta
+from typing import Optional, Dict, Any, List
 from pathlib import Path
+from ai_trading_crew.utils.tracing import traced, annotate_span, count_in_span
+from ai_trading_crew.utils.bar_store import BarStore
+from ai_trading_crew.utils.bar_ring import BarRingBuffer
+from ai_trading_crew.utils.credit_limiter import twelve_data_credits
+from ai_trading_crew.utils.fetch_executor import fetch_timeout
+from ai_trading_crew.utils.single_flight import SingleFlight
+from ai_trading_crew.utils.memory_cache import market_data_cache
+from ai_trading_crew.utils.trading_calendar import trading_calendar
+from ai_trading_crew.config import settings
+
+
+# Largest number of bars returned by a time series request
+MAX_OUTPUT_SIZE = 5000
+
+# Minutes per bar of the intraday intervals, the other intervals are checked by date
+INTRADAY_INTERVAL_MINUTES = {
+    "1min": 1,
+    "5min": 5,
+    "15min": 15,
+    "30min": 30,
+    "45min": 45,
+    "1h": 60,
+    "2h": 120,
+    "4h": 240,
+}
+MARKET_OPEN = dt_time(9, 30)
+MARKET_CLOSE = dt_time(16, 0)
+SESSION_MINUTES = 390
+
+# Relative Close difference of an already cached bar above which the history was adjusted (e.g. for a split)
+ADJUSTMENT_TOLERANCE = 0.001
+
+# Units of the lookback periods, e.g. 5d, 2wk, 4mo or 1y
+PERIOD_UNITS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
 
 
 class TwelveDataManager:
@@ -22,83 +63,78 @@ class TwelveDataManager:
             print("TWELVE_API_KEY environment variable is not set")
             sys.exit(1)
             
-        self._cache_ttl = 300  # Cache TTL in seconds (5 minutes)
-        self._last_fetch_times = {}
-        self._cached_data = {}
-        self._last_quote_fetch_times = {}
-        self._cached_quotes = {}
-        
-        # Company name caching
-        self._cached_company_names = {}
-        self._last_company_fetch_times = {}
+        # Bounded in-memory cache shared with the other data managers, TTLs are set per namespace
+        self.cache = market_data_cache
         
         # Setup data directory
         self.data_dir = Path(__file__).parent.parent.parent / "resources" / "data"
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.bar_store = BarStore(self.data_dir)
         
-        # Company names JSON file path
-        self.company_names_file = self.data_dir / "company_names.json"
+        # Requests are scheduled within the plan's credits instead of waiting out 429 answers,
+        # the fetch executor prepays the credits of the fetches it runs with the same limiter
+        self.rate_limiter = twelve_data_credits
         
-        # Initialize market calendar
-        self.nyse = mcal.get_calendar('NYSE')
+        # Keep-alive connection pools, one session for the threads and one async client per event loop
+        http_limits = settings.TWELVE_DATA_HTTP_LIMITS
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=http_limits["max_connections"]))
+        self._async_clients = weakref.WeakKeyDictionary()
         
-        # Load company names from JSON file
-        self._load_company_names_from_file()
+        # Concurrent callers of the same symbol share one request, from threads and event loop tasks alike
+        self._single_flight = SingleFlight()
         
-    def _load_company_names_from_file(self):
+        # Recent intraday bars by (symbol, interval), each poll only fetches the bars printed since the last one
+        self._intraday_buffers = {}
+        self._intraday_buffers_lock = threading.Lock()
+        
+        # Company names JSON file path, the file is read and rewritten under the lock
+        self.company_names_file = self.data_dir / "company_names.json"
+        self._company_names_lock = threading.Lock()
+        
+    def _load_company_names_from_file(self) -> Dict[str, str]:
         """Load company names from JSON file"""
-        if self.company_names_file.exists():
-            try:
-                with open(self.company_names_file, 'r') as f:
-                    self._cached_company_names = json.load(f)
-            except Exception as e:
-                print(f"Error loading company names from file: {e}")
-                self._cached_company_names = {}
-        else:
-            self._cached_company_names = {}
-    
-    def _save_company_names_to_file(self):
-        """Save company names to JSON file"""
+        if not self.company_names_file.exists():
+            return {}
         try:
-            with open(self.company_names_file, 'w') as f:
-                json.dump(self._cached_company_names, f, indent=2)
-            print(f"Saved company names to cache")
+            with open(self.company_names_file, 'r') as f:
+                return json.load(f)
         except Exception as e:
-            print(f"Error saving company names to file: {e}")
+            print(f"Error loading company names from file: {e}")
+            return {}
+    
+    def _save_company_name_to_file(self, symbol: str, company_name: str):
+        """Add a company name to the JSON file"""
+        with self._company_names_lock:
+            company_names = self._load_company_names_from_file()
+            company_names[symbol] = company_name
+            try:
+                with open(self.company_names_file, 'w') as f:
+                    json.dump(company_names, f, indent=2)
+                print(f"Saved company names to cache")
+            except Exception as e:
+                print(f"Error saving company names to file: {e}")
     
     def get_latest_market_date(self) -> str:
         """Get the latest market trading date (handles weekends and holidays)"""
-        today = datetime.now().date()
-        
-        # Get the last 5 trading days to be safe
-        schedule = self.nyse.schedule(start_date=today - timedelta(days=10), end_date=today)
-        
-        if len(schedule) > 0:
-            latest_date = schedule.index[-1].date()
-            return latest_date.strftime('%Y-%m-%d')
-        else:
-            # Fallback to today if something goes wrong
-            return today.strftime('%Y-%m-%d')
+        return trading_calendar.latest_session().strftime('%Y-%m-%d')
     
-    def _get_csv_path(self, symbol: str) -> Path:
-        """Get the CSV file path for a symbol"""
-        # Replace slashes and other problematic characters for file names
-        safe_symbol = symbol.lower().replace('/', '_').replace('\\', '_')
-        return self.data_dir / f"{safe_symbol}.csv"
+    def _count_missing_trading_days(self, last_cached_date: datetime) -> int:
+        """Number of trading days after the last cached bar up to the latest market date"""
+        start_date = last_cached_date.date() + timedelta(days=1)
+        return trading_calendar.count_sessions(start_date, trading_calendar.latest_session())
     
-    def _has_recent_data(self, symbol: str) -> bool:
+    def _has_recent_data(self, symbol: str, interval: str = "1day") -> bool:
         """Check if we have recent data for the symbol"""
-        csv_path = self._get_csv_path(symbol)
-        
-        if not csv_path.exists():
-            return False
-            
         try:
-            df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
-            if df.empty:
+            last_timestamp = self.bar_store.last_timestamp(symbol, interval)
+            if last_timestamp is None:
                 return False
+            
+            if interval in INTRADAY_INTERVAL_MINUTES:
+                return self._has_recent_intraday_bars(last_timestamp, interval)
                 
-            latest_data_date = df.index[-1].strftime('%Y-%m-%d')
+            latest_data_date = last_timestamp.strftime('%Y-%m-%d')
             latest_market_date = self.get_latest_market_date()
             
             return latest_data_date >= latest_market_date
@@ -107,106 +143,582 @@ class TwelveDataManager:
             print(f"Error reading cached data for {symbol}: {e}")
             return False
     
-    def _load_cached_data(self, symbol: str) -> Optional[pd.DataFrame]:
-        """Load cached data from CSV"""
-        csv_path = self._get_csv_path(symbol)
-        
-        if not csv_path.exists():
-            return None
-            
+    @staticmethod
+    def _now_est() -> datetime:
+        """Current US/Eastern time without timezone, like the intraday bar timestamps"""
+        return datetime.now(pytz.timezone('US/Eastern')).replace(tzinfo=None)
+    
+    @staticmethod
+    def _intraday_bars_since(last_timestamp: pd.Timestamp, interval: str) -> int:
+        """Upper bound of the bars from a cached bar up to now, the cached bar included as it may have been in progress"""
+        minutes = INTRADAY_INTERVAL_MINUTES[interval]
+        now = TwelveDataManager._now_est()
+        session = trading_calendar.latest_session(now.date())
+        if last_timestamp.date() == session:
+            end = min(now, datetime.combine(session, MARKET_CLOSE))
+            elapsed = max((end - last_timestamp).total_seconds() / 60, 0)
+            return min(int(elapsed // minutes) + 1, MAX_OUTPUT_SIZE)
+        # Every bar of the sessions from the one of the cached bar
+        sessions = trading_calendar.count_sessions(last_timestamp.date(), session)
+        bars_per_session = -(-SESSION_MINUTES // minutes)
+        return min(sessions * bars_per_session + 1, MAX_OUTPUT_SIZE)
+    
+    @staticmethod
+    def _has_recent_intraday_bars(last_timestamp: pd.Timestamp, interval: str) -> bool:
+        """
+        Intraday bars are fresh while the market is open if the bar in progress is cached,
+        and while it is closed if the last bar of the latest session is cached.
+        Bars are timestamped at their start in US/Eastern time.
+        """
+        step = timedelta(minutes=INTRADAY_INTERVAL_MINUTES[interval])
+        now = TwelveDataManager._now_est()
+        session = trading_calendar.latest_session(now.date())
+        if session == now.date():
+            if MARKET_OPEN <= now.time() < MARKET_CLOSE:
+                return last_timestamp >= now - step
+            if now.time() < MARKET_OPEN:
+                session = trading_calendar.latest_session(now.date() - timedelta(days=1))
+        return last_timestamp >= datetime.combine(session, MARKET_CLOSE) - step
+    
+    def _load_cached_data(self, symbol: str, interval: str = "1day", columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Load cached data from the bar store"""
         try:
-            df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
-            return df if not df.empty else None
+            return self.bar_store.read(symbol, interval, columns)
         except Exception as e:
             print(f"Error loading cached data for {symbol}: {e}")
             return None
     
-    def _save_data_to_cache(self, symbol: str, data: pd.DataFrame):
-        """Save data to CSV cache"""
-        csv_path = self._get_csv_path(symbol)
-        
+    def get_cached_time_series(self, symbol: str, interval: str = "1day", columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Get the cached bars of a symbol without any API call, None if nothing is cached"""
+        return self._load_cached_data(symbol, interval, columns)
+    
+    def _save_data_to_cache(self, symbol: str, data: pd.DataFrame, interval: str = "1day"):
+        """Save data to the bar store"""
         try:
-            data.to_csv(csv_path)
+            self.bar_store.write(symbol, interval, data)
             print(f"Saved data for {symbol} to cache")
         except Exception as e:
             print(f"Error saving data for {symbol}: {e}")
     
+    def _request_credits(self, url: str):
+        """Endpoint of a request URL and the credits it costs, batch requests cost per symbol"""
+        parsed_url = urlparse(url)
+        endpoint = parsed_url.path.rsplit("/", 1)[-1]
+        symbols = parse_qs(parsed_url.query).get("symbol", [""])[0].split(",")
+        return endpoint, self.rate_limiter.request_credits(endpoint, len(symbols))
+    
+    @traced("twelve_data.api_request")
     def _make_api_request(self, url: str, max_retries: int = 3) -> Dict[Any, Any]:
-        """Make API request with retry logic and rate limiting"""
+        """
+        Make API request with retry logic and rate limiting.
+        Failures raise instead of exiting, so a stage can fall back to its placeholder.
+        A passed stage deadline raises TimeoutError right away instead of retrying.
+        """
+        endpoint, credits = self._request_credits(url)
+        annotate_span(endpoint=endpoint, credits=credits)
         for attempt in range(max_retries):
+            if attempt:
+                count_in_span(retries=1)
+            wait_time = self.rate_limiter.acquire(credits)
+            if wait_time > 0:
+                count_in_span(rate_limit_wait=wait_time)
             try:
-                response = requests.get(url)
-                
-                if response.status_code == 429:
-                    wait_time = 63 if attempt == 0 else 122
-                    print(f"Rate limit hit, waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-                    
-                if response.status_code != 200:
-                    print(f"API request failed with status code: {response.status_code}")
-                    if attempt == max_retries - 1:
-                        sys.exit(1)
-                    continue
-                    
-                data = response.json()
-                
-                # Check for API errors
-                if data.get('status') == 'error':
-                    error_msg = data.get('message', 'Unknown error')
-                    if 'not found' in error_msg.lower() or 'invalid' in error_msg.lower():
-                        print(f"Symbol not supported: {error_msg}")
-                        sys.exit(1)
-                    elif 'run out of API credits' in error_msg or 'rate limit' in error_msg.lower():
-                        wait_time = 62 if attempt == 0 else 122
-                        print(f"Rate limit hit, waiting {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"API error: {error_msg}")
-                        sys.exit(1)
-                        
-                return data
-                
-            except Exception as e:
+                response = self._session.get(url, timeout=fetch_timeout(settings.TWELVE_DATA_HTTP_TIMEOUT))
+            except requests.RequestException as e:
                 print(f"Request attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    sys.exit(1)
-                time.sleep(5)
+                # Never sleep past the stage deadline
+                time.sleep(fetch_timeout(5))
+                continue
+            count_in_span(bytes=len(response.content))
+            
+            if response.status_code == 429:
+                print("Rate limit hit despite the credit schedule, retrying in the next window...")
+                self.rate_limiter.throttled()
+                continue
+            
+            if response.status_code != 200:
+                print(f"API request failed with status code: {response.status_code}")
+                continue
+            
+            data = response.json()
+            
+            # Check for API errors
+            if data.get('status') == 'error':
+                error_msg = data.get('message', 'Unknown error')
+                if 'run out of API credits' in error_msg or 'rate limit' in error_msg.lower():
+                    print("Rate limit hit despite the credit schedule, retrying in the next window...")
+                    self.rate_limiter.throttled()
+                    continue
+                raise ValueError(f"Twelve Data API error: {error_msg}")
+            
+            return data
         
-        sys.exit(1)  # Should never reach here
+        raise RuntimeError(f"Twelve Data {endpoint} request failed after {max_retries} attempts")
     
-    def get_time_series_data(self, symbol: str, interval: str = "1day", period: str = "4mo") -> pd.DataFrame:
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Async client of the running event loop, its connections are kept alive between requests"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            http_limits = settings.TWELVE_DATA_HTTP_LIMITS
+            self._async_clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=http_limits["max_connections"],
+                    max_keepalive_connections=http_limits["max_keepalive_connections"],
+                    keepalive_expiry=http_limits["keepalive_expiry"]
+                ),
+                timeout=settings.TWELVE_DATA_HTTP_TIMEOUT
+            )
+        return self._async_clients[loop]
+    
+    async def aclose(self):
+        """Close the async client of the running event loop, before the loop is closed"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    @traced("twelve_data.api_request")
+    async def _make_api_request_async(self, url: str, max_retries: int = 3) -> Dict[Any, Any]:
         """
-        Get time series data for a symbol with intelligent caching.
-        Checks cached data first and only fetches if needed.
+        Make API request with retry logic and rate limiting without blocking the event loop.
+        Failures raise instead of exiting, the other symbols of the pipeline keep running.
         """
-        # Check if we have recent cached data
-        if self._has_recent_data(symbol):
+        endpoint, credits = self._request_credits(url)
+        annotate_span(endpoint=endpoint, credits=credits)
+        client = self._get_async_client()
+        for attempt in range(max_retries):
+            if attempt:
+                count_in_span(retries=1)
+            wait_time = await self.rate_limiter.acquire_async(credits)
+            if wait_time > 0:
+                count_in_span(rate_limit_wait=wait_time)
+            try:
+                response = await client.get(url)
+            except httpx.HTTPError as e:
+                print(f"Request attempt {attempt + 1} failed: {e}")
+                await asyncio.sleep(5)
+                continue
+            count_in_span(bytes=len(response.content))
             
-            return self._load_cached_data(symbol)
+            if response.status_code == 429:
+                print("Rate limit hit despite the credit schedule, retrying in the next window...")
+                self.rate_limiter.throttled()
+                continue
+            
+            if response.status_code != 200:
+                print(f"API request failed with status code: {response.status_code}")
+                continue
+            
+            data = response.json()
+            
+            # Check for API errors
+            if data.get('status') == 'error':
+                error_msg = data.get('message', 'Unknown error')
+                if 'run out of API credits' in error_msg or 'rate limit' in error_msg.lower():
+                    print("Rate limit hit despite the credit schedule, retrying in the next window...")
+                    self.rate_limiter.throttled()
+                    continue
+                raise ValueError(f"Twelve Data API error: {error_msg}")
+            
+            return data
         
+        raise RuntimeError(f"Twelve Data {endpoint} request failed after {max_retries} attempts")
+    
+    def _get_fresh_time_series(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Full cached history of a symbol and interval that needs no API call, None if it has to be fetched"""
         # Check in-memory cache
-        cache_key = f"{symbol}_{interval}_{period}"
-        current_time = time.time()
+        df = self.cache.get("time_series", (symbol, interval))
+        if df is not None:
+            return df
         
-        if (cache_key in self._cached_data and 
-            current_time - self._last_fetch_times.get(cache_key, 0) < self._cache_ttl):
-            
-            return self._cached_data[cache_key]
+        # Check if we have recent cached data
+        if self._has_recent_data(symbol, interval):
+            df = self._load_cached_data(symbol, interval)
+            if df is not None:
+                self.cache.set("time_series", (symbol, interval), df)
+            return df
+        return None
+    
+    @staticmethod
+    def _slice_period(df: pd.DataFrame, period: Optional[str]) -> pd.DataFrame:
+        """
+        Bars of a lookback period from a full history.
         
-        print(f"Fetching fresh data for {symbol} from Twelve Data API")
+        Args:
+            df: Bars indexed by datetime in ascending order
+            period: Lookback ending today, e.g. 5d, 2wk, 4mo or 1y, all the bars for max or None
+        
+        Returns:
+            pd.DataFrame: A copy of the bars of the period, the cached history is never handed out
+        """
+        if not period or period == "max":
+            return df.copy()
+        match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+        if not match:
+            raise ValueError(f"Unsupported period: {period}")
+        offset = pd.DateOffset(**{PERIOD_UNITS[match.group(2)]: int(match.group(1))})
+        return df[df.index >= pd.Timestamp.now().normalize() - offset].copy()
+    
+    def _plan_time_series_fetch(self, symbol: str, interval: str):
+        """
+        Decide how many bars to request for a stale symbol.
+        Only the bars after the last cached one are requested when the daily or intraday cache is stale.
+        
+        Returns:
+            tuple: (cached bars to merge the response into or None, outputsize)
+        """
+        incremental = interval == "1day" or interval in INTRADAY_INTERVAL_MINUTES
+        cached_df = self._load_cached_data(symbol, interval) if incremental else None
+        outputsize = MAX_OUTPUT_SIZE
+        if cached_df is not None and interval in INTRADAY_INTERVAL_MINUTES:
+            outputsize = self._intraday_bars_since(cached_df.index[-1], interval)
+        elif cached_df is not None:
+            missing_days = self._count_missing_trading_days(cached_df.index[-1])
+            # Two more bars: the last cached one may have been stored before the close and is refreshed,
+            # the one before it is final and shows whether the history was adjusted since it was cached
+            outputsize = min(missing_days + 2, MAX_OUTPUT_SIZE)
+        
+        if outputsize < MAX_OUTPUT_SIZE:
+            return cached_df, outputsize
+        return None, MAX_OUTPUT_SIZE
+    
+    def _history_adjusted(self, cached_df: pd.DataFrame, values) -> bool:
+        """
+        Whether fetched bars disagree with final cached bars of the same dates.
+        Twelve Data adjusts past bars for splits, so the whole cached history is stale when they differ.
+        The last cached bar is left out, it may have been stored before the close.
+        """
+        df = self._values_to_dataframe(values)
+        overlap = df.index.intersection(cached_df.index[:-1])
+        if overlap.empty:
+            return False
+        cached_close = cached_df.loc[overlap, 'Close']
+        difference = (df.loc[overlap, 'Close'] - cached_close).abs()
+        return bool((difference > cached_close.abs() * ADJUSTMENT_TOLERANCE).any())
+    
+    def _store_time_series(self, symbol: str, interval: str, values, cached_df: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Merge fetched bars into the cached ones and update the in-memory cache and the bar store"""
+        df = self._values_to_dataframe(values)
+        if cached_df is not None:
+            # New bars replace the cached bars of the same date
+            df = pd.concat([cached_df, df])
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+        
+        # Cache the data
+        self.cache.set("time_series", (symbol, interval), df)
+        
+        # Save to the bar store
+        self._save_data_to_cache(symbol, df, interval)
+        
+        return df
+    
+    @traced("twelve_data.time_series")
+    def get_time_series_data(self, symbol: str, interval: str = "1day", period: str = "4mo") -> pd.DataFrame:
+        """
+        Get time series data for a symbol with intelligent caching.
+        Checks cached data first and only fetches if needed.
+        Concurrent calls for the same symbol and interval share a single request.
+        
+        Args:
+            symbol: Stock symbol
+            interval: Bar interval, each interval has its own full history cache
+            period: Lookback of the returned bars, sliced from the cached history
+        """
+        df = self._single_flight.do(("time_series", symbol, interval), self._load_time_series_data, symbol, interval)
+        # A batch request that could not serve the symbol leaves it to the caller
+        if df is None:
+            df = self._load_time_series_data(symbol, interval)
+        return self._slice_period(df, period)
+    
+    def _load_time_series_data(self, symbol: str, interval: str) -> pd.DataFrame:
+        fresh_df = self._get_fresh_time_series(symbol, interval)
+        if fresh_df is not None:
+            annotate_span(cache_hit=True)
+            return fresh_df
+        
+        cached_df, outputsize = self._plan_time_series_fetch(symbol, interval)
+        if cached_df is not None:
+            print(f"Fetching the last {outputsize} bars for {symbol} from Twelve Data API")
+            annotate_span(delta_bars=outputsize)
+        else:
+            print(f"Fetching fresh data for {symbol} from Twelve Data API")
         
         # Fetch from API
-        url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval={interval}&outputsize=5000&apikey={self.api_key}"
+        url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval={interval}&outputsize={outputsize}&apikey={self.api_key}"
         data = self._make_api_request(url)
         
         if not data.get('values'):
-            print(f"No data available for symbol {symbol}")
-            sys.exit(1)
+            if cached_df is not None:
+                print(f"No new bars for {symbol}, using the cached data")
+                return cached_df
+            raise ValueError(f"No data available for symbol {symbol}")
         
-        # Convert to DataFrame
-        values = data['values']
+        if cached_df is not None and self._history_adjusted(cached_df, data['values']):
+            print(f"Cached bars of {symbol} were adjusted since they were stored, fetching the full history")
+            cached_df = None
+            url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval={interval}&outputsize={MAX_OUTPUT_SIZE}&apikey={self.api_key}"
+            data = self._make_api_request(url)
+            if not data.get('values'):
+                raise ValueError(f"No data available for symbol {symbol}")
+        
+        return self._store_time_series(symbol, interval, data['values'], cached_df)
+    
+    @traced("twelve_data.time_series")
+    async def get_time_series_data_async(self, symbol: str, interval: str = "1day", period: str = "4mo") -> pd.DataFrame:
+        """Async version of get_time_series_data, sharing its caches and its in-flight requests"""
+        df = await self._single_flight.do_async(("time_series", symbol, interval), self._load_time_series_data_async, symbol, interval)
+        if df is None:
+            df = await self._load_time_series_data_async(symbol, interval)
+        return self._slice_period(df, period)
+    
+    async def _load_time_series_data_async(self, symbol: str, interval: str) -> pd.DataFrame:
+        fresh_df = self._get_fresh_time_series(symbol, interval)
+        if fresh_df is not None:
+            annotate_span(cache_hit=True)
+            return fresh_df
+        
+        cached_df, outputsize = self._plan_time_series_fetch(symbol, interval)
+        if cached_df is not None:
+            annotate_span(delta_bars=outputsize)
+        url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval={interval}&outputsize={outputsize}&apikey={self.api_key}"
+        data = await self._make_api_request_async(url)
+        
+        if not data.get('values'):
+            if cached_df is not None:
+                return cached_df
+            raise ValueError(f"No data available for symbol {symbol}")
+        
+        if cached_df is not None and self._history_adjusted(cached_df, data['values']):
+            cached_df = None
+            url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval={interval}&outputsize={MAX_OUTPUT_SIZE}&apikey={self.api_key}"
+            data = await self._make_api_request_async(url)
+            if not data.get('values'):
+                raise ValueError(f"No data available for symbol {symbol}")
+        
+        return self._store_time_series(symbol, interval, data['values'], cached_df)
+    
+    def _get_intraday_buffer(self, symbol: str, interval: str) -> BarRingBuffer:
+        """Ring buffer of a symbol and interval, seeded with the newest bars of the bar store"""
+        key = (symbol, interval)
+        with self._intraday_buffers_lock:
+            buffer = self._intraday_buffers.get(key)
+            if buffer is None:
+                buffer = BarRingBuffer(settings.INTRADAY_BUFFER_BARS)
+                stored_df = self._load_cached_data(symbol, interval)
+                if stored_df is not None:
+                    buffer.extend(stored_df.iloc[-buffer.capacity:])
+                self._intraday_buffers[key] = buffer
+            return buffer
+    
+    @traced("twelve_data.intraday")
+    def get_intraday_bars(self, symbol: str, interval: str = "1min") -> pd.DataFrame:
+        """
+        Get the recent intraday bars of a symbol from its ring buffer.
+        The buffer is refreshed with the bars printed since its newest one, so a midday poll is one small request.
+        
+        Args:
+            symbol: Stock symbol
+            interval: Intraday bar interval, e.g. 1min or 1h
+        
+        Returns:
+            pd.DataFrame: Up to INTRADAY_BUFFER_BARS bars indexed by datetime in ascending order
+        """
+        if interval not in INTRADAY_INTERVAL_MINUTES:
+            raise ValueError(f"{interval} is not an intraday interval")
+        buffer = self._get_intraday_buffer(symbol, interval)
+        self._single_flight.do(("intraday", symbol, interval), self._poll_intraday_bars, symbol, interval, buffer)
+        return buffer.to_frame()
+    
+    def _poll_intraday_bars(self, symbol: str, interval: str, buffer: BarRingBuffer):
+        last_timestamp = buffer.last_timestamp()
+        if last_timestamp is not None and self._has_recent_intraday_bars(last_timestamp, interval):
+            annotate_span(cache_hit=True)
+            return
+        
+        if last_timestamp is not None:
+            outputsize = self._intraday_bars_since(last_timestamp, interval)
+        else:
+            outputsize = min(buffer.capacity, MAX_OUTPUT_SIZE)
+        annotate_span(delta_bars=outputsize)
+        
+        url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval={interval}&outputsize={outputsize}&apikey={self.api_key}"
+        data = self._make_api_request(url)
+        if data.get('values'):
+            # Merge the polled bars into the bar store too, so a restarted process resumes with a delta request
+            merged_df = self._store_time_series(symbol, interval, data['values'], self._load_cached_data(symbol, interval))
+            buffer.extend(merged_df.iloc[-buffer.capacity:])
+        elif last_timestamp is None:
+            raise ValueError(f"No intraday data available for symbol {symbol}")
+    
+    @staticmethod
+    def _split_batch_response(symbols: List[str], data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Per-symbol responses of a batch request, a single symbol is answered without the symbol level"""
+        if len(symbols) == 1:
+            return {symbols[0]: data}
+        return {symbol: data.get(symbol) or {} for symbol in symbols}
+    
+    def _batches(self, symbols: List[str], endpoint: str):
+        # A batch costs credits per symbol, it has to fit in the plan's minute
+        batch_size = max(min(settings.TWELVE_DATA_BATCH_SIZE, self.rate_limiter.max_symbols_per_request(endpoint)), 1)
+        for index in range(0, len(symbols), batch_size):
+            yield symbols[index:index + batch_size]
+    
+    def _plan_time_series_batches(self, symbols: List[str], interval: str):
+        """
+        Split symbols into the cached ones, the ones already in flight and the batch requests of the others.
+        Stale symbols are grouped by outputsize, a batch request has a single outputsize.
+        
+        Returns:
+            tuple: (bars of the cached symbols by symbol, list of (url, cached bars by symbol of the batch),
+                flights led by the batch by key, futures of the symbols in flight elsewhere by symbol)
+        """
+        results = {}
+        plans = {}
+        led = {}
+        followed = {}
+        try:
+            for symbol in dict.fromkeys(symbols):
+                fresh_df = self._get_fresh_time_series(symbol, interval)
+                if fresh_df is not None:
+                    results[symbol] = fresh_df
+                    continue
+                key = ("time_series", symbol, interval)
+                future, leader = self._single_flight.claim(key)
+                if not leader:
+                    followed[symbol] = future
+                    continue
+                led[key] = future
+                cached_df, outputsize = self._plan_time_series_fetch(symbol, interval)
+                plans.setdefault(outputsize, {})[symbol] = cached_df
+            
+            requests_to_send = []
+            for outputsize, cached_frames in plans.items():
+                requests_to_send.extend(self._time_series_batch_requests(cached_frames, interval, outputsize))
+        except BaseException:
+            # The callers only resolve the flights of a complete plan, end the ones already claimed
+            self._resolve_flights(led, results)
+            raise
+        annotate_span(cache_hits=len(results))
+        return results, requests_to_send, led, followed
+    
+    def _time_series_batch_requests(self, cached_frames: Dict[str, Optional[pd.DataFrame]], interval: str, outputsize: int):
+        """List of (url, cached bars by symbol of the batch) of the symbols requested with the same outputsize"""
+        requests_to_send = []
+        for batch in self._batches(list(cached_frames), "time_series"):
+            url = f"https://api.twelvedata.com/time_series?symbol={','.join(batch)}&interval={interval}&outputsize={outputsize}&apikey={self.api_key}"
+            requests_to_send.append((url, {symbol: cached_frames[symbol] for symbol in batch}))
+        return requests_to_send
+    
+    def _resolve_flights(self, led, results):
+        """End the flights led by a batch, the symbols it could not serve are left to their callers"""
+        for key, future in led.items():
+            self._single_flight.resolve(key, future, results.get(key[1]))
+    
+    @staticmethod
+    def _collect_flights(followed, results):
+        """Wait for the symbols fetched by other callers, from a thread off the event loop"""
+        for symbol, future in followed.items():
+            try:
+                value = future.result()
+            except Exception as e:
+                print(f"Error fetching {symbol}: {e}")
+                continue
+            if value is not None:
+                results[symbol] = value
+    
+    @staticmethod
+    async def _collect_flights_async(followed, results):
+        """Wait for the symbols fetched by other callers without blocking the event loop"""
+        for symbol, future in followed.items():
+            try:
+                value = await asyncio.wrap_future(future)
+            except Exception as e:
+                print(f"Error fetching {symbol}: {e}")
+                continue
+            if value is not None:
+                results[symbol] = value
+    
+    def _store_time_series_batch(self, data: Dict[str, Any], cached_frames: Dict[str, Optional[pd.DataFrame]], interval: str, results: Dict[str, pd.DataFrame]) -> List[str]:
+        """
+        Split a batch response into the per-symbol caches and the results.
+        
+        Returns:
+            list: Symbols whose cached history was adjusted and has to be fetched in full
+        """
+        count_in_span(requests=1)
+        adjusted = []
+        for symbol, symbol_data in self._split_batch_response(list(cached_frames), data).items():
+            cached_df = cached_frames[symbol]
+            if symbol_data.get('values') and cached_df is not None and self._history_adjusted(cached_df, symbol_data['values']):
+                print(f"Cached bars of {symbol} were adjusted since they were stored, fetching the full history")
+                adjusted.append(symbol)
+            elif symbol_data.get('values'):
+                results[symbol] = self._store_time_series(symbol, interval, symbol_data['values'], cached_df)
+            elif cached_df is not None:
+                results[symbol] = cached_df
+            else:
+                print(f"No data available for symbol {symbol}: {symbol_data.get('message', 'empty response')}")
+        return adjusted
+    
+    @traced("twelve_data.time_series_batch")
+    def get_time_series_batch(self, symbols: List[str], interval: str = "1day", period: str = "4mo") -> Dict[str, pd.DataFrame]:
+        """
+        Get the time series of many symbols with one request per batch of stale symbols.
+        Each symbol's bars are stored in its own cache, so later get_time_series_data calls are cache hits.
+        
+        Args:
+            symbols: Symbols to fetch
+            interval: Bar interval
+            period: Lookback of the returned bars, sliced from the cached history
+        
+        Returns:
+            dict: The bars by symbol, symbols the API could not serve are left out
+        """
+        results, requests_to_send, led, followed = self._plan_time_series_batches(symbols, interval)
+        try:
+            adjusted = []
+            for url, cached_frames in requests_to_send:
+                print(f"Fetching bars for {', '.join(cached_frames)} from Twelve Data API")
+                adjusted += self._store_time_series_batch(self._make_api_request(url), cached_frames, interval, results)
+            # Symbols whose history was adjusted are fetched again in full
+            full_history = dict.fromkeys(adjusted)
+            for url, cached_frames in self._time_series_batch_requests(full_history, interval, MAX_OUTPUT_SIZE):
+                self._store_time_series_batch(self._make_api_request(url), cached_frames, interval, results)
+        finally:
+            self._resolve_flights(led, results)
+        self._collect_flights(followed, results)
+        return {symbol: self._slice_period(df, period) for symbol, df in results.items()}
+    
+    @traced("twelve_data.time_series_batch")
+    async def get_time_series_batch_async(self, symbols: List[str], interval: str = "1day", period: str = "4mo") -> Dict[str, pd.DataFrame]:
+        """Async version of get_time_series_batch, the batch requests are sent concurrently"""
+        results, requests_to_send, led, followed = self._plan_time_series_batches(symbols, interval)
+        try:
+            adjusted = await self._send_time_series_batches(requests_to_send, interval, results)
+            # Symbols whose history was adjusted are fetched again in full
+            full_history = dict.fromkeys(adjusted)
+            await self._send_time_series_batches(self._time_series_batch_requests(full_history, interval, MAX_OUTPUT_SIZE), interval, results)
+        finally:
+            self._resolve_flights(led, results)
+        await self._collect_flights_async(followed, results)
+        return {symbol: self._slice_period(df, period) for symbol, df in results.items()}
+    
+    async def _send_time_series_batches(self, requests_to_send, interval: str, results: Dict[str, pd.DataFrame]) -> List[str]:
+        """Send batch requests concurrently and store their responses, returns the symbols whose history was adjusted"""
+        responses = await asyncio.gather(
+            *[self._make_api_request_async(url) for url, _ in requests_to_send],
+            return_exceptions=True
+        )
+        adjusted = []
+        for (_, cached_frames), data in zip(requests_to_send, responses):
+            if isinstance(data, Exception):
+                print(f"Error fetching bars for {', '.join(cached_frames)}: {data}")
+                continue
+            adjusted += self._store_time_series_batch(data, cached_frames, interval, results)
+        return adjusted
+    
+    @staticmethod
+    def _values_to_dataframe(values) -> pd.DataFrame:
+        """Convert the values of a time series response to OHLCV bars in ascending date order"""
         df = pd.DataFrame(values)
         
         # Convert datetime and set as index
@@ -232,132 +744,264 @@ class TwelveDataManager:
             df['Volume'] = 0
         
         # Sort by date in ascending order
-        df = df.sort_index()
-        
-        # Cache the data
-        self._cached_data[cache_key] = df
-        self._last_fetch_times[cache_key] = current_time
-        
-        # Save to CSV cache
-        self._save_data_to_cache(symbol, df)
-        
-        return df
+        return df.sort_index()
     
+    @traced("twelve_data.quote")
     def get_quote_data(self, symbol: str) -> Dict[str, Any]:
         """
         Get quote data for a symbol with caching.
+        Concurrent calls for the same symbol share a single request.
         """
-        current_time = time.time()
-        
+        quote_data = self._single_flight.do(("quote", symbol), self._load_quote_data, symbol)
+        # A batch request that could not serve the symbol leaves it to the caller
+        return quote_data if quote_data is not None else self._load_quote_data(symbol)
+    
+    def _load_quote_data(self, symbol: str) -> Dict[str, Any]:
         # Check in-memory cache
-        if (symbol in self._cached_quotes and 
-            current_time - self._last_quote_fetch_times.get(symbol, 0) < self._cache_ttl):
-            return self._cached_quotes[symbol]
+        quote_data = self.cache.get("quote", symbol)
+        if quote_data is not None:
+            annotate_span(cache_hit=True)
+            return quote_data
         
         # Try quote endpoint first
         quote_url = f"https://api.twelvedata.com/quote?symbol={symbol}&apikey={self.api_key}"
-        quote_data = self._make_api_request(quote_url)
-        
-        # If quote fails, fallback to time series
-        if not quote_data or quote_data.get('status') == 'error':
+        try:
+            quote_data = self._normalize_quote(self._make_api_request(quote_url), symbol)
+        except ValueError:
+            # If quote fails, fallback to time series
             time_series_url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval=1day&outputsize=30&apikey={self.api_key}"
             ts_data = self._make_api_request(time_series_url)
-            
             if not ts_data.get('values'):
-                print(f"No quote data available for symbol {symbol}")
-                sys.exit(1)
-            
-            # Create quote data from time series
-            current = ts_data['values'][0]
-            previous = ts_data['values'][1] if len(ts_data['values']) > 1 else None
-            
-            # Calculate change and percent change
-            change = ''
-            percent_change = ''
-            if previous and 'close' in current and 'close' in previous:
-                current_close = float(current['close'])
-                prev_close = float(previous['close'])
-                change = round(current_close - prev_close, 2)
-                percent_change = round((current_close - prev_close) / prev_close * 100, 2)
-            
-            quote_data = {
-                "symbol": symbol,
-                "name": ts_data['meta'].get('name', symbol),
-                "exchange": ts_data['meta'].get('exchange', ''),
-                "mic_code": ts_data['meta'].get('mic_code', ''),
-                "currency": ts_data['meta'].get('currency', ''),
-                "datetime": current.get('datetime', ''),
-                "open": current.get('open', ''),
-                "high": current.get('high', ''),
-                "low": current.get('low', ''),
-                "close": current.get('close', ''),
-                "volume": current.get('volume', ''),
-                "previous_close": previous.get('close', '') if previous else '',
-                "change": change,
-                "percent_change": percent_change,
-                "average_volume": '',
-                "fifty_two_week": {
-                    "low": '',
-                    "high": '',
-                    "low_change": '',
-                    "low_change_percent": '',
-                    "high_change": '',
-                    "high_change_percent": '',
-                    "range": ''
-                }
-            }
-        else:
-            # Ensure quote_data has the right structure
-            quote_data = {
-                "symbol": quote_data.get('symbol', symbol),
-                "name": quote_data.get('name', symbol),
-                "exchange": quote_data.get('exchange', ''),
-                "mic_code": quote_data.get('mic_code', ''),
-                "currency": quote_data.get('currency', ''),
-                "datetime": quote_data.get('datetime', ''),
-                "open": quote_data.get('open', ''),
-                "high": quote_data.get('high', ''),
-                "low": quote_data.get('low', ''),
-                "close": quote_data.get('close', ''),
-                "volume": quote_data.get('volume', ''),
-                "previous_close": quote_data.get('previous_close', ''),
-                "change": quote_data.get('change', ''),
-                "percent_change": quote_data.get('percent_change', ''),
-                "average_volume": quote_data.get('average_volume', ''),
-                "fifty_two_week": quote_data.get('fifty_two_week', {
-                    "low": '',
-                    "high": '',
-                    "low_change": '',
-                    "low_change_percent": '',
-                    "high_change": '',
-                    "high_change_percent": '',
-                    "range": ''
-                })
-            }
+                raise ValueError(f"No quote data available for symbol {symbol}")
+            quote_data = self._quote_from_time_series(ts_data, symbol)
         
         # Cache the data
-        self._cached_quotes[symbol] = quote_data
-        self._last_quote_fetch_times[symbol] = current_time
+        self.cache.set("quote", symbol, quote_data)
         
         return quote_data
+    
+    @traced("twelve_data.quote")
+    async def get_quote_data_async(self, symbol: str) -> Dict[str, Any]:
+        """Async version of get_quote_data, sharing its cache and its in-flight requests"""
+        quote_data = await self._single_flight.do_async(("quote", symbol), self._load_quote_data_async, symbol)
+        return quote_data if quote_data is not None else await self._load_quote_data_async(symbol)
+    
+    async def _load_quote_data_async(self, symbol: str) -> Dict[str, Any]:
+        # Check in-memory cache
+        quote_data = self.cache.get("quote", symbol)
+        if quote_data is not None:
+            annotate_span(cache_hit=True)
+            return quote_data
+        
+        quote_url = f"https://api.twelvedata.com/quote?symbol={symbol}&apikey={self.api_key}"
+        try:
+            quote_data = self._normalize_quote(await self._make_api_request_async(quote_url), symbol)
+        except ValueError:
+            # If quote fails, fallback to time series
+            time_series_url = f"https://api.twelvedata.com/time_series?symbol={symbol}&interval=1day&outputsize=30&apikey={self.api_key}"
+            ts_data = await self._make_api_request_async(time_series_url)
+            if not ts_data.get('values'):
+                raise ValueError(f"No quote data available for symbol {symbol}")
+            quote_data = self._quote_from_time_series(ts_data, symbol)
+        
+        # Cache the data
+        self.cache.set("quote", symbol, quote_data)
+        
+        return quote_data
+    
+    @staticmethod
+    def _quote_from_time_series(ts_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        """Create quote data from the last bars of a time series response"""
+        current = ts_data['values'][0]
+        previous = ts_data['values'][1] if len(ts_data['values']) > 1 else None
+        
+        # Calculate change and percent change
+        change = ''
+        percent_change = ''
+        if previous and 'close' in current and 'close' in previous:
+            current_close = float(current['close'])
+            prev_close = float(previous['close'])
+            change = round(current_close - prev_close, 2)
+            percent_change = round((current_close - prev_close) / prev_close * 100, 2)
+        
+        return {
+            "symbol": symbol,
+            "name": ts_data['meta'].get('name', symbol),
+            "exchange": ts_data['meta'].get('exchange', ''),
+            "mic_code": ts_data['meta'].get('mic_code', ''),
+            "currency": ts_data['meta'].get('currency', ''),
+            "datetime": current.get('datetime', ''),
+            "open": current.get('open', ''),
+            "high": current.get('high', ''),
+            "low": current.get('low', ''),
+            "close": current.get('close', ''),
+            "volume": current.get('volume', ''),
+            "previous_close": previous.get('close', '') if previous else '',
+            "change": change,
+            "percent_change": percent_change,
+            "average_volume": '',
+            "fifty_two_week": {
+                "low": '',
+                "high": '',
+                "low_change": '',
+                "low_change_percent": '',
+                "high_change": '',
+                "high_change_percent": '',
+                "range": ''
+            }
+        }
+    
+    @staticmethod
+    def _normalize_quote(quote_data: Dict[str, Any], symbol: str) -> Dict[str, Any]:
+        """Ensure quote_data has the right structure"""
+        return {
+            "symbol": quote_data.get('symbol', symbol),
+            "name": quote_data.get('name', symbol),
+            "exchange": quote_data.get('exchange', ''),
+            "mic_code": quote_data.get('mic_code', ''),
+            "currency": quote_data.get('currency', ''),
+            "datetime": quote_data.get('datetime', ''),
+            "open": quote_data.get('open', ''),
+            "high": quote_data.get('high', ''),
+            "low": quote_data.get('low', ''),
+            "close": quote_data.get('close', ''),
+            "volume": quote_data.get('volume', ''),
+            "previous_close": quote_data.get('previous_close', ''),
+            "change": quote_data.get('change', ''),
+            "percent_change": quote_data.get('percent_change', ''),
+            "average_volume": quote_data.get('average_volume', ''),
+            "fifty_two_week": quote_data.get('fifty_two_week', {
+                "low": '',
+                "high": '',
+                "low_change": '',
+                "low_change_percent": '',
+                "high_change": '',
+                "high_change_percent": '',
+                "range": ''
+            })
+        }
+    
+    def _plan_quote_batches(self, symbols: List[str]):
+        """
+        Split symbols into the ones with a quote cached in memory, the ones already in flight
+        and the batch requests of the others.
+        
+        Returns:
+            tuple: (cached quotes by symbol, list of (url, symbols of the batch),
+                flights led by the batch by key, futures of the symbols in flight elsewhere by symbol)
+        """
+        results = {}
+        missing = []
+        led = {}
+        followed = {}
+        try:
+            for symbol in dict.fromkeys(symbols):
+                quote_data = self.cache.get("quote", symbol)
+                if quote_data is not None:
+                    results[symbol] = quote_data
+                    continue
+                key = ("quote", symbol)
+                future, leader = self._single_flight.claim(key)
+                if leader:
+                    led[key] = future
+                    missing.append(symbol)
+                else:
+                    followed[symbol] = future
+            
+            requests_to_send = [
+                (f"https://api.twelvedata.com/quote?symbol={','.join(batch)}&apikey={self.api_key}", batch)
+                for batch in self._batches(missing, "quote")
+            ]
+        except BaseException:
+            # The callers only resolve the flights of a complete plan, end the ones already claimed
+            self._resolve_flights(led, results)
+            raise
+        annotate_span(cache_hits=len(results))
+        return results, requests_to_send, led, followed
+    
+    def _store_quote_batch(self, data: Dict[str, Any], batch: List[str], results: Dict[str, Dict[str, Any]]):
+        """Split a batch response into the quote cache and the results"""
+        count_in_span(requests=1)
+        for symbol, quote_data in self._split_batch_response(batch, data).items():
+            if not quote_data or quote_data.get('status') == 'error':
+                continue
+            results[symbol] = self._normalize_quote(quote_data, symbol)
+            self.cache.set("quote", symbol, results[symbol])
+    
+    @traced("twelve_data.quote_batch")
+    def get_quotes_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the quotes of many symbols with one request per batch of symbols not cached in memory.
+        Symbols the quote endpoint cannot serve are left out, get_quote_data falls back to the time series for them.
+        
+        Returns:
+            dict: The quotes by symbol
+        """
+        results, requests_to_send, led, followed = self._plan_quote_batches(symbols)
+        try:
+            for url, batch in requests_to_send:
+                self._store_quote_batch(self._make_api_request(url), batch, results)
+        finally:
+            self._resolve_flights(led, results)
+        self._collect_flights(followed, results)
+        return results
+    
+    @traced("twelve_data.quote_batch")
+    async def get_quotes_batch_async(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Async version of get_quotes_batch, the batch requests are sent concurrently"""
+        results, requests_to_send, led, followed = self._plan_quote_batches(symbols)
+        try:
+            responses = await asyncio.gather(
+                *[self._make_api_request_async(url) for url, _ in requests_to_send],
+                return_exceptions=True
+            )
+            for (_, batch), data in zip(requests_to_send, responses):
+                if isinstance(data, Exception):
+                    print(f"Error fetching quotes for {', '.join(batch)}: {data}")
+                    continue
+                self._store_quote_batch(data, batch, results)
+        finally:
+            self._resolve_flights(led, results)
+        await self._collect_flights_async(followed, results)
+        return results
+    
+    def prefetch(self, symbols: List[str], include_quotes: bool = True):
+        """Warm the daily bar and quote caches of many symbols with batched requests"""
+        self.get_time_series_batch(symbols)
+        if include_quotes:
+            self.get_quotes_batch(symbols)
+    
+    async def prefetch_async(self, symbols: List[str], include_quotes: bool = True):
+        """Warm the daily bar and quote caches of many symbols from the event loop, bars and quotes at the same time"""
+        fetches = [self.get_time_series_batch_async(symbols)]
+        if include_quotes:
+            fetches.append(self.get_quotes_batch_async(symbols))
+        await asyncio.gather(*fetches)
+
+    def format_stats(self) -> str:
+        """Format the request scheduling and deduplication statistics for the console"""
+        flights = self._single_flight.stats()
+        return (
+            f"{self.rate_limiter.format_stats()}\n"
+            f"Twelve Data single-flight: {flights['leaders']} requests led, {flights['followers']} callers served by a request in flight"
+        )
 
     def get_company_name(self, symbol: str) -> str:
         """
         Get company name for a symbol with intelligent caching.
         Checks cached data first and only fetches if needed.
         """
-        current_time = time.time()
-        
         # Check in-memory cache first
-        if (symbol in self._cached_company_names and 
-            current_time - self._last_company_fetch_times.get(symbol, 0) < self._cache_ttl):
-            return self._cached_company_names[symbol]
+        company_name = self.cache.get("company_name", symbol)
+        if company_name is not None:
+            return company_name
         
         # Check if we have it in the JSON file cache
-        if symbol in self._cached_company_names:
-            # Update in-memory cache timing
-            self._last_company_fetch_times[symbol] = current_time
-            return self._cached_company_names[symbol]
+        with self._company_names_lock:
+            company_name = self._load_company_names_from_file().get(symbol)
+        if company_name is not None:
+            self.cache.set("company_name", symbol, company_name)
+            return company_name
         
         print(f"Fetching fresh company name for {symbol} from Twelve Data API")
         
@@ -367,11 +1011,8 @@ class TwelveDataManager:
             company_name = quote_data.get("name", symbol)
             
             # Cache the data in-memory and file
-            self._cached_company_names[symbol] = company_name
-            self._last_company_fetch_times[symbol] = current_time
-            
-            # Save to JSON file
-            self._save_company_names_to_file()
+            self.cache.set("company_name", symbol, company_name)
+            self._save_company_name_to_file(symbol, company_name)
             
             return company_name
             
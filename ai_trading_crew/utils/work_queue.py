@@ -0,0 +1,233 @@
+"""
+SQLite-backed work queue shared by the worker processes of a sharded run.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+PENDING = "pending"
+CLAIMED = "claimed"
+DONE = "done"
+FAILED = "failed"
+
+
+class SymbolWorkQueue:
+    """
+    Queue of the symbols to process for a run date.
+    Claims are atomic across processes, and a symbol claimed by a worker that died
+    is handed out again once its claim times out or the worker restarts.
+    """
+
+    def __init__(self, db_path: str, run_date: str, claim_timeout: float = 3600):
+        self.db_path = db_path
+        self.run_date = run_date
+        self.claim_timeout = claim_timeout
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, transactions are opened explicitly where needed
+        connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _init_db(self):
+        with closing(self._connect()) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS symbol_queue (
+                    run_date TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    priority REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    claimed_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    PRIMARY KEY (run_date, symbol)
+                )
+                """
+            )
+
+    def enqueue(self, symbols: List[str], priority: float = 0):
+        """
+        Add symbols to the queue. Symbols already done or in progress today are left as is,
+        failed ones are queued again.
+        """
+        with closing(self._connect()) as connection:
+            for symbol in symbols:
+                connection.execute(
+                    """
+                    INSERT INTO symbol_queue (run_date, symbol, priority, status) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (run_date, symbol) DO UPDATE SET status = excluded.status, priority = excluded.priority, error = NULL
+                    WHERE symbol_queue.status IN (?, ?)
+                    """,
+                    (self.run_date, symbol, priority, PENDING, PENDING, FAILED)
+                )
+
+    def claim(self, worker: str) -> Optional[str]:
+        """
+        Claim the next unfinished symbol, highest priority first.
+
+        Returns:
+            str: The claimed symbol, or None when nothing is left to claim
+        """
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                """
+                SELECT symbol FROM symbol_queue
+                WHERE run_date = ? AND (status = ? OR (status = ? AND claimed_at < ?))
+                ORDER BY priority DESC, rowid
+                LIMIT 1
+                """,
+                (self.run_date, PENDING, CLAIMED, now - self.claim_timeout)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            connection.execute(
+                """
+                UPDATE symbol_queue SET status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1
+                WHERE run_date = ? AND symbol = ?
+                """,
+                (CLAIMED, worker, now, self.run_date, row[0])
+            )
+            connection.execute("COMMIT")
+            return row[0]
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def claim_symbol(self, symbol: str, worker: str) -> bool:
+        """
+        Claim a given symbol if it is pending or its claim expired.
+
+        Returns:
+            bool: Whether the worker now holds the claim
+        """
+        now = time.time()
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                """
+                UPDATE symbol_queue SET status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1
+                WHERE run_date = ? AND symbol = ? AND (status = ? OR (status = ? AND claimed_at < ?))
+                """,
+                (CLAIMED, worker, now, self.run_date, symbol, PENDING, CLAIMED, now - self.claim_timeout)
+            )
+            return cursor.rowcount == 1
+
+    def release_worker(self, worker: str):
+        """Put the symbols still claimed by a worker back in the queue (used when the worker restarts)"""
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "UPDATE symbol_queue SET status = ?, worker = NULL WHERE run_date = ? AND status = ? AND worker = ?",
+                (PENDING, self.run_date, CLAIMED, worker)
+            )
+
+    def _set_status(self, symbol: str, status: str, error: Optional[str] = None):
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "UPDATE symbol_queue SET status = ?, error = ? WHERE run_date = ? AND symbol = ?",
+                (status, error, self.run_date, symbol)
+            )
+
+    def complete(self, symbol: str):
+        """Mark a symbol as processed"""
+        self._set_status(symbol, DONE)
+
+    def fail(self, symbol: str, error: str):
+        """Mark a symbol as failed"""
+        self._set_status(symbol, FAILED, error)
+
+    def status(self, symbol: str) -> Optional[str]:
+        """Get the status of a symbol, None if it is not queued"""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT status FROM symbol_queue WHERE run_date = ? AND symbol = ?",
+                (self.run_date, symbol)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _claim_state(self, symbol: str) -> Tuple[Optional[str], Optional[float]]:
+        """Status of a symbol and the time it was claimed"""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT status, claimed_at FROM symbol_queue WHERE run_date = ? AND symbol = ?",
+                (self.run_date, symbol)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def error(self, symbol: str) -> Optional[str]:
+        """Get the error recorded for a failed symbol"""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT error FROM symbol_queue WHERE run_date = ? AND symbol = ?",
+                (self.run_date, symbol)
+            ).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of symbols per status for the run date"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT status, COUNT(*) FROM symbol_queue WHERE run_date = ? GROUP BY status",
+                (self.run_date,)
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def has_unfinished(self) -> bool:
+        """Whether some symbols are still pending or claimed"""
+        counts = self.counts()
+        return counts.get(PENDING, 0) + counts.get(CLAIMED, 0) > 0
+
+    async def wait_until_done(
+        self,
+        symbol: str,
+        worker: Optional[str] = None,
+        run_claimed: Optional[Callable[[], Awaitable]] = None,
+        poll_interval: float = 5.0
+    ):
+        """
+        Wait until a symbol has been processed by any worker.
+        The queue is polled from a thread, so the event loop keeps running meanwhile.
+
+        Args:
+            symbol: Symbol to wait for
+            worker: Worker claiming the symbol if nobody processes it anymore
+            run_claimed: Coroutine function processing the symbol once the waiter claimed it, used when the
+                symbol is left pending or its claim expired (e.g. its worker died after the last restart)
+            poll_interval: Seconds between two polls of the queue
+
+        Raises:
+            RuntimeError: If the symbol failed, or its claim expired and there is no run_claimed to take it over
+        """
+        while True:
+            status, claimed_at = await asyncio.to_thread(self._claim_state, symbol)
+            if status == DONE:
+                return
+            if status == FAILED:
+                raise RuntimeError(f"Processing of {symbol} failed: {await asyncio.to_thread(self.error, symbol)}")
+
+            expired = status == CLAIMED and claimed_at is not None and claimed_at < time.time() - self.claim_timeout
+            if run_claimed is None and expired:
+                raise RuntimeError(f"The claim on {symbol} expired without it being processed")
+            if run_claimed is not None and (status == PENDING or expired):
+                if await asyncio.to_thread(self.claim_symbol, symbol, worker):
+                    try:
+                        await run_claimed()
+                    except Exception as e:
+                        await asyncio.to_thread(self.fail, symbol, str(e))
+                        raise RuntimeError(f"Processing of {symbol} failed: {e}") from e
+                    await asyncio.to_thread(self.complete, symbol)
+                    return
+            await asyncio.sleep(poll_interval)
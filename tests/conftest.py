@@ -0,0 +1,4 @@
+import os
+
+# The Twelve Data manager singleton requires an API key at import, no request is sent by the tests
+os.environ.setdefault("TWELVE_API_KEY", "test")
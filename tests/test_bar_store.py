@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from ai_trading_crew.utils.bar_store import BAR_DTYPE, BarStore, bars_to_frame, frame_to_bars
+
+
+def make_bars(days=3):
+    index = pd.DatetimeIndex(pd.date_range("2024-07-01", periods=days, freq="D"), name="datetime")
+    return pd.DataFrame({
+        "Open": np.arange(days, dtype=float) + 100,
+        "High": np.arange(days, dtype=float) + 101,
+        "Low": np.arange(days, dtype=float) + 99,
+        "Close": np.arange(days, dtype=float) + 100.5,
+        "Volume": np.arange(days) * 1000,
+    }, index=index)
+
+
+def assert_same_bars(frame, df):
+    # Stored timestamps have a resolution of one second, only their values are compared
+    assert frame.index.equals(df.index)
+    pd.testing.assert_frame_equal(frame.reset_index(drop=True), df.reset_index(drop=True))
+
+
+def test_frame_round_trip():
+    df = make_bars()
+    bars = frame_to_bars(df)
+    assert bars.dtype == BAR_DTYPE
+    assert_same_bars(bars_to_frame(bars), df)
+
+
+def test_missing_and_nan_volume_become_zero():
+    df = make_bars().drop(columns="Volume")
+    assert (frame_to_bars(df)["Volume"] == 0).all()
+    df["Volume"] = [1.6, np.nan, 3.0]
+    assert frame_to_bars(df)["Volume"].tolist() == [2, 0, 3]
+
+
+def test_bars_to_frame_selected_columns():
+    frame = bars_to_frame(frame_to_bars(make_bars()), ["Close"])
+    assert list(frame.columns) == ["Close"]
+    assert frame.index.name == "datetime"
+
+
+def test_store_write_read(tmp_path):
+    store = BarStore(tmp_path)
+    df = make_bars()
+    assert store.read("BRK/B", "1day") is None
+    store.write("BRK/B", "1day", df)
+    assert_same_bars(store.read("BRK/B", "1day"), df)
+    assert store.last_timestamp("BRK/B", "1day") == pd.Timestamp("2024-07-03")
+    assert store.path("BRK/B", "1day").name == "brk_b_1day.npy"
+
+
+def test_store_write_replaces_the_history(tmp_path):
+    store = BarStore(tmp_path)
+    store.write("AAPL", "1min", make_bars(3))
+    store.write("AAPL", "1min", make_bars(2))
+    assert len(store.read("AAPL", "1min")) == 2
+    assert store.read("AAPL", "1day") is None
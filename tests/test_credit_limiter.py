@@ -0,0 +1,93 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai_trading_crew.utils import credit_limiter
+from ai_trading_crew.utils.credit_limiter import CreditRateLimiter, WINDOW_SECONDS, prepaid_credits
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock of the limiter, advanced by the tests"""
+    now = [1000.0]
+    monkeypatch.setattr(credit_limiter, "time", SimpleNamespace(monotonic=lambda: now[0], sleep=time.sleep))
+    return now
+
+
+def test_requests_within_the_plan_do_not_wait(clock):
+    limiter = CreditRateLimiter(3)
+    assert [limiter._reserve(1) for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_request_over_the_plan_waits_for_the_window(clock):
+    limiter = CreditRateLimiter(2)
+    limiter._reserve(1)
+    clock[0] += 10
+    limiter._reserve(1)
+    # The first request leaves the window 60s after it was sent
+    assert limiter._reserve(1) == pytest.approx(WINDOW_SECONDS - 10)
+
+
+def test_requests_keep_their_order(clock):
+    limiter = CreditRateLimiter(2)
+    limiter._reserve(2)
+    assert limiter._reserve(2) == pytest.approx(WINDOW_SECONDS)
+    # A cheaper request is still scheduled behind the one waiting
+    assert limiter._reserve(1) == pytest.approx(2 * WINDOW_SECONDS)
+
+
+def test_entries_leave_the_window(clock):
+    limiter = CreditRateLimiter(1)
+    limiter._reserve(1)
+    clock[0] += WINDOW_SECONDS + 1
+    assert limiter._reserve(1) == 0.0
+    assert len(limiter._ledger) == 1
+
+
+def test_request_costing_more_than_the_plan_fits_an_empty_window(clock):
+    limiter = CreditRateLimiter(2)
+    assert limiter._reserve(5) == 0.0
+    assert limiter.stats()["credits_last_minute"] == 2
+
+
+def test_batch_credits_and_size():
+    limiter = CreditRateLimiter(8, {"quote": 2})
+    assert limiter.request_credits("quote", symbols=3) == 6
+    assert limiter.request_credits("time_series", symbols=3) == 3
+    assert limiter.max_symbols_per_request("quote") == 4
+
+
+def test_throttle_is_not_reported_as_spent_credits(clock):
+    limiter = CreditRateLimiter(2)
+    limiter._reserve(1)
+    limiter.throttled()
+    stats = limiter.stats()
+    assert stats["throttled"] == 1
+    assert stats["requests"] == 1
+    assert stats["credits_last_minute"] == 1
+    assert stats["throttle_wait"] == pytest.approx(2 * WINDOW_SECONDS)
+    # The next request waits for the window held back by the rate limit answer
+    assert limiter._reserve(1) == pytest.approx(2 * WINDOW_SECONDS)
+
+
+def test_unused_prepayment_is_refunded(clock):
+    limiter = CreditRateLimiter(1)
+    prepayment = asyncio.run(limiter.prepay_async(1))
+    limiter.refund(prepayment)
+    assert limiter._reserve(1) == 0.0
+
+
+def test_prepayment_is_spent_by_the_first_request(clock):
+    limiter = CreditRateLimiter(1)
+    prepayment = asyncio.run(limiter.prepay_async(1))
+    token = prepaid_credits.set(prepayment)
+    try:
+        assert limiter.acquire(1) == 0.0
+    finally:
+        prepaid_credits.reset(token)
+    # Spent, so the refund leaves the ledger as is
+    limiter.refund(prepayment)
+    assert limiter.stats()["requests"] == 1
+    assert limiter._reserve(1) == pytest.approx(WINDOW_SECONDS)
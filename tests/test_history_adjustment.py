@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from ai_trading_crew.utils.twelve_data_manager import MAX_OUTPUT_SIZE, twelve_data_manager
+
+
+def make_values(closes, start="2024-07-01"):
+    """Time series values as answered by Twelve Data, newest first"""
+    dates = pd.bdate_range(start, periods=len(closes))
+    values = [
+        {"datetime": day.strftime("%Y-%m-%d"), "open": close, "high": close, "low": close, "close": close, "volume": "100"}
+        for day, close in zip(dates, closes)
+    ]
+    return list(reversed(values))
+
+
+def make_cached(closes):
+    return twelve_data_manager._values_to_dataframe(make_values(closes))
+
+
+def test_unchanged_bars_are_not_an_adjustment():
+    cached = make_cached(["100", "101", "102"])
+    assert not twelve_data_manager._history_adjusted(cached, make_values(["100", "101", "102", "103"]))
+
+
+def test_refreshed_last_cached_bar_is_not_an_adjustment():
+    # The last cached bar may have been stored before the close
+    cached = make_cached(["100", "101", "102"])
+    assert not twelve_data_manager._history_adjusted(cached, make_values(["100", "101", "105", "106"]))
+
+
+def test_split_is_detected():
+    cached = make_cached(["400", "404", "408"])
+    assert twelve_data_manager._history_adjusted(cached, make_values(["100", "101", "102", "103"]))
+
+
+def test_differences_within_the_tolerance_are_ignored():
+    cached = make_cached(["100", "101", "102"])
+    assert not twelve_data_manager._history_adjusted(cached, make_values(["100.05", "101", "102"]))
+
+
+def test_no_overlap_is_not_an_adjustment():
+    cached = make_cached(["100", "101"])
+    assert not twelve_data_manager._history_adjusted(cached, make_values(["50"], start="2024-08-01"))
+
+
+@pytest.fixture
+def cached_bars(monkeypatch):
+    cached = make_cached(["100", "101", "102"])
+    monkeypatch.setattr(twelve_data_manager, "_load_cached_data", lambda symbol, interval: cached)
+    return cached
+
+
+def test_plan_without_cache_fetches_the_full_history(monkeypatch):
+    monkeypatch.setattr(twelve_data_manager, "_load_cached_data", lambda symbol, interval: None)
+    assert twelve_data_manager._plan_time_series_fetch("AAPL", "1day") == (None, MAX_OUTPUT_SIZE)
+
+
+def test_plan_requests_the_missing_days_and_two_overlapping_bars(monkeypatch, cached_bars):
+    monkeypatch.setattr(twelve_data_manager, "_count_missing_trading_days", lambda last: 3)
+    cached_df, outputsize = twelve_data_manager._plan_time_series_fetch("AAPL", "1day")
+    assert cached_df is cached_bars
+    assert outputsize == 5
+
+
+def test_plan_falls_back_to_the_full_history_when_too_much_is_missing(monkeypatch, cached_bars):
+    monkeypatch.setattr(twelve_data_manager, "_count_missing_trading_days", lambda last: MAX_OUTPUT_SIZE)
+    assert twelve_data_manager._plan_time_series_fetch("AAPL", "1day") == (None, MAX_OUTPUT_SIZE)
+
+
+def test_plan_of_other_intervals_is_never_incremental(cached_bars):
+    assert twelve_data_manager._plan_time_series_fetch("AAPL", "1week") == (None, MAX_OUTPUT_SIZE)
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ai_trading_crew.utils import memory_cache
+from ai_trading_crew.utils.memory_cache import MemoryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock of the cache, advanced by the tests"""
+    now = [1000.0]
+    monkeypatch.setattr(memory_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_get_and_miss(clock):
+    cache = MemoryCache(4)
+    cache.set("quote", "AAPL", 1)
+    assert cache.get("quote", "AAPL") == 1
+    assert cache.get("quote", "MSFT", default="missing") == "missing"
+    assert cache.stats()["quote"]["hits"] == 1
+    assert cache.stats()["quote"]["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = MemoryCache(2)
+    cache.set("quote", "AAPL", 1)
+    cache.set("quote", "MSFT", 2)
+    # Reading AAPL makes MSFT the least recently used entry
+    cache.get("quote", "AAPL")
+    cache.set("quote", "NVDA", 3)
+    assert cache.get("quote", "MSFT") is None
+    assert cache.get("quote", "AAPL") == 1
+    assert cache.get("quote", "NVDA") == 3
+    assert cache.stats()["quote"]["evictions"] == 1
+
+
+def test_entries_expire_after_their_namespace_ttl(clock):
+    cache = MemoryCache(4, ttls={"quote": 10, "profile": None}, default_ttl=100)
+    cache.set("quote", "AAPL", 1)
+    cache.set("profile", "AAPL", "Apple")
+    cache.set("other", "AAPL", 2)
+    clock[0] += 11
+    assert cache.get("quote", "AAPL") is None
+    assert cache.get("profile", "AAPL") == "Apple"
+    assert cache.get("other", "AAPL") == 2
+    assert cache.stats()["quote"]["expirations"] == 1
+
+
+def test_explicit_ttl_overrides_the_namespace(clock):
+    cache = MemoryCache(4, ttls={"quote": 10})
+    cache.set("quote", "AAPL", 1, ttl=60)
+    clock[0] += 30
+    assert cache.get("quote", "AAPL") == 1
+
+
+def test_clear_namespace(clock):
+    cache = MemoryCache(4)
+    cache.set("quote", "AAPL", 1)
+    cache.set("profile", "AAPL", "Apple")
+    cache.clear("quote")
+    assert cache.get("quote", "AAPL") is None
+    assert cache.get("profile", "AAPL") == "Apple"
+    cache.clear()
+    assert cache.get("profile", "AAPL") is None
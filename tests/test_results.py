@@ -0,0 +1,20 @@
+from ai_trading_crew.results import parse_recommendation
+
+
+def test_parse_signal_and_confidence():
+    text = "## RECOMMENDATION: Bullish\n\n**Confidence Level:** High\n\nThe stock ..."
+    assert parse_recommendation(text) == ("Bullish", "High")
+
+
+def test_longest_signal_wins():
+    assert parse_recommendation("RECOMMENDATION - very bullish\nCONFIDENCE: medium")[0] == "Very Bullish"
+    assert parse_recommendation("**RECOMMENDATION**: Very Bearish")[0] == "Very Bearish"
+
+
+def test_case_insensitive_confidence():
+    assert parse_recommendation("Recommendation: Neutral. Confidence: low")[1] == "Low"
+
+
+def test_missing_parts_are_none():
+    assert parse_recommendation("Nothing to report") == (None, None)
+    assert parse_recommendation("RECOMMENDATION: Bearish") == ("Bearish", None)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai_trading_crew.utils.single_flight import SingleFlight
+
+
+def wait_for_followers(single_flight, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while single_flight.stats()["followers"] < count:
+        assert time.monotonic() < deadline, "follower never joined the flight"
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_call():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "bars"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(single_flight.do("key", fetch)))
+    leader.start()
+    while not calls:
+        time.sleep(0.01)
+    follower = threading.Thread(target=lambda: results.append(single_flight.do("key", fetch)))
+    follower.start()
+    wait_for_followers(single_flight, 1)
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["bars", "bars"]
+    assert len(calls) == 1
+    assert single_flight.stats()["in_flight"] == 0
+
+
+def test_leader_error_propagates_to_followers():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+        raise ValueError("No data available")
+
+    errors = []
+
+    def call():
+        try:
+            single_flight.do("key", fetch)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_for_followers(single_flight, 1)
+    release.set()
+    leader.join()
+    follower.join()
+    assert errors == ["No data available", "No data available"]
+
+
+def test_failed_flight_is_not_cached():
+    single_flight = SingleFlight()
+
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        single_flight.do("key", failing)
+    assert single_flight.do("key", lambda: 1) == 1
+
+
+def test_async_callers_share_one_call():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "quote"
+
+    async def main():
+        return await asyncio.gather(*[single_flight.do_async("key", fetch) for _ in range(3)])
+
+    assert asyncio.run(main()) == ["quote"] * 3
+    assert len(calls) == 1
+
+
+def test_async_leader_error_propagates():
+    single_flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("request failed")
+
+    async def main():
+        return await asyncio.gather(*[single_flight.do_async("key", fetch) for _ in range(2)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from ai_trading_crew.utils.stage_graph import StageGraph
+
+
+def run(graph):
+    return asyncio.run(graph.run())
+
+
+async def value(result, delay=0.0):
+    await asyncio.sleep(delay)
+    return result
+
+
+def test_stages_receive_their_dependency_results():
+    graph = StageGraph("AAPL")
+    graph.add_stage("company_name", lambda: value("Apple"))
+    graph.add_stage("headlines", lambda: value(["headline"]))
+    graph.add_stage("picker", lambda company_name, headlines: value(f"{company_name}: {len(headlines)}"), depends_on=["company_name", "headlines"])
+    assert run(graph)["picker"] == "Apple: 1"
+
+
+def test_independent_stages_run_concurrently():
+    graph = StageGraph()
+    for name in ("a", "b", "c"):
+        graph.add_stage(name, lambda: value(name, delay=0.2))
+    run(graph)
+    assert graph.wall_time < 0.5
+
+
+def test_timeout_degrades_to_the_fallback_and_skips_dependents():
+    ran = []
+
+    async def dependent(slow):
+        ran.append(slow)
+        return slow
+
+    graph = StageGraph()
+    graph.add_stage("slow", lambda: value("late", delay=5), timeout=0.05, fallback=lambda reason: f"unavailable ({reason})")
+    graph.add_stage("dependent", dependent, depends_on=["slow"], fallback="skipped")
+    results = run(graph)
+    assert results["slow"] == "unavailable (timed out after 0.05s)"
+    assert results["dependent"] == "skipped"
+    assert ran == []
+    assert set(graph.degraded) == {"slow", "dependent"}
+
+
+def test_usable_fallback_keeps_dependents_running():
+    async def failing():
+        raise ValueError("no profile")
+
+    graph = StageGraph()
+    graph.add_stage("company_name", failing, fallback="AAPL", degrade_dependents=False)
+    graph.add_stage("timegpt", lambda company_name: value(f"forecast of {company_name}"), depends_on=["company_name"], fallback="unavailable")
+    results = run(graph)
+    assert results["timegpt"] == "forecast of AAPL"
+    assert graph.degraded == {"company_name": "failed: no profile"}
+
+
+def test_failure_without_fallback_is_raised():
+    async def failing():
+        raise ValueError("boom")
+
+    graph = StageGraph()
+    graph.add_stage("failing", failing)
+    graph.add_stage("other", lambda: value("ok", delay=5))
+    with pytest.raises(ValueError, match="boom"):
+        run(graph)
+
+
+def test_invalid_registrations():
+    graph = StageGraph()
+    graph.add_stage("a", lambda: value(1))
+    with pytest.raises(ValueError):
+        graph.add_stage("a", lambda: value(1))
+    with pytest.raises(ValueError):
+        graph.add_stage("b", lambda a, c: value(1), depends_on=["a", "c"])
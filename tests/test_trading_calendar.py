@@ -0,0 +1,45 @@
+from datetime import date
+
+from ai_trading_crew.utils.trading_calendar import TradingCalendar
+
+
+calendar = TradingCalendar()
+
+
+def test_next_session_skips_holiday():
+    # Independence Day 2024 was a Thursday
+    assert calendar.next_session(date(2024, 7, 3)) == date(2024, 7, 5)
+
+
+def test_next_session_skips_weekend():
+    assert calendar.next_session("2024-07-05") == date(2024, 7, 8)
+
+
+def test_latest_session_on_weekend_and_holiday():
+    assert calendar.latest_session(date(2024, 7, 6)) == date(2024, 7, 5)
+    assert calendar.latest_session(date(2024, 12, 25)) == date(2024, 12, 24)
+
+
+def test_is_trading_day():
+    assert calendar.is_trading_day(date(2024, 7, 5))
+    assert not calendar.is_trading_day(date(2024, 7, 4))
+    assert not calendar.is_trading_day(date(2024, 7, 6))
+
+
+def test_sessions_between_and_count():
+    sessions = calendar.sessions_between(date(2024, 7, 1), date(2024, 7, 5))
+    assert sessions == [date(2024, 7, 1), date(2024, 7, 2), date(2024, 7, 3), date(2024, 7, 5)]
+    assert calendar.count_sessions(date(2024, 7, 1), date(2024, 7, 5)) == 4
+    assert calendar.count_sessions(date(2024, 7, 5), date(2024, 7, 1)) == 0
+    assert calendar.sessions_between(date(2024, 7, 5), date(2024, 7, 1)) == []
+
+
+def test_holidays_between():
+    assert calendar.holidays_between(date(2024, 7, 1), date(2024, 7, 7)) == [date(2024, 7, 4)]
+
+
+def test_range_extends_outside_precomputed_sessions():
+    far_calendar = TradingCalendar()
+    assert far_calendar.is_trading_day(date(2024, 7, 5))
+    # Christmas 2000 was a Monday, far before the precomputed range
+    assert far_calendar.next_session(date(2000, 12, 22)) == date(2000, 12, 26)
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from ai_trading_crew.utils.work_queue import CLAIMED, DONE, FAILED, PENDING, SymbolWorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SymbolWorkQueue(str(tmp_path / "queue.db"), "2024-07-05")
+
+
+def test_claims_by_priority_then_order(queue):
+    queue.enqueue(["AAPL", "MSFT"])
+    queue.enqueue(["SPY"], priority=10)
+    assert [queue.claim("w1"), queue.claim("w1"), queue.claim("w1")] == ["SPY", "AAPL", "MSFT"]
+    assert queue.claim("w1") is None
+
+
+def test_complete_and_fail(queue):
+    queue.enqueue(["AAPL", "MSFT"])
+    queue.claim("w1")
+    queue.claim("w1")
+    queue.complete("AAPL")
+    queue.fail("MSFT", "no data")
+    assert queue.status("AAPL") == DONE
+    assert queue.status("MSFT") == FAILED
+    assert queue.error("MSFT") == "no data"
+    assert not queue.has_unfinished()
+
+
+def test_enqueue_requeues_failed_symbols_only(queue):
+    queue.enqueue(["AAPL", "MSFT"])
+    queue.claim("w1")
+    queue.claim("w1")
+    queue.complete("AAPL")
+    queue.fail("MSFT", "no data")
+    queue.enqueue(["AAPL", "MSFT"])
+    assert queue.status("AAPL") == DONE
+    assert queue.status("MSFT") == PENDING
+    assert queue.error("MSFT") is None
+
+
+def test_release_worker_puts_its_claims_back(queue):
+    queue.enqueue(["AAPL", "MSFT"])
+    queue.claim("w1")
+    queue.claim("w2")
+    queue.release_worker("w1")
+    assert queue.counts() == {PENDING: 1, CLAIMED: 1}
+    assert queue.claim("w3") == "AAPL"
+
+
+def test_expired_claim_is_taken_over(queue):
+    queue.enqueue(["AAPL"])
+    assert queue.claim("w1") == "AAPL"
+    assert not queue.claim_symbol("AAPL", "w2")
+    queue.claim_timeout = -1
+    assert queue.claim_symbol("AAPL", "w2")
+    assert queue.claim("w3") == "AAPL"
+
+
+def test_queues_are_scoped_to_their_run_date(tmp_path):
+    db_path = str(tmp_path / "queue.db")
+    SymbolWorkQueue(db_path, "2024-07-05").enqueue(["AAPL"])
+    assert SymbolWorkQueue(db_path, "2024-07-08").claim("w1") is None
+
+
+def test_wait_until_done_takes_over_a_pending_symbol(queue):
+    queue.enqueue(["SPY"])
+    processed = []
+
+    async def run_claimed():
+        processed.append("SPY")
+
+    asyncio.run(queue.wait_until_done("SPY", worker="w1", run_claimed=run_claimed, poll_interval=0.01))
+    assert processed == ["SPY"]
+    assert queue.status("SPY") == DONE
+
+
+def test_wait_until_done_records_a_failed_takeover(queue):
+    queue.enqueue(["SPY"])
+
+    async def run_claimed():
+        raise ValueError("overview failed")
+
+    with pytest.raises(RuntimeError, match="overview failed"):
+        asyncio.run(queue.wait_until_done("SPY", worker="w1", run_claimed=run_claimed, poll_interval=0.01))
+    assert queue.status("SPY") == FAILED
+
+
+def test_wait_until_done_raises_on_expired_claim_without_takeover(queue):
+    queue.enqueue(["SPY"])
+    queue.claim("w1")
+    queue.claim_timeout = -1
+    with pytest.raises(RuntimeError, match="expired"):
+        asyncio.run(queue.wait_until_done("SPY", poll_interval=0.01))